@@ -6,40 +6,55 @@ from sklearn.compose import make_column_transformer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder, MinMaxScaler
 from pathlib import Path
 import pickle
+import sys
+import os
 from data_validation import validate_data
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.hash_split import stream_hash_split
+from src.seeding import ROOT_SEED, stage_seed
+from src.chunked_preprocessing import fit_preprocessor_in_chunks
+from src.feature_store import write_feature_store
+from src.data_profile import profile_path, profile_data, save_profile
+from src.data_validation_utils import dataset_check_counts, dataset_check_failures
+from src.drift_monitoring import drift_reference_path, build_drift_reference, save_drift_reference
+from src.data_preprocessing import read_data, CATEGORICAL_COLUMNS, ORDINAL_COLUMNS, NUMERICAL_COLUMNS, \
+                                   UNUSED_COLUMNS, TARGET_COLUMN, RAW_COLUMNS
 
-def clean_column_names(df):
+def correct_precision_after_scaling(df, ordinal_features, decimals=2):
+    # There was a rounding error because of float64, changing the dtype to float32 for ordinal features
+    df[ordinal_features] = df[ordinal_features].astype("float32")
+
+def prepare_chunk(raw_data, dataset_counts=None):
     """
-    Clean column names by converting them to lowercase, replacing spaces and dashes with underscores. 
-    
+    Cleans the values of raw data read with normalized column names, then validates its rows.
+
+    The missing rates and the duplicates are properties of the whole dataset, they are
+    accumulated into `dataset_counts` and checked once after the last chunk.
+
     Parameters:
-    df (pd.DataFrame): The input pandas DataFrame whose column names need to be cleaned.
+    raw_data (pd.DataFrame): The raw data, or one chunk of it.
+    dataset_counts (dict, optional): The counts of the previous chunks, see `dataset_check_counts`,
+        updated in place.
 
     Returns:
-    pd.DataFrame: A DataFrame with cleaned column names.
+    pd.DataFrame: The cleaned data.
     """
-    # Lower the column names
-    df.columns = df.columns.str.lower()
-
-    # Replace all the intermediate white spaces with underscore
-    df.columns = df.columns.str.replace(r'\s+', '_', regex=True)
+    satisfaction_data = raw_data
 
-    # Replace dashes with underscore
-    df.columns = df.columns.str.replace(r'-', '_', regex=True)
+    # Customer Type column's values were not homogeneous, renamed disloyal Customer -> Disloyal Customer
+    satisfaction_data["customer_type"] = satisfaction_data["customer_type"].str.title()
 
-    # Rename bad column name
-    df = df.rename({"departure/arrival_time_convenient": "time_convenient"}, axis=1)
+    # Validate the rows, then add the chunk to the whole-dataset checks
+    validate_data(satisfaction_data, missing_data_threshold=0.05, dataset_checks=False)
+    if dataset_counts is not None:
+        dataset_counts.update(dataset_check_counts(satisfaction_data, dataset_counts or None))
 
-    return df
-
-def correct_precision_after_scaling(df, ordinal_features, decimals=2):
-    # There was a rounding error because of float64, changing the dtype to float32 for ordinal features
-    df[ordinal_features] = df[ordinal_features].astype("float32")
+    return satisfaction_data
 
 @click.command()
 @click.option('--raw-data',
               type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
-              help="Path to a raw data")
+              help="Path to a raw data, a CSV file. Only the known columns are read")
 @click.option('--test-size',
               type=float,
               help="The proportion of the data points allocated to the test set", default=0.2)
@@ -51,15 +66,24 @@ def correct_precision_after_scaling(df, ordinal_features, decimals=2):
               help="Path to the directory where the preprocessor file will be saved")
 @click.option('--seed',
               type=int,
-              help= "Random seed",
-              default=42)
-def main(raw_data, test_size, data_to, preprocessor_to, seed):
-    # Initialize a random seed
-    np.random.seed(seed)
-
-    # Read the raw data
-    raw_data = pd.read_csv(raw_data)
-    
+              help= "Root random seed, the split derives its own seed from it",
+              default=ROOT_SEED)
+@click.option('--split-method',
+              type=click.Choice(['random', 'hash'], case_sensitive=False),
+              help="random shuffles all the rows, hash streams the raw data and assigns every id to a split "
+                   "from its hash, so a passenger stays in the same split when new data is appended",
+              default='random')
+@click.option('--chunk-size',
+              type=click.IntRange(min=1),
+              help="The number of rows read at once by the hash split, the profiling and the chunked fit",
+              default=100_000)
+@click.option('--chunked-fit',
+              is_flag=True,
+              help="Fit the preprocessor and scale the data chunk by chunk from the raw splits on disk")
+def main(raw_data, test_size, data_to, preprocessor_to, seed, split_method, chunk_size, chunked_fit):
+    # Derive the seed of the split stage, both split methods use it
+    split_seed = stage_seed(seed, "split")
+
     # Convert the string paths to Path
     data_to = Path(data_to)
     preprocessor_to = Path(preprocessor_to)
@@ -78,47 +102,66 @@ def main(raw_data, test_size, data_to, preprocessor_to, seed):
     if not preprocessor_to.exists():
         preprocessor_to.mkdir(parents=True, exist_ok=True)
 
-    # Clean the column names
-    satisfaction_data = clean_column_names(raw_data)
-
-    # Customer Type column's values were not homogeneous, renamed disloyal Customer -> Disloyal Customer
-    satisfaction_data["customer_type"] = satisfaction_data["customer_type"].str.title()
-
-    # Validate the data
-    validate_data(satisfaction_data, missing_data_threshold=0.05)
-
-    # Train-Test Split
-    train_data, test_data = train_test_split(
-        satisfaction_data, test_size=test_size, random_state=seed
-    )
-
-
-    # Save the splitted raw datasets 
-    train_data.to_csv(raw_data_directory / "satisfaction_train.csv", index=False)
-    test_data.to_csv(raw_data_directory / "satisfaction_test.csv", index=False)
+    # The counts of the missing values and the row hashes of the whole dataset, checked once all the rows are read
+    dataset_counts = {}
+
+    if split_method == 'hash':
+        # Clean and validate every chunk, then write its rows to the split of their hashed id
+        summary = stream_hash_split(
+            (prepare_chunk(chunk, dataset_counts) for chunk in read_data(raw_data, columns=RAW_COLUMNS, chunksize=chunk_size)),
+            raw_data_directory / "satisfaction_train.csv",
+            raw_data_directory / "satisfaction_test.csv",
+            test_size=test_size,
+            seed=split_seed
+        )
+        print(f"Test proportion of every class:\n{summary}\n")
+    else:
+        # Read, clean and validate the raw data
+        satisfaction_data = prepare_chunk(read_data(raw_data, columns=RAW_COLUMNS), dataset_counts)
+
+        # Train-Test Split
+        train_data, test_data = train_test_split(
+            satisfaction_data, test_size=test_size, random_state=split_seed
+        )
+
+        # Save the splitted raw datasets 
+        train_data.to_csv(raw_data_directory / "satisfaction_train.csv", index=False)
+        test_data.to_csv(raw_data_directory / "satisfaction_test.csv", index=False)
+
+    # Check the missing rates and the duplicates of the whole dataset
+    failures = dataset_check_failures(dataset_counts, missing_data_threshold=0.05)
+    for failure in failures:
+        print(failure)
+    if not failures:
+        print("Congratulations! Whole dataset validation passed!\n")
 
     # Print about saving the raw data in the terminal
 
     print(f"Raw data is saved in the directory: \033[1m{raw_data_directory}\033[0m\n")
 
+    # Profile and bin the training data, new batches are checked for drift against it
+    train_path = raw_data_directory / "satisfaction_train.csv"
+    train_profile = profile_data(pd.read_csv(train_path, chunksize=chunk_size))
+    save_profile(train_profile, profile_path(train_path))
+    drift_reference = build_drift_reference(train_profile, pd.read_csv(train_path, chunksize=chunk_size))
+    save_drift_reference(drift_reference, drift_reference_path(train_path))
+
     # Define column types
-    categorical_cols = ['gender', 'customer_type', 'type_of_travel', 'class']
+    categorical_cols = CATEGORICAL_COLUMNS
 
-    ordinal_cols = ['inflight_wifi_service', 'time_convenient', 'ease_of_online_booking', 
-                'gate_location', 'food_and_drink', 'online_boarding', 'seat_comfort', 
-                'inflight_entertainment', 'on_board_service', 'leg_room_service',
-               'baggage_handling', 'checkin_service', 'inflight_service', 'cleanliness']
+    ordinal_cols = ORDINAL_COLUMNS
     
-    numerical_cols = ['age', 'flight_distance', 'departure_delay_in_minutes']
+    numerical_cols = NUMERICAL_COLUMNS
     
     # Drop arrival_delay_in_minutes which closely relates to departure_delay_in_minutes
     # Id column is a unique identifier
-    drop_cols = ['arrival_delay_in_minutes', 'id']
+    drop_cols = UNUSED_COLUMNS
 
-    passthrough_cols = ['satisfaction']
+    passthrough_cols = [TARGET_COLUMN]
 
     # Check if all columns are present in the above lists
-    assert len(categorical_cols + ordinal_cols + numerical_cols + drop_cols + passthrough_cols) == len(train_data.columns), \
+    train_columns = pd.read_csv(raw_data_directory / "satisfaction_train.csv", nrows=0).columns
+    assert len(categorical_cols + ordinal_cols + numerical_cols + drop_cols + passthrough_cols) == len(train_columns), \
     "The sum of the number of columns in the categorical_cols, ordinal_cols and numerical cols is not equal to the number of columns in train data"
 
     # Define the preprocessor
@@ -135,28 +178,49 @@ def main(raw_data, test_size, data_to, preprocessor_to, seed):
     pickle.dump(preprocessor, open(preprocessor_save_path, "wb"))
     print(f"Preprocessor saved in the directory: \033[1m{preprocessor_save_path}\033[0m\n")
 
-    # Fit the preprocessor
-    preprocessor.fit(train_data)
+    # Read the splits at once, or chunk by chunk when they may not fit in memory
+    def read_split(split):
+        split_path = raw_data_directory / f"satisfaction_{split}.csv"
+        return pd.read_csv(split_path, chunksize=chunk_size) if chunked_fit else [pd.read_csv(split_path)]
 
-    # Preprocess the train and test sets
-    scaled_train_array = preprocessor.transform(train_data)
-    scaled_test_array = preprocessor.transform(test_data)
+    # Fit the preprocessor
+    if chunked_fit:
+        fit_preprocessor_in_chunks(preprocessor, read_split("train"))
+    else:
+        preprocessor.fit(next(iter(read_split("train"))))
 
     # Get the columns
     ohe_cols = preprocessor.transformers_[0][1].get_feature_names_out(categorical_cols)
     all_cols = list(ohe_cols) + ordinal_cols + numerical_cols + passthrough_cols
 
-    # Convert the numpy array to dataframe
-    scaled_train_df = pd.DataFrame(scaled_train_array, columns=all_cols)
-    scaled_test_df = pd.DataFrame(scaled_test_array, columns=all_cols)
-
-    # Some ordinal features have precision error, this function fixes it
-    correct_precision_after_scaling(scaled_train_df, ordinal_cols)
-    correct_precision_after_scaling(scaled_test_df, ordinal_cols)
-
-    # Save the scaled data
-    scaled_train_df.to_csv(processed_data_directory / "scaled_satisfaction_train.csv", index=False)
-    scaled_test_df.to_csv(processed_data_directory / "scaled_satisfaction_test.csv", index=False)
+    # Preprocess and save the chunks of a split, passing the exact output of the preprocessor on to the feature store
+    def scale_split(split):
+        for i, split_data in enumerate(read_split(split)):
+            # Convert the numpy array to dataframe
+            stored_df = pd.DataFrame(preprocessor.transform(split_data), columns=all_cols)
+            scaled_df = stored_df.copy()
+
+            # Some ordinal features have precision error, this function fixes it
+            correct_precision_after_scaling(scaled_df, ordinal_cols)
+
+            # Save the scaled data
+            scaled_df.to_csv(processed_data_directory / f"scaled_satisfaction_{split}.csv",
+                             mode="w" if i == 0 else "a", header=i == 0, index=False)
+            yield stored_df
+
+    # The column groups of the feature store, the one-hot columns and the target fit in int8
+    # The scaled columns keep the float64 output of the preprocessor, so a model predicts the store like the raw data
+    store_groups = {
+        "onehot": {"columns": list(ohe_cols), "dtype": "int8"},
+        "ordinal": {"columns": ordinal_cols, "dtype": "float64"},
+        "numerical": {"columns": numerical_cols, "dtype": "float64"},
+        "target": {"columns": passthrough_cols, "dtype": "int8", "categories": ["neutral or dissatisfied", "satisfied"]},
+    }
+
+    # Preprocess the train and test sets, saving them as CSV files and as memory-mappable arrays
+    for split in ["train", "test"]:
+        write_feature_store(scale_split(split), processed_data_directory / "feature_store" / split, store_groups,
+                            preprocessor=preprocessor)
 
     # Print about saving the scaled data in the terminal
     print(f"Processed data is saved in the directory: \033[1m{processed_data_directory}\033[0m\n")
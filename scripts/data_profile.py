@@ -0,0 +1,77 @@
+import click
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.data_preprocessing import read_data
+from src.data_profile import profile_path, profile_data, save_profile, load_profile, compare_profiles
+
+
+@click.command()
+@click.option(
+    "--data-path",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
+    help="File path to the data to profile, a CSV file",
+)
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=100_000,
+    help="Number of rows read at once",
+)
+@click.option(
+    "--reference-profile",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
+    default=None,
+    help="Profile of the reference data, e.g. the training data, the new profile is validated against it",
+)
+@click.option(
+    "--null-rate-tolerance",
+    type=click.FloatRange(0, 1),
+    default=0.05,
+    help="Accepted growth of the null rate of a column compared to the reference profile",
+)
+def main(data_path, chunk_size, reference_profile, null_rate_tolerance):
+    """
+    Profiles every column of a data file in one chunked scan and saves the profile next to
+    the data, then optionally validates it against a reference profile.
+
+    Parameters
+    ----------
+    data_path : str
+        File path to the CSV data.
+    chunk_size : int
+        Number of rows read at once.
+    reference_profile : str or None
+        File path to the reference profile, None skips the validation.
+    null_rate_tolerance : float
+        Accepted growth of the null rate of a column.
+
+    Returns
+    -------
+    None
+        The profile is saved as `<data file name>_profile.json` in the directory of the data.
+
+    Raises
+    ------
+    ValueError
+        If a check against the reference profile fails.
+    """
+    profile = profile_data(read_data(data_path, chunksize=chunk_size))
+    save_profile(profile, profile_path(data_path))
+
+    if reference_profile is not None:
+        checks = compare_profiles(load_profile(reference_profile), profile, null_rate_tolerance=null_rate_tolerance)
+        failures = checks[~checks["passed"]]
+        if len(failures):
+            print(failures.to_string(index=False))
+            raise ValueError(f"{len(failures)} of the {len(checks)} profile checks failed.")
+        print(f"Congratulations! All the {len(checks)} profile checks passed!\n")
+
+
+if __name__ == "__main__":
+    try:
+        main(standalone_mode=False)  # Prevents sys.exit()
+    except Exception as e:
+        print(f"The following error occurred: {e}")
+        sys.exit(1)
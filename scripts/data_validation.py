@@ -3,7 +3,15 @@ import pandera as pa
 def check_duplicates(df):
     return not bool(df.drop('id', axis=1).duplicated().sum())
 
-def validate_data(df, missing_data_threshold):
+def validate_data(df, missing_data_threshold, dataset_checks=True):
+    # The missing rates and the duplicates are properties of the whole dataset, a chunk of it only gets the row checks
+    checks = [pa.Check(lambda df: ~(df.isna().all(axis=1)).any(), error="Empty rows found!")]
+    if dataset_checks:
+        checks += [
+            pa.Check(lambda df: (df.isna().sum() / len(df) < missing_data_threshold).all(), error=f"Some columns have more than {missing_data_threshold*100}% missing values."),
+            pa.Check(check_duplicates, error = "There are duplicates observations in the dataset!")
+        ]
+
     # Define the schema
     schema = pa.DataFrameSchema(
         {
@@ -31,11 +39,7 @@ def validate_data(df, missing_data_threshold):
             "arrival_delay_in_minutes": pa.Column(float, pa.Check.greater_than_or_equal_to(0), nullable=True),
             "satisfaction": pa.Column(str, pa.Check.isin(["neutral or dissatisfied", "satisfied"]), nullable=False),
         },
-        checks=[
-            pa.Check(lambda df: ~(df.isna().all(axis=1)).any(), error="Empty rows found!"),
-            pa.Check(lambda df: (df.isna().sum() / len(df) < missing_data_threshold).all(), error=f"Some columns have more than {missing_data_threshold*100}% missing values."),
-            pa.Check(check_duplicates, error = "There are duplicates observations in the dataset!")
-        ])
+        checks=checks)
 
     # Check the data with the above defined schema
     try:
@@ -0,0 +1,140 @@
+import click
+import json
+import os
+import pickle
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.model_evaluation import check_directory_exists
+from src.drift_monitoring import add_prediction_reference, stream_bin_counts, check_drift
+from src.data_preprocessing import TARGET_COLUMN, parse_filter, read_data
+
+
+@click.command()
+@click.option(
+    "--data-path",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
+    help="File path to the new batch of data, a CSV file",
+)
+@click.option(
+    "--reference",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
+    help="File path to the drift reference saved by the data preparation",
+)
+@click.option(
+    "--pipeline",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
+    default=None,
+    help="File path to the fit model pipeline, its prediction rate is also checked",
+)
+@click.option(
+    "--train-path",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
+    default=None,
+    help="File path to the training data, the reference prediction rate of the pipeline is computed on it",
+)
+@click.option(
+    "--results-to",
+    type=click.Path(exists=False, dir_okay=True, file_okay=False, writable=True),
+    help="Directory path to save the drift report to",
+)
+@click.option(
+    "--filter",
+    "filters",
+    multiple=True,
+    help="Row filter of the batch written as 'column operator value', e.g. 'class == Eco'. Can be repeated",
+)
+@click.option("--chunk-size", type=click.IntRange(min=1), default=100_000, help="Number of rows read at once")
+@click.option("--psi-threshold", type=float, default=0.2, help="PSI above which a feature drifted")
+@click.option("--ks-threshold", type=float, default=0.1, help="KS statistic above which a numeric feature drifted")
+@click.option(
+    "--chi2-alpha",
+    type=click.FloatRange(0, 1, min_open=True, max_open=True),
+    default=None,
+    help="Chi-square p-value below which a feature drifted, the test is skipped by default",
+)
+def main(data_path, reference, pipeline, train_path, results_to, filters, chunk_size, psi_threshold, ks_threshold, chi2_alpha):
+    """
+    Compares the distribution of every feature, and of the predictions, of a new batch of
+    data with the training distribution, then saves the drift report.
+
+    The batch is streamed in chunks and only its counts in the reference bins are kept, so
+    the memory doesn't depend on its size.
+
+    Parameters
+    ----------
+    data_path : str
+        File path to the new batch of data.
+    reference : str
+        File path to the drift reference of the training data.
+    pipeline : str or None
+        File path to the pickled model pipeline, None skips the prediction drift.
+    train_path : str or None
+        File path to the training data, required with the pipeline.
+    results_to : str
+        Directory path where the drift report will be saved.
+    filters : tuple of str
+        Row filters of the batch, pushed down to the reader.
+    chunk_size : int
+        Number of rows read at once.
+    psi_threshold : float
+        PSI above which a feature drifted.
+    ks_threshold : float
+        KS statistic above which a numeric feature drifted.
+    chi2_alpha : float or None
+        Chi-square p-value below which a feature drifted.
+
+    Returns
+    -------
+    None
+        The report is saved as `drift_report.csv` in the results directory.
+
+    Raises
+    ------
+    click.UsageError
+        If the pipeline is given without the training data.
+    ValueError
+        If a feature drifted.
+    """
+    if pipeline is not None and train_path is None:
+        raise click.UsageError("--pipeline needs --train-path, the predictions are compared with the "
+                               "predictions of the pipeline on the training data.")
+
+    results_to = check_directory_exists(results_to)
+
+    with open(reference) as reference_file:
+        drift_reference = json.load(reference_file)
+
+    model = None
+    if pipeline is not None:
+        model = pickle.load(open(pipeline, "rb"))
+
+        # Predict the training data with the same model, so the prediction drift leaves out the bias of the model
+        train_chunks = read_data(train_path, columns=list(model.feature_names_in_), chunksize=chunk_size)
+        drift_reference = add_prediction_reference(drift_reference, model, train_chunks)
+
+    # Count the new batch in the reference bins chunk by chunk, only reading the binned columns and the model features
+    columns = list(drift_reference["bins"]) + (list(model.feature_names_in_) if model is not None else [])
+    chunks = read_data(data_path, columns=columns, optional=[TARGET_COLUMN],
+                       filters=[parse_filter(text) for text in filters], chunksize=chunk_size)
+    counts = stream_bin_counts(chunks, drift_reference["bins"], model=model)
+    report = check_drift(drift_reference, counts, psi_threshold=psi_threshold, ks_threshold=ks_threshold,
+                         chi2_alpha=chi2_alpha)
+
+    report_save_path = results_to / "drift_report.csv"
+    report.to_csv(report_save_path, index=False)
+    print(f"Drift report saved in the directory: \033[1m{report_save_path}\033[0m\n")
+
+    drifted = report[report["drifted"]]
+    if len(drifted):
+        print(drifted.to_string(index=False))
+        raise ValueError(f"{len(drifted)} of the {len(report)} features drifted.")
+    print("Congratulations! No drift detected!\n")
+
+
+if __name__ == "__main__":
+    try:
+        main(standalone_mode=False)  # Prevents sys.exit()
+    except Exception as e:
+        print(f"The following error occurred: {e}")
+        sys.exit(1)
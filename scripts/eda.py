@@ -1,5 +1,4 @@
 import click
-import pandas as pd
 from pathlib import Path
 import sys
 import os
@@ -7,29 +6,106 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.eda_plots import save_target_distribution, \
                           save_correlation_matrix, \
                           save_continuous_feat_target_plots, \
-                          save_cat_feat_target_plots
+                          save_cat_feat_target_plots, \
+                          sample_rows, \
+                          SAMPLE_STRATEGIES
 
 from src.data_validation_utils import validate_for_correlations
+from src.correlation_statistics import correlation_columns, correlation_statistics, CORRELATION_BLOCK_SIZE
+from src.feature_store import load_feature_store, feature_store_frame, FEATURE_GROUPS, TARGET_GROUP
+from src.data_preprocessing import CATEGORICAL_COLUMNS, ORDINAL_COLUMNS, NUMERICAL_COLUMNS, TARGET_COLUMN, \
+                                   normalize_column_name, read_data, read_header
+from src.seeding import ROOT_SEED, stage_seed
+
+# The groups of the feature store read by the plots and the correlations
+EDA_GROUPS = FEATURE_GROUPS + [TARGET_GROUP]
+
+# The decimals of the plotted ordinal scores, dropping the scaling errors like 0.6000000000000001
+PLOT_DECIMALS = 6
+
+
+def read_feature_store(feature_store, rows=None):
+    """Reads rows of the feature store for the plots, the ordinal scores are rounded like the values the CSV holds."""
+    data = feature_store_frame(feature_store, groups=EDA_GROUPS, rows=rows)
+    float_columns = data.select_dtypes("float").columns
+
+    return data.astype({column: "float64" for column in float_columns}).round({column: PLOT_DECIMALS
+                                                                               for column in ORDINAL_COLUMNS})
+
+
+def read_train_data(train_data_path):
+    """Reads the columns of the processed training data the plots use, the one-hot columns keep the names of the preprocessor."""
+    raw_names = {normalize_column_name(column): column for column in read_header(train_data_path)}
+    onehot_columns = [name for name in raw_names if name.startswith(tuple(f"{column}_" for column in CATEGORICAL_COLUMNS))]
+    train_data = read_data(train_data_path, columns=onehot_columns + ORDINAL_COLUMNS + NUMERICAL_COLUMNS + [TARGET_COLUMN])
+
+    return train_data.rename(columns=raw_names)
+
 
 @click.command()
 @click.option('--train-data-path',
               type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
               help="Path to the training data set.")
+@click.option('--feature-store',
+              type=click.Path(exists=True, dir_okay=True, file_okay=False, readable=True),
+              default=None,
+              help="Path to the feature store of the training data, read instead of the training data set.")
 @click.option('--plot-to',
               type=click.Path(exists=False, dir_okay=True, file_okay=False, writable=True),
               help="Path to directory where the plots from the eda will be saved to.")
-def main(train_data_path, plot_to):
-    # Convert the path to Path class
-    train_data_path = Path(train_data_path)
+@click.option('--correlation-cache',
+              type=click.Path(exists=False, dir_okay=True, file_okay=False, writable=True),
+              default=None,
+              help="Directory caching the correlation statistics of the training data by its hash, not cached by default.")
+@click.option('--max-rows',
+              type=click.IntRange(min=1),
+              default=None,
+              help="Maximum number of rows drawn in the plots, all the rows by default. The correlations always use all the rows.")
+@click.option('--sample-strategy',
+              type=click.Choice(SAMPLE_STRATEGIES),
+              default="stratified",
+              help="How the rows are sampled down to --max-rows, stratified by satisfaction by default.")
+@click.option('--dpi',
+              type=click.IntRange(min=1),
+              default=100,
+              help="Resolution of the saved plots in dots per inch.")
+@click.option('--plot-format',
+              type=click.Choice(["png", "webp"]),
+              default="png",
+              help="Image format of the saved plots.")
+@click.option('--seed', type=int, help="Root random seed, the sampled rows derive their own seed from it", default=ROOT_SEED)
+def main(train_data_path, feature_store, plot_to, correlation_cache, max_rows, sample_strategy, dpi, plot_format, seed):
+    # Derive the seed of the eda stage, the sampled rows use it
+    eda_seed = stage_seed(seed, "eda")
 
-    # Check if the train data path exists and is a file
-    assert (train_data_path.is_file() and \
-            train_data_path.exists() and \
-            train_data_path.suffix == '.csv'), \
-    "The argument '--train-data-path' should point to the train data. Valid train data is a .csv file."
+    if feature_store is not None:
+        # Sample the rows from the stored target codes, only the sampled rows are read from disk
+        arrays, schema = load_feature_store(feature_store, [TARGET_GROUP])
+        train_data = read_feature_store(feature_store, rows=sample_rows(arrays[TARGET_GROUP][:, 0], max_rows,
+                                                                        sample_strategy, eda_seed))
 
-    # Read the training data
-    train_data = pd.read_csv(train_data_path)
+        # The correlations use every row, read block by block, and the one-hot columns are only validated, not plotted
+        target_classes = schema["groups"][TARGET_GROUP]["categories"]
+        correlation_chunks = (
+            correlation_columns(feature_store_frame(feature_store, groups=EDA_GROUPS,
+                                                    rows=slice(start, start + CORRELATION_BLOCK_SIZE)),
+                                target_column="satisfaction", target_classes=target_classes, integer_columns=True)
+            for start in range(0, schema["n_rows"], CORRELATION_BLOCK_SIZE)
+        )
+    else:
+        # Convert the path to Path class
+        train_data_path = Path(train_data_path)
+
+        # Check if the train data path exists and is a file
+        assert (train_data_path.is_file() and \
+                train_data_path.exists() and \
+                train_data_path.suffix == '.csv'), \
+        "The argument '--train-data-path' should point to the train data. Valid train data is a .csv file."
+
+        # Read the plotted columns of the training data, the correlations use every row and the plots the sampled ones
+        train_data = read_train_data(train_data_path)
+        correlation_chunks = [correlation_columns(train_data, target_column="satisfaction", integer_columns=True)]
+        train_data = train_data.iloc[sample_rows(train_data["satisfaction"], max_rows, sample_strategy, eda_seed)]
 
     # Define the path where the plot should be saved
     plot_to_path = Path(plot_to)
@@ -42,19 +118,26 @@ def main(train_data_path, plot_to):
     assert plot_to_path.is_dir(), "The argument '--plot-to' should be a directory."
 
     # Create and save the target distribution plot
-    save_target_distribution(train_data=train_data, save_path=plot_to_path, target_column="satisfaction")
+    save_target_distribution(train_data=train_data, save_path=plot_to_path, target_column="satisfaction",
+                             dpi=dpi, file_format=plot_format)
+
+    # Compute the correlation statistics once, for both the validation and the plot
+    statistics = correlation_statistics(correlation_chunks, cache_dir=correlation_cache)
 
     # Validate the train data not to have anomalous correlations
-    validate_for_correlations(train_data, feature_target_threshold=0.92, feature_feature_threshold=0.9)
+    validate_for_correlations(train_data, statistics=statistics)
 
     # Create and save the correlation matrix plot
-    save_correlation_matrix(train_data=train_data, save_path=plot_to_path)
+    save_correlation_matrix(train_data=train_data, save_path=plot_to_path, statistics=statistics,
+                            dpi=dpi, file_format=plot_format)
 
     # Create and save the continuous features vs. target variable plot
-    save_continuous_feat_target_plots(train_data=train_data, save_path=plot_to_path, target_column="satisfaction")
+    save_continuous_feat_target_plots(train_data=train_data, save_path=plot_to_path, target_column="satisfaction",
+                                      dpi=dpi, file_format=plot_format)
     
     # Create and save the categorical features vs. target variable plot
-    save_cat_feat_target_plots(train_data=train_data, save_path=plot_to_path, target_column="satisfaction")
+    save_cat_feat_target_plots(train_data=train_data, save_path=plot_to_path, target_column="satisfaction",
+                               dpi=dpi, file_format=plot_format)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,72 @@
+import click
+import os
+import pickle
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.model_evaluation import check_directory_exists
+from src.data_preprocessing import FEATURE_COLUMNS, read_data
+from src.tree_explainer import explain_predictions
+
+
+@click.command()
+@click.option(
+    "--data-path",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
+    help="File path to the data to explain",
+)
+@click.option(
+    "--pipeline",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
+    help="File path to the fit best model pipeline",
+)
+@click.option(
+    "--results-to",
+    type=click.Path(exists=False, dir_okay=True, file_okay=False, writable=True),
+    help="Directory path to save the explanations to",
+)
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=1_000_000,
+    help="Number of rows read and explained at once",
+)
+def main(data_path, pipeline, results_to, chunk_size):
+    """
+    Explains every prediction of a tree model pipeline with the contributions of the
+    transformed features along the decision path of the row.
+
+    Parameters
+    ----------
+    data_path : str
+        File path to the data in CSV format, the target column is ignored if present.
+    pipeline : str
+        File path to the pickled model pipeline.
+    results_to : str
+        Directory path where `prediction_explanations.csv` will be saved.
+    chunk_size : int
+        Number of rows read and explained at once.
+
+    Returns
+    -------
+    None
+        This function saves the explanations without returning any value.
+    """
+    results_to = check_directory_exists(results_to)
+    final_model = pickle.load(open(pipeline, "rb"))
+
+    # Explain the data chunk by chunk, appending to the output file
+    explanations_save_path = results_to / "prediction_explanations.csv"
+    for i, chunk in enumerate(read_data(data_path, columns=FEATURE_COLUMNS, chunksize=chunk_size)):
+        explanations = explain_predictions(final_model, chunk, batch_size=chunk_size)
+        explanations.to_csv(explanations_save_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    print(f"Prediction explanations saved in the directory: \033[1m{explanations_save_path}\033[0m\n")
+
+
+if __name__ == "__main__":
+    try:
+        main(standalone_mode=False)  # Prevents sys.exit()
+        print("Congratulations! Prediction Explanations Done!")
+    except Exception as e:
+        print(f"The following error occurred: {e}")
+        sys.exit(1)
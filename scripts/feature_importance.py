@@ -0,0 +1,113 @@
+import click
+import os
+import pickle
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.model_evaluation import check_directory_exists
+from src.data_preprocessing import MODEL_COLUMNS, read_data
+from src.permutation_importance import IMPORTANCE_METRICS, permutation_importance, plot_permutation_importance
+from src.seeding import ROOT_SEED, stage_seed
+
+
+@click.command()
+@click.option(
+    "--test-path",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
+    help="File path to the testing data, a CSV file",
+)
+@click.option(
+    "--pipeline",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
+    help="File path to the fit best model pipeline",
+)
+@click.option(
+    "--results-to",
+    type=click.Path(exists=False, dir_okay=True, file_okay=False, writable=True),
+    help="Directory path to save the importance table to",
+)
+@click.option(
+    "--plots-to",
+    type=click.Path(exists=False, dir_okay=True, file_okay=False, writable=True),
+    help="Directory path to save the importance plot to",
+)
+@click.option(
+    "--metric",
+    type=click.Choice(list(IMPORTANCE_METRICS.keys()), case_sensitive=False),
+    default="f1",
+    help="Metric whose drop measures the importance of a feature",
+)
+@click.option(
+    "--group",
+    multiple=True,
+    help="Group of columns permuted jointly, as name=column1,column2. Can be repeated",
+)
+@click.option("--n-repeats", type=click.IntRange(min=1), default=5, help="Number of permutations of every feature")
+@click.option("--n-jobs", type=int, default=-1, help="Number of workers permuting the features")
+@click.option("--seed", type=int, help="Root random seed, the permutations derive their own seed from it", default=ROOT_SEED)
+def main(test_path, pipeline, results_to, plots_to, metric, group, n_repeats, n_jobs, seed):
+    """
+    Computes the permutation importance of the input features of a trained model on the
+    test data, then saves the importance table and plot.
+
+    Parameters
+    ----------
+    test_path : str
+        File path to the testing dataset in CSV format.
+    pipeline : str
+        File path to the pickled model pipeline.
+    results_to : str
+        Directory path where the importance table will be saved.
+    plots_to : str
+        Directory path where the importance plot will be saved.
+    metric : str
+        Metric whose drop measures the importance of a feature.
+    group : tuple of str
+        Groups of columns permuted jointly, as "name=column1,column2".
+    n_repeats : int
+        Number of permutations of every feature.
+    n_jobs : int
+        Number of workers permuting the features.
+    seed : int
+        Root random seed, the permutations derive their own seed from it.
+
+    Returns
+    -------
+    None
+        This function saves the table and the plot without returning any value.
+    """
+    results_to = check_directory_exists(results_to)
+    plots_to = check_directory_exists(plots_to)
+
+    # Parse the groups of columns
+    groups = {}
+    for definition in group:
+        name, _, columns = definition.partition("=")
+        if not columns:
+            raise ValueError(f"The group '{definition}' should be written as name=column1,column2.")
+        groups[name] = columns.split(",")
+
+    # Prepare the test set
+    test_data = read_data(test_path, columns=MODEL_COLUMNS)
+    X_test = test_data.drop(columns=["satisfaction"])
+    y_test = test_data["satisfaction"].values.ravel()
+
+    # Permute every feature and save the mean drops of the metric
+    final_model = pickle.load(open(pipeline, "rb"))
+    importances = permutation_importance(final_model, X_test, y_test, metric=metric, groups=groups,
+                                         n_repeats=n_repeats, n_jobs=n_jobs,
+                                         random_state=stage_seed(seed, "importance"))
+    importance_save_path = results_to / "permutation_importance.csv"
+    importances.to_csv(importance_save_path, index=False)
+    print(f"Permutation importance saved in the directory: \033[1m{importance_save_path}\033[0m\n")
+
+    plot_permutation_importance(importances, metric, plots_to)
+
+
+if __name__ == "__main__":
+    try:
+        main(standalone_mode=False)  # Prevents sys.exit()
+        print("Congratulations! Permutation Importance Done!")
+    except Exception as e:
+        print(f"The following error occurred: {e}")
+        sys.exit(1)
@@ -10,13 +10,22 @@ from src.model_evaluation import (
     plot_save_confusion_matrix,
     evaluate_model,
 )
+from src.confusion_metrics import accumulate_confusion_matrix
+from src.threshold_tuning import THRESHOLD_DECIMALS, positive_scores, predict_from_proba, threshold_counts, \
+                                 threshold_curve_from_counts
+from src.partitioned_evaluation import evaluate_partitions
+from src.slice_analysis import SLICE_METRICS, slice_outcome_counts, merge_slice_counts, save_slice_analysis
+from src.feature_store import store_predictions
+from src.data_preprocessing import MODEL_COLUMNS, parse_filter, read_data
+from src.render_pool import render_pool, submit_figure
+from src.seeding import ROOT_SEED, stage_seed
 
 
 @click.command()
 @click.option(
     "--test-path",
     type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
-    help="File path to the testing data",
+    help="File path to the testing data, a CSV file",
 )
 @click.option(
     "--pipeline",
@@ -33,7 +42,62 @@ from src.model_evaluation import (
     type=click.Path(exists=False, dir_okay=True, file_okay=False, writable=True),
     help="Directory path to save the plots to",
 )
-def main(pipeline, test_path, results_to, plots_to):
+@click.option(
+    "--filter",
+    "filters",
+    multiple=True,
+    help="Row filter of the test set written as 'column operator value', e.g. 'class == Eco'. Can be repeated",
+)
+@click.option(
+    "--feature-store",
+    type=click.Path(exists=True, dir_okay=True, file_okay=False, readable=True),
+    default=None,
+    help="Directory of the feature store of the test set, predicted batch by batch instead of the test path",
+)
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Stream the test set from disk in chunks of this many rows, accumulating the confusion matrix",
+)
+@click.option(
+    "--bootstrap",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of bootstrap resamples used to add confidence intervals to the test scores",
+)
+@click.option(
+    "--confidence-level",
+    type=click.FloatRange(0, 1, min_open=True, max_open=True),
+    default=0.95,
+    help="Confidence level of the bootstrap intervals",
+)
+@click.option("--seed", type=int, help="Root random seed, the bootstrap resamples derive their own seed from it", default=ROOT_SEED)
+@click.option(
+    "--partitions-dir",
+    type=click.Path(exists=True, dir_okay=True, file_okay=False, readable=True),
+    default=None,
+    help="Directory of CSV partitions of the test data to score incrementally instead of the test path",
+)
+@click.option(
+    "--slice-by",
+    multiple=True,
+    help="Column defining the slices scored separately in partitioned mode, can be repeated",
+)
+@click.option(
+    "--n-jobs",
+    type=int,
+    default=1,
+    help="Number of workers scoring the partitions",
+)
+@click.option(
+    "--slice-analysis",
+    type=click.Choice(SLICE_METRICS, case_sensitive=False),
+    default=None,
+    help="Rank the segments of the test set and their intersections by their gap in this metric",
+)
+def main(pipeline, test_path, results_to, plots_to, filters, feature_store, chunk_size, bootstrap, confidence_level, seed,
+         partitions_dir, slice_by, n_jobs, slice_analysis):
     """
     Main function to evaluate a trained model on test data, save evaluation metrics,
     and generate plots.
@@ -47,36 +111,129 @@ def main(pipeline, test_path, results_to, plots_to):
     pipeline : str
         File path to the pickled model pipeline to be evaluated.
     test_path : str
-        File path to the testing dataset in CSV format.
+        File path to the testing dataset in CSV format, the columns unused by the
+        model are not read.
     results_to : str
         Directory path where evaluation metrics and classification reports will be saved as CSV files.
     plots_to : str
         Directory path where evaluation plots will be saved.
+    filters : tuple of str
+        Row filters of the test set read from the test path, pushed down to the reader.
+    feature_store : str or None
+        Directory of the memory-mapped processed test set, predicted without the preprocessing.
+    chunk_size : int or None
+        Number of rows per chunk when streaming the test set, None reads it at once. The
+        feature store is predicted in batches of 100,000 rows by default.
+    bootstrap : int or None
+        Number of bootstrap resamples of the test predictions, None skips the confidence intervals.
+    confidence_level : float
+        Confidence level of the bootstrap intervals.
+    seed : int
+        Root random seed, the bootstrap resamples derive their own seed from it.
+    partitions_dir : str or None
+        Directory of CSV partitions, the partitions already scored by the same model are skipped.
+    slice_by : tuple of str
+        Columns defining the slices scored separately in partitioned mode.
+    n_jobs : int
+        Number of workers scoring the partitions.
+    slice_analysis : str or None
+        Metric ranking the segments of the test set, None skips the slice analysis. Not
+        available with the feature store or the partitions, which don't keep the raw segment
+        columns.
 
     Returns
     -------
     None
         This function saves the plot to the directory without returning any value.
+
+    Raises
+    ------
+    click.UsageError
+        If the slice analysis is asked for with the feature store or the partitions.
     """
+    if slice_analysis is not None and (feature_store is not None or partitions_dir is not None):
+        raise click.UsageError("--slice-analysis needs the raw test set, it can't be used with "
+                               "--feature-store or --partitions-dir.")
 
     results_to = check_directory_exists(results_to)
     plots_to = check_directory_exists(plots_to)
 
-    # Prepare the test set
-    test_data = pd.read_csv(test_path)
-    X_test = test_data.drop(columns=["satisfaction"])
-    y_test = test_data["satisfaction"].values.ravel()
-
-    # Predict and evaluate on the test set
     final_model = pickle.load(open(pipeline, "rb"))
-    y_test_pred = final_model.predict(X_test)
-    evaluate_model(y_test, y_test_pred, results_to)
-    plot_save_confusion_matrix(y_test, y_test_pred, final_model, plots_to)
+
+    # Derive the seed of the evaluation stage, every bootstrap uses it
+    evaluation_seed = stage_seed(seed, "evaluation")
+
+    # The test set only needs the model columns and the rows matching the filters
+    filters = [parse_filter(text) for text in filters]
+
+    if partitions_dir is not None:
+        # Score the new partitions and merge their confusion matrices with the recorded ones
+        cm, classes = evaluate_partitions(final_model, pipeline, partitions_dir, results_to,
+                                          slice_by=slice_by, n_jobs=n_jobs)
+        evaluate_model(None, None, results_to, cm=cm, classes=classes, n_bootstrap=bootstrap,
+                       confidence_level=confidence_level, random_state=evaluation_seed)
+        counts = None
+    elif chunk_size is None and feature_store is None:
+        # Prepare the test set
+        test_data = read_data(test_path, columns=MODEL_COLUMNS, filters=filters)
+        X_test = test_data.drop(columns=["satisfaction"])
+        y_test = test_data["satisfaction"].values.ravel()
+
+        # Predict the probabilities once, the labels and the threshold sweep both use them
+        proba = final_model.predict_proba(X_test)
+        y_test_pred = predict_from_proba(final_model, proba)
+        cm, classes = evaluate_model(y_test, y_test_pred, results_to, n_bootstrap=bootstrap,
+                                     confidence_level=confidence_level, random_state=evaluation_seed)
+        counts = threshold_counts(y_test, positive_scores(proba, final_model.classes_), decimals=THRESHOLD_DECIMALS)
+
+        # Rank the segments of the test set by their metric gap
+        if slice_analysis is not None:
+            save_slice_analysis(y_test, y_test_pred, X_test, results_to, metric=slice_analysis)
+    else:
+        # Predict chunk by chunk, only keeping the running confusion matrix and the counts of every score and slice
+        # The feature store has no raw features, so it has no slices
+        if feature_store is not None:
+            batches = (
+                (proba, y_chunk, None)
+                for proba, y_chunk in store_predictions(final_model, feature_store, batch_size=chunk_size or 100_000)
+            )
+        else:
+            batches = (
+                (final_model.predict_proba(chunk.drop(columns=["satisfaction"])), chunk["satisfaction"].values.ravel(),
+                 chunk)
+                for chunk in read_data(test_path, columns=MODEL_COLUMNS, filters=filters, chunksize=chunk_size)
+            )
+
+        cm, classes, counts, slice_counts = None, final_model.classes_, None, None
+        for proba, y_chunk, X_chunk in batches:
+            y_chunk_pred = predict_from_proba(final_model, proba)
+            cm = accumulate_confusion_matrix(cm, y_chunk, y_chunk_pred, classes)
+            counts = threshold_counts(y_chunk, positive_scores(proba, classes), counts=counts,
+                                      decimals=THRESHOLD_DECIMALS)
+            if slice_analysis is not None:
+                slice_counts = merge_slice_counts(slice_counts, slice_outcome_counts(y_chunk, y_chunk_pred, X_chunk))
+        evaluate_model(None, None, results_to, cm=cm, classes=classes, n_bootstrap=bootstrap,
+                       confidence_level=confidence_level, random_state=evaluation_seed)
+
+        # Rank the segments of the test set from the counts of all the chunks
+        if slice_analysis is not None:
+            save_slice_analysis(None, None, None, results_to, metric=slice_analysis, counts=slice_counts)
+
+    # Draw the confusion matrix in the background
+    submit_figure(plot_save_confusion_matrix, None, None, list(final_model.classes_), plots_to, cm=cm)
+
+    # Sweep every decision threshold from the counts of the test scores, the partitioned mode has no scores
+    if counts is not None:
+        curve_save_path = results_to / "threshold_curve.csv"
+        threshold_curve_from_counts(counts).to_csv(curve_save_path, index=False)
+        print(f"Threshold curve saved in the directory: \033[1m{curve_save_path}\033[0m\n")
 
 
 if __name__ == "__main__":
     try:
-        main(standalone_mode=False)  # Prevents sys.exit()
+        # The figures are drawn in the background and waited for at exit
+        with render_pool():
+            main(standalone_mode=False)  # Prevents sys.exit()
         print("Congratulations! Model Evaluation Done!")
     except Exception as e:
         print(f"The following error occurred: {e}")
@@ -1,5 +1,4 @@
 import click
-import numpy as np
 import pandas as pd
 import pickle
 import matplotlib.pyplot as plt
@@ -10,10 +9,20 @@ from sklearn.metrics import make_scorer, precision_score, recall_score, f1_score
 from pathlib import Path
 import sys
 import os
+import tempfile
 import requests
+from joblib import Memory
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.save_cv_results_plot import save_cv_results_plot
-from src.create_scorer import create_scorer
+from src.seeding import ROOT_SEED, stage_seed
+from src.create_scorer import create_scorer, create_multi_metric_scorer, METRIC_NAMES
+from src.parallel_backend import BACKENDS, parallel_search_backend, share_frame
+from src.out_of_core_training import iter_csv_chunks, fit_out_of_core_pipeline
+from src.histogram_tree import HistogramBinner, HistogramTreeClassifier
+from src.model_zoo import load_model_zoo_config, tune_model_zoo
+from src.data_preprocessing import RAW_COLUMNS, read_data
+from src.render_pool import render_pool, submit_figure
+from src.threshold_tuning import THRESHOLD_METRICS, threshold_curve, choose_threshold, out_of_fold_scores, ThresholdClassifier
 
 
 
@@ -32,98 +41,236 @@ from src.create_scorer import create_scorer
                 type=click.Choice(['accuracy', 'precision', 'recall', 'f1'], case_sensitive=False),
                 help='Evaluation metric to use for cross-validation'   
               )
+@click.option('--refit-metric',
+              type=click.Choice(['accuracy', 'precision', 'recall', 'f1'], case_sensitive=False),
+              help='Metric choosing the refitted model, all the metrics are computed in the same search. '
+                   'Defaults to the evaluation metric',
+              default=None)
 @click.option('--plot-save-path',
               type=str,
               help='Path to save the cross-validation results plot')
 @click.option('--cv-results-save-path',
               type=str,
               help='Path to save the cv results dataframe')
-@click.option('--seed', type=int, help="Random seed", default=123)
-def main(preprocessor_path, pipeline_to, train_path, eval_metric, plot_save_path, cv_results_save_path, seed):
+@click.option('--seed', type=int, help="Root random seed, the training stage derives its own seed from it", default=ROOT_SEED)
+@click.option('--backend',
+              type=click.Choice(list(BACKENDS.keys()), case_sensitive=False),
+              help='Execution backend used to run the cross-validation fits',
+              default='process')
+@click.option('--n-jobs',
+              type=int,
+              help='Number of workers, -1 splits all the cores between the workers',
+              default=-1)
+@click.option('--inner-threads',
+              type=int,
+              help='Number of BLAS/OpenMP threads each worker is allowed to use',
+              default=1)
+@click.option('--out-of-core',
+              is_flag=True,
+              help='Stream the training data from disk and fit a histogram-based tree without a grid search')
+@click.option('--chunk-size',
+              type=int,
+              help='Number of rows read at once in out-of-core mode',
+              default=100_000)
+@click.option('--max-depth',
+              type=int,
+              help='Maximum depth of the tree fitted in out-of-core mode',
+              default=12)
+@click.option('--sample-size',
+              type=int,
+              help='Number of rows used to fit the preprocessor and the bins in out-of-core mode',
+              default=100_000)
+@click.option('--estimator',
+              type=click.Choice(['decision-tree', 'histogram-tree'], case_sensitive=False),
+              help='Tree to tune, histogram-tree bins the features once per fold and splits on the bins',
+              default='decision-tree')
+@click.option('--cache-dir',
+              type=click.Path(exists=False, dir_okay=True, file_okay=False, writable=True),
+              help='Directory caching the preprocessed and binned folds, a temporary directory by default',
+              default=None)
+@click.option('--model-zoo',
+              is_flag=True,
+              help='Tune several estimators on shared folds and keep the best one')
+@click.option('--model-config',
+              type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
+              help='JSON file mapping the estimators of the model zoo to their parameter grids',
+              default=None)
+@click.option('--threshold-metric',
+              type=click.Choice(THRESHOLD_METRICS, case_sensitive=False),
+              help='Tune the decision threshold of the best model on its out-of-fold probabilities to maximize this metric',
+              default=None)
+@click.option('--min-precision',
+              type=click.FloatRange(0, 1),
+              help='Minimum precision of the tuned decision threshold',
+              default=None)
+@click.option('--min-recall',
+              type=click.FloatRange(0, 1),
+              help='Minimum recall of the tuned decision threshold',
+              default=None)
+def main(preprocessor_path, pipeline_to, train_path, eval_metric, refit_metric, plot_save_path, cv_results_save_path, seed,
+         backend, n_jobs, inner_threads, out_of_core, chunk_size, max_depth, sample_size, estimator, cache_dir,
+         model_zoo, model_config, threshold_metric, min_precision, min_recall):
     '''
     Fits the Decision Tree Clasifier model, performs hyper-paramter tuning
     and saves the pipeline
     '''
-    # Define a random seed
-    np.random.seed(seed)
+    # Derive the seed of the training stage, every estimator and sample of the stage uses it
+    training_seed = stage_seed(seed, "training")
 
-    # Read the train data
-    train_data = pd.read_csv(train_path)
+    # The metric choosing the best model
+    refit_metric = refit_metric or eval_metric
 
     # Read the preprocessor
     preprocessor = pickle.load(open(preprocessor_path, "rb"))
 
-    # Define and create the eval metric function
-    eval_metric_scorer = create_scorer(eval_metric)
+    # Out-of-core mode, stream the training data from disk and grow a histogram-based tree
+    if out_of_core:
+        final_model = fit_out_of_core_pipeline(
+            iter_csv_chunks(train_path, chunk_size, columns=RAW_COLUMNS),
+            preprocessor,
+            max_depth=max_depth,
+            sample_size=sample_size,
+            random_state=training_seed
+        )
+        cv_results = None
+        print(f"Out-of-core model fitted with a max depth of \033[1m{max_depth}\033[0m\n")
 
-    # Define the maximum depth parameter range to tune
-    max_depth_params = list(range(6, 27, 3))
+    # Model zoo mode, tune several estimators on shared folds in one pool of workers
+    elif model_zoo:
+        train_data = read_data(train_path, columns=RAW_COLUMNS)
+        X_train = share_frame(train_data.drop(columns=['satisfaction']))
+        y_train = train_data['satisfaction']
 
-    # Define the number of cross-validation iterations to do
-    cv = 30 
+        # Cache the preprocessed folds only when asked to, they are shared within the run anyway
+        memory = Memory(cache_dir, verbose=0) if cache_dir is not None else None
 
-    # Create the param grid dictionary
-    param_grid = {
-        'decisiontreeclassifier__max_depth': max_depth_params,  
-    }
+        with parallel_search_backend(backend, n_jobs=n_jobs, inner_threads=inner_threads) as n_workers:
+            final_model, cv_results = tune_model_zoo(
+                preprocessor,
+                X_train,
+                y_train,
+                zoo=load_model_zoo_config(model_config),
+                scorer=create_scorer(refit_metric),
+                cv=30,
+                n_jobs=n_workers,
+                memory=memory,
+                random_state=training_seed
+            )
 
-    # Make the pipeline using the preprocessor and DecisionTreeClassifier
-    dt_pipe = make_pipeline(preprocessor, DecisionTreeClassifier(random_state=123))
+        best = cv_results.iloc[0]
+        print(f"Best model: \033[1m{best['model']} {best['params']}\033[0m "
+              f"with a mean validation {refit_metric} of {best['mean_val_score']:.4f}\n")
 
-    # Instantiate the GridSearchCV class and add the attributes
-    grid_search = GridSearchCV(
-        estimator=dt_pipe,
-        param_grid=param_grid,
-        scoring=eval_metric_scorer,  
-        cv=cv,  
-        n_jobs=-1,  
-        return_train_score=True 
-    )
+        # Produce and save the cv results plot of every estimator parameter in the background
+        submit_figure(save_cv_results_plot, cv_results=cv_results, eval_metric=refit_metric,
+                      plot_save_path=plot_save_path)
 
-    # Prepare the features and the target variable 
-    X_train = train_data.drop(columns=['satisfaction'])
-    y_train = train_data['satisfaction']
+    else:
+        # Read the train data
+        train_data = read_data(train_path, columns=RAW_COLUMNS)
 
-    # Fit the grid search
-    grid_search.fit(X_train, y_train)
-    
-    # Take the best performing model
-    final_model = grid_search.best_estimator_
-
-    # Convert cv results to a dataframe
-    cv_results = pd.DataFrame(grid_search.cv_results_)
-
-    # Take only the mean scores and std for both validation and train sets
-    # Calculate the standard error of the mean score across the folds
-    cv_results = cv_results[[
-            "param_decisiontreeclassifier__max_depth",
-            "mean_test_score",
-            "std_test_score",
-            "mean_train_score",
-            "std_train_score"
-        ]].assign(
-        se_val_score=cv_results.std_test_score / cv**0.5,
-        se_train_score=cv_results.std_train_score / cv**0.5
-        )
-    
-    # Rename the 'test' to 'validation'
-    cv_results = cv_results.rename({"mean_test_score":"mean_val_score", 
-                                    "std_test_score":"std_val_score"}, 
-                                    axis=1)
+        # Define and create the scorer computing every metric from one prediction per fold
+        eval_metric_scorer = create_multi_metric_scorer()
+
+        # Define the maximum depth parameter range to tune
+        max_depth_params = list(range(6, 27, 3))
+
+        # Define the number of cross-validation iterations to do
+        cv = 30 
+
+        # Cache the fitted transformers of every fold, all the max depths of a fold reuse them
+        tmp_cache = tempfile.TemporaryDirectory() if cache_dir is None else None
+        memory = Memory(cache_dir if cache_dir is not None else tmp_cache.name, verbose=0)
+
+        # Make the pipeline using the preprocessor and the tree
+        # The histogram tree gets the uint8 bin codes of a separate (cached) binning step
+        if estimator == 'histogram-tree':
+            model_pipe = make_pipeline(preprocessor, HistogramBinner(), HistogramTreeClassifier(prebinned=True),
+                                       memory=memory)
+        else:
+            model_pipe = make_pipeline(preprocessor, DecisionTreeClassifier(random_state=training_seed), memory=memory)
+
+        # Create the param grid dictionary
+        estimator_step = model_pipe.steps[-1][0]
+        param_column = f"param_{estimator_step}__max_depth"
+        param_grid = {
+            f'{estimator_step}__max_depth': max_depth_params,
+        }
 
-    # Produce and save the cv results plot
-    save_cv_results_plot(cv_results=cv_results, eval_metric=eval_metric, plot_save_path=plot_save_path)
+        # Prepare the features and the target variable
+        # The string columns are stored as categories so the workers get the features memory-mapped
+        X_train = share_frame(train_data.drop(columns=['satisfaction']))
+        y_train = train_data['satisfaction']
 
-    # If the cv results save path is not a Path class, make it
-    if not isinstance(cv_results_save_path, Path):
-        cv_results_save_path = Path(cv_results_save_path)
+        # Fit the grid search with the chosen backend, the inner thread pools are pinned
+        with parallel_search_backend(backend, n_jobs=n_jobs, inner_threads=inner_threads) as n_workers:
+
+            # Instantiate the GridSearchCV class and add the attributes
+            grid_search = GridSearchCV(
+                estimator=model_pipe,
+                param_grid=param_grid,
+                scoring=eval_metric_scorer,
+                refit=refit_metric,
+                cv=cv,
+                n_jobs=n_workers,
+                return_train_score=True
+            )
+
+            grid_search.fit(X_train, y_train)
     
-    # If the path doesn't exist, create it
-    if not cv_results_save_path.exists():
-        cv_results_save_path.mkdir(parents=True, exist_ok=True)
+        # Take the best performing model, the cache is only needed during the search
+        final_model = grid_search.best_estimator_.set_params(memory=None)
+        if tmp_cache is not None:
+            tmp_cache.cleanup()
+
+        # Convert cv results to a dataframe
+        cv_results = pd.DataFrame(grid_search.cv_results_)
+
+        # Take only the mean scores and std for both validation and train sets, the refit metric first
+        # Calculate the standard error of the mean score across the folds
+        metric_columns = {}
+        for metric in [refit_metric] + [metric for metric in METRIC_NAMES if metric != refit_metric]:
+            suffix = "score" if metric == refit_metric else metric
+            metric_columns.update({
+                f"mean_val_{suffix}": cv_results[f"mean_test_{metric}"],
+                f"std_val_{suffix}": cv_results[f"std_test_{metric}"],
+                f"mean_train_{suffix}": cv_results[f"mean_train_{metric}"],
+                f"std_train_{suffix}": cv_results[f"std_train_{metric}"],
+                f"se_val_{suffix}": cv_results[f"std_test_{metric}"] / cv**0.5,
+                f"se_train_{suffix}": cv_results[f"std_train_{metric}"] / cv**0.5,
+            })
+        cv_results = pd.concat([cv_results[[param_column]], pd.DataFrame(metric_columns)], axis=1)
+
+        # Produce and save the cv results plot in the background
+        submit_figure(save_cv_results_plot, cv_results=cv_results, eval_metric=refit_metric,
+                      plot_save_path=plot_save_path, param_column=param_column)
+
+    # Tune the decision threshold on the out-of-fold probabilities of the best model
+    curve = None
+    if threshold_metric is not None and out_of_core:
+        print("The decision threshold is not tuned in out-of-core mode\n")
+    elif threshold_metric is not None:
+        with parallel_search_backend(backend, n_jobs=n_jobs, inner_threads=inner_threads) as n_workers:
+            scores = out_of_fold_scores(final_model, X_train, y_train, cv=30, n_jobs=n_workers)
+        curve = threshold_curve(y_train, scores)
+        threshold = choose_threshold(curve, threshold_metric, min_precision=min_precision, min_recall=min_recall)
+        final_model = ThresholdClassifier(final_model, threshold=threshold)
+        print(f"Decision threshold tuned on the {threshold_metric}: \033[1m{threshold:.4f}\033[0m\n")
+
+    # Save the cv results table, the out-of-core mode has none
+    if cv_results is not None:
+
+        # If the cv results save path is not a Path class, make it
+        if not isinstance(cv_results_save_path, Path):
+            cv_results_save_path = Path(cv_results_save_path)
+
+        # If the path doesn't exist, create it
+        if not cv_results_save_path.exists():
+            cv_results_save_path.mkdir(parents=True, exist_ok=True)
 
-    # Save cv results table
-    cv_results.to_csv(cv_results_save_path / "cv_results.csv", index=False)
+        cv_results.to_csv(cv_results_save_path / "cv_results.csv", index=False)
+        if curve is not None:
+            curve.to_csv(cv_results_save_path / "threshold_curve.csv", index=False)
 
     # If the path is not a Path class, make it
     if not isinstance(pipeline_to, Path):
@@ -144,7 +291,9 @@ def main(preprocessor_path, pipeline_to, train_path, eval_metric, plot_save_path
 
 if __name__ == "__main__":
     try:
-        main(standalone_mode=False)  # Prevents sys.exit()
+        # The figures are drawn in the background and waited for at exit
+        with render_pool():
+            main(standalone_mode=False)  # Prevents sys.exit()
         print("Congratulations! Model Training Done!\n")
     except Exception as e:
         print(f"The following error occurred: {e}")
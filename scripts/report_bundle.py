@@ -0,0 +1,61 @@
+import click
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.report_bundle import build_report_bundle, save_report_bundle
+
+
+@click.command()
+@click.option(
+    "--tables-from",
+    type=click.Path(exists=True, dir_okay=True, file_okay=False, readable=True),
+    help="Directory path of the result tables",
+)
+@click.option(
+    "--figures-from",
+    type=click.Path(exists=True, dir_okay=True, file_okay=False, readable=True),
+    help="Directory path of the result figures",
+)
+@click.option(
+    "--data-path",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, readable=True),
+    default=None,
+    help="File path to the dataset whose shape is reported, a CSV file",
+)
+@click.option(
+    "--bundle-to",
+    type=click.Path(exists=False, dir_okay=False, file_okay=True, writable=True),
+    help="File path to save the JSON report bundle to",
+)
+def main(tables_from, figures_from, data_path, bundle_to):
+    """
+    Collects the tables, metrics and figure hashes of the report into one JSON bundle,
+    so the report is rendered from it instead of re-reading the results.
+
+    Parameters
+    ----------
+    tables_from : str
+        Directory path of the result tables.
+    figures_from : str
+        Directory path of the result figures.
+    data_path : str or None
+        File path to the dataset, None leaves its shape out of the bundle.
+    bundle_to : str
+        File path of the JSON bundle.
+
+    Returns
+    -------
+    None
+        The bundle is saved to `bundle_to`, unless the file already holds the same bundle.
+    """
+    bundle = build_report_bundle(tables_from, figures_from, data_path=data_path)
+    save_report_bundle(bundle, bundle_to)
+
+
+if __name__ == "__main__":
+    try:
+        main(standalone_mode=False)  # Prevents sys.exit()
+    except Exception as e:
+        print(f"The following error occurred: {e}")
+        sys.exit(1)
@@ -0,0 +1,86 @@
+import pandas as pd
+from sklearn.base import clone
+from sklearn.preprocessing import OneHotEncoder
+
+
+def _category_frame(prototype, categories):
+    """Repeats a row enough times to hold every category of every one-hot encoded column."""
+    n_rows = max([len(prototype)] + [len(values) for values in categories.values()])
+    frame = prototype.iloc[[i % len(prototype) for i in range(n_rows)]].reset_index(drop=True)
+    for column, values in categories.items():
+        frame[column] = pd.Series([values[i % len(values)] for i in range(n_rows)], dtype=prototype[column].dtype)
+
+    return frame
+
+
+def fit_preprocessor_in_chunks(preprocessor, chunks):
+    """
+    Fits a column transformer on data streamed in chunks, with the parameters of an in-memory fit.
+
+    - The scalers (`MinMaxScaler`, `StandardScaler` and any transformer having `partial_fit`)
+      accumulate their statistics with `partial_fit`, e.g. the running min/max or the
+      running mean and variance.
+    - The `OneHotEncoder` columns accumulate their sets of categories.
+
+    The column transformer is then fitted on a few rows holding every category, which gives
+    it the structure of the full fit, and the scalers are swapped for the ones fitted on
+    all the chunks.
+
+    Parameters
+    ----------
+    preprocessor : sklearn.compose.ColumnTransformer
+        The unfitted column transformer.
+    chunks : iterable of pd.DataFrame
+        The training data, chunk by chunk.
+
+    Returns
+    -------
+    sklearn.compose.ColumnTransformer
+        The fitted column transformer.
+
+    Raises
+    ------
+    ValueError
+        If a transformer cannot be fitted in chunks or there are no rows.
+
+    Notes
+    -----
+    The `StandardScaler` variance is accumulated in chunks, so it matches the in-memory
+    fit up to floating point rounding.
+    """
+    if not isinstance(preprocessor.remainder, str):
+        raise ValueError("The remainder of the column transformer should be 'drop' or 'passthrough'.")
+
+    scalers, categories = {}, {}
+    prototype = None
+
+    for chunk in chunks:
+        if prototype is None:
+            prototype = chunk.iloc[:1]
+
+        for name, transformer, columns in preprocessor.transformers:
+            if isinstance(transformer, str):
+                continue
+            if isinstance(transformer, OneHotEncoder):
+                if transformer.categories != "auto" or transformer.min_frequency is not None \
+                        or transformer.max_categories is not None:
+                    raise ValueError(f"The OneHotEncoder '{name}' should use the default categories "
+                                     f"without infrequent categories to be fitted in chunks.")
+                for column in columns:
+                    seen = categories.get(column, pd.Series(dtype=chunk[column].dtype))
+                    categories[column] = pd.Series(pd.unique(pd.concat([seen, chunk[column]])))
+            elif hasattr(transformer, "partial_fit"):
+                scalers.setdefault(name, clone(transformer)).partial_fit(chunk[columns])
+            else:
+                raise ValueError(f"The transformer '{name}' cannot be fitted in chunks.")
+
+    if prototype is None:
+        raise ValueError("The data doesn't contain any rows.")
+
+    # Fit the structure on rows holding every category, then swap the scalers fitted on all the chunks
+    preprocessor.fit(_category_frame(prototype, {column: list(values) for column, values in categories.items()}))
+    preprocessor.transformers_ = [
+        (name, scalers.get(name, transformer), columns) for name, transformer, columns in preprocessor.transformers_
+    ]
+
+    return preprocessor
@@ -0,0 +1,316 @@
+import numpy as np
+
+
+def encode_labels(y, classes):
+    """
+    Encodes labels to their integer index in a sorted array of classes.
+
+    Parameters
+    ----------
+    y : pd.Series or np.ndarray
+        The 1D array of labels.
+    classes : np.ndarray
+        The sorted array of the possible labels.
+
+    Returns
+    -------
+    np.ndarray
+        The index of every label in `classes`.
+
+    Raises
+    ------
+    ValueError
+        If `y` is not 1D or contains labels missing from `classes`.
+    """
+    y = np.asarray(y)
+    if y.ndim != 1:
+        raise ValueError("The labels should be a 1d array-like.")
+
+    codes = np.searchsorted(classes, y)
+    if len(y) and (codes.max() >= len(classes) or not np.array_equal(np.asarray(classes)[codes], y)):
+        raise ValueError(f"The labels contain values missing from the classes {list(classes)}.")
+
+    return codes
+
+
+def confusion_counts(y_obs, y_pred, classes=None):
+    """
+    Computes the confusion matrix with a single `np.bincount` over the encoded labels.
+
+    Parameters
+    ----------
+    y_obs : pd.Series or np.ndarray
+        The true labels.
+    y_pred : pd.Series or np.ndarray
+        The predicted labels.
+    classes : np.ndarray or None, optional
+        The sorted classes indexing the rows and columns. None uses the labels found in
+        `y_obs` and `y_pred`, like `sklearn.metrics.confusion_matrix`.
+
+    Returns
+    -------
+    tuple
+        The confusion matrix (rows are the true classes, columns the predicted ones) and the classes.
+
+    Raises
+    ------
+    ValueError
+        If the inputs are not 1D, have different lengths or contain unknown labels.
+
+    Examples
+    --------
+    >>> confusion_counts(["a", "b", "b"], ["a", "a", "b"])
+    (array([[1, 0],
+           [1, 1]]), array(['a', 'b'], dtype='<U1'))
+    """
+    y_obs, y_pred = np.asarray(y_obs), np.asarray(y_pred)
+    if y_obs.ndim != 1 or y_pred.ndim != 1:
+        raise ValueError("y_obs and y_pred should be 1d array-likes.")
+    if len(y_obs) != len(y_pred):
+        raise ValueError(f"y_obs and y_pred have different lengths: {len(y_obs)} and {len(y_pred)}.")
+
+    if classes is None:
+        classes = np.unique(np.concatenate([y_obs, y_pred]))
+    classes = np.asarray(classes)
+
+    n_classes = len(classes)
+    cells = encode_labels(y_obs, classes) * n_classes + encode_labels(y_pred, classes)
+    cm = np.bincount(cells, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+
+    return cm, classes
+
+
+def accumulate_confusion_matrix(cm, y_obs, y_pred, classes):
+    """
+    Adds the confusion matrix of one chunk of predictions to a running total.
+
+    Parameters
+    ----------
+    cm : np.ndarray or None
+        The running confusion matrix, None for the first chunk.
+    y_obs : pd.Series or np.ndarray
+        The true labels of the chunk.
+    y_pred : pd.Series or np.ndarray
+        The predicted labels of the chunk.
+    classes : np.ndarray
+        The sorted classes, fixed for all the chunks.
+
+    Returns
+    -------
+    np.ndarray
+        The updated confusion matrix.
+    """
+    chunk_cm, _ = confusion_counts(y_obs, y_pred, classes)
+
+    return chunk_cm if cm is None else cm + chunk_cm
+
+
+def _divide(numerator, denominator):
+    """Divides element-wise, returning 0 where the denominator is 0 like scikit-learn does."""
+    numerator, denominator = np.asarray(numerator, dtype=np.float64), np.asarray(denominator, dtype=np.float64)
+
+    return np.divide(numerator, denominator, out=np.zeros(np.broadcast(numerator, denominator).shape),
+                     where=denominator != 0)
+
+
+def per_class_scores(cm):
+    """
+    Computes the precision, recall, F1-score and support of every class from a confusion matrix.
+
+    Parameters
+    ----------
+    cm : np.ndarray
+        The confusion matrix, rows are the true classes and columns the predicted ones.
+        Extra leading dimensions (e.g. bootstrap resamples) are supported.
+
+    Returns
+    -------
+    tuple
+        The precision, recall, F1-score and support arrays, one value per class.
+    """
+    cm = np.asarray(cm)
+    true_positives = np.diagonal(cm, axis1=-2, axis2=-1)
+    support = cm.sum(axis=-1)
+    predicted = cm.sum(axis=-2)
+
+    precision = _divide(true_positives, predicted)
+    recall = _divide(true_positives, support)
+    f1 = _divide(2 * true_positives, support + predicted)
+
+    return precision, recall, f1, support
+
+
+def metrics_from_confusion(cm, classes, pos_label="satisfied"):
+    """
+    Derives the test scores of a binary classifier from its confusion matrix.
+
+    Parameters
+    ----------
+    cm : np.ndarray
+        The confusion matrix.
+    classes : np.ndarray
+        The classes indexing the confusion matrix.
+    pos_label : str, optional
+        The positive class, by default "satisfied".
+
+    Returns
+    -------
+    dict
+        The "Accuracy", "Recall", "Precision" and "F1-Score" values.
+
+    Raises
+    ------
+    ValueError
+        If there are more than two classes or `pos_label` is not one of them.
+    """
+    classes = list(classes)
+    if len(classes) > 2:
+        raise ValueError(f"The target is multiclass, the classes are {classes}.")
+    if pos_label not in classes:
+        raise ValueError(f"pos_label={pos_label} is not a valid label. It should be one of {classes}.")
+
+    precision, recall, f1, support = per_class_scores(cm)
+    pos = classes.index(pos_label)
+
+    return {
+        "Accuracy": float(_divide(np.trace(cm), support.sum())),
+        "Recall": float(recall[pos]),
+        "Precision": float(precision[pos]),
+        "F1-Score": float(f1[pos]),
+    }
+
+
+def classification_report_from_confusion(cm, classes):
+    """
+    Builds the dictionary of `sklearn.metrics.classification_report(..., output_dict=True)`
+    from a confusion matrix.
+
+    Parameters
+    ----------
+    cm : np.ndarray
+        The confusion matrix.
+    classes : np.ndarray
+        The classes indexing the confusion matrix.
+
+    Returns
+    -------
+    dict
+        The per-class precision, recall, F1-score and support, the accuracy, and the
+        macro and weighted averages.
+    """
+    precision, recall, f1, support = per_class_scores(cm)
+    scores = np.vstack([precision, recall, f1])
+
+    report = {
+        str(label): {"precision": p, "recall": r, "f1-score": f, "support": int(s)}
+        for label, p, r, f, s in zip(classes, precision, recall, f1, support)
+    }
+    report["accuracy"] = float(_divide(np.trace(cm), support.sum()))
+
+    macro = scores.mean(axis=1)
+    weighted = _divide((scores * support).sum(axis=1), support.sum())
+    for name, averages in (("macro avg", macro), ("weighted avg", weighted)):
+        report[name] = {
+            "precision": float(averages[0]),
+            "recall": float(averages[1]),
+            "f1-score": float(averages[2]),
+            "support": int(support.sum()),
+        }
+
+    return report
+
+
+def bootstrap_confusion_matrices(cm, n_resamples=2000, random_state=None):
+    """
+    Draws the confusion matrices of bootstrap resamples of the predictions.
+
+    Resampling the rows with replacement only changes how many rows fall in every cell of
+    the confusion matrix, and these counts follow a multinomial distribution with the cell
+    proportions as probabilities. All the resamples are drawn at once from it, without
+    building any index matrix.
+
+    Parameters
+    ----------
+    cm : np.ndarray
+        The confusion matrix of the predictions.
+    n_resamples : int, optional
+        The number of bootstrap resamples, by default 2,000.
+    random_state : int or None, optional
+        The seed of the resamples.
+
+    Returns
+    -------
+    np.ndarray
+        The confusion matrices of the resamples, of shape `(n_resamples, n_classes, n_classes)`.
+
+    Raises
+    ------
+    ValueError
+        If the confusion matrix is empty or `n_resamples` is not positive.
+    """
+    cm = np.asarray(cm)
+    n_rows = int(cm.sum())
+    if n_rows == 0:
+        raise ValueError("The confusion matrix doesn't contain any predictions.")
+    if n_resamples < 1:
+        raise ValueError("n_resamples should be a positive integer.")
+
+    rng = np.random.default_rng(random_state)
+    counts = rng.multinomial(n_rows, cm.ravel() / n_rows, size=n_resamples)
+
+    return counts.reshape((n_resamples,) + cm.shape)
+
+
+def bootstrap_metric_intervals(cm, classes, pos_label="satisfied", n_resamples=2000, confidence_level=0.95,
+                               random_state=None):
+    """
+    Computes percentile bootstrap confidence intervals of the test scores.
+
+    Parameters
+    ----------
+    cm : np.ndarray
+        The confusion matrix of the predictions.
+    classes : np.ndarray
+        The classes indexing the confusion matrix.
+    pos_label : str, optional
+        The positive class, by default "satisfied".
+    n_resamples : int, optional
+        The number of bootstrap resamples, by default 2,000.
+    confidence_level : float, optional
+        The confidence level of the intervals, by default 0.95.
+    random_state : int or None, optional
+        The seed of the resamples.
+
+    Returns
+    -------
+    dict
+        The lower and upper bounds of the "Accuracy", "Recall", "Precision" and "F1-Score"
+        intervals, as `{"lower": {...}, "upper": {...}}`.
+
+    Raises
+    ------
+    ValueError
+        If `confidence_level` is not between 0 and 1, or the classes are not valid.
+    """
+    if not 0 < confidence_level < 1:
+        raise ValueError("confidence_level should be between 0 and 1.")
+
+    # Checks the classes like the point estimates
+    metrics_from_confusion(cm, classes, pos_label)
+    pos = list(classes).index(pos_label)
+
+    # Computes the scores of all the resamples at once
+    cms = bootstrap_confusion_matrices(cm, n_resamples, random_state)
+    precision, recall, f1, support = per_class_scores(cms)
+    resampled_scores = {
+        "Accuracy": _divide(np.trace(cms, axis1=1, axis2=2), support.sum(axis=1)),
+        "Recall": recall[:, pos],
+        "Precision": precision[:, pos],
+        "F1-Score": f1[:, pos],
+    }
+
+    alpha = (1 - confidence_level) / 2
+    return {
+        "lower": {name: float(np.quantile(scores, alpha)) for name, scores in resampled_scores.items()},
+        "upper": {name: float(np.quantile(scores, 1 - alpha)) for name, scores in resampled_scores.items()},
+    }
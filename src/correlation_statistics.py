@@ -0,0 +1,232 @@
+import hashlib
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# The number of rows multiplied at once, bounding the float64 copies of a chunk
+CORRELATION_BLOCK_SIZE = 50_000
+
+# The sufficient statistics of every pair of columns, accumulated over the rows where both are present
+STATISTICS = ["n", "sum", "sum_squares", "sum_products"]
+
+
+def correlation_columns(data, target_column=None, target_classes=None, integer_columns=False):
+    """
+    Selects the columns whose correlations are computed: the float columns, optionally
+    the integer columns, and one indicator column per class of the target.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        One chunk of data.
+    target_column : str or None, optional
+        The target column, by default None which leaves the target out.
+    target_classes : list or None, optional
+        The classes of the target, by default the sorted classes of the chunk. They must
+        be fixed when the data comes in several chunks.
+    integer_columns : bool, optional
+        Whether the integer columns are selected too, e.g. the one-hot columns of the
+        categorical features. By default False.
+
+    Returns
+    -------
+    pd.DataFrame
+        The selected columns and the "<target>=<class>" indicator columns, as float64.
+    """
+    dtypes = ["float", "integer"] if integer_columns else ["float"]
+    values = data.select_dtypes(include=dtypes).drop(columns=[target_column], errors="ignore")
+    if target_column is not None:
+        target = data[target_column]
+        classes = sorted(target.dropna().unique()) if target_classes is None else target_classes
+        indicators = {f"{target_column}={label}": (target == label).where(target.notna()) for label in classes}
+        values = values.assign(**indicators)
+
+    return values.astype(np.float64)
+
+
+def data_hash(data):
+    """
+    Hashes the column names and the values of a dataframe, ignoring its index.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The data.
+
+    Returns
+    -------
+    str
+        The SHA-256 hex digest of the data.
+    """
+    digest = hashlib.sha256("\x1f".join(map(str, data.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+
+    return digest.hexdigest()
+
+
+def block_statistics(values, block_size=CORRELATION_BLOCK_SIZE):
+    """
+    Accumulates the sufficient statistics of the pairwise correlations of a block of rows.
+
+    Every statistic is a matrix of matrix products over the rows, the missing values are
+    masked so that entry (i, j) only counts the rows where both columns are present:
+    the count `n`, the `sum` of column i, the `sum_squares` of column i and the
+    `sum_products` of both columns.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The rows, as a float64 array with NaN for the missing values.
+    block_size : int, optional
+        The number of rows multiplied at once, by default `CORRELATION_BLOCK_SIZE`.
+
+    Returns
+    -------
+    dict
+        The `STATISTICS` matrices.
+    """
+    n_columns = values.shape[1]
+    statistics = {name: np.zeros((n_columns, n_columns)) for name in STATISTICS}
+    for start in range(0, len(values), block_size):
+        block = values[start:start + block_size]
+        present = (~np.isnan(block)).astype(np.float64)
+        block = np.where(present > 0, block, 0.0)
+        statistics["n"] += present.T @ present
+        statistics["sum"] += block.T @ present
+        statistics["sum_squares"] += (block * block).T @ present
+        statistics["sum_products"] += block.T @ block
+
+    return statistics
+
+
+def update_correlation_statistics(statistics, chunks, block_size=CORRELATION_BLOCK_SIZE, cache_dir=None):
+    """
+    Adds new chunks of data to the sufficient statistics of the correlations.
+
+    The statistics of every chunk are cached under the hash of the chunk, so a chunk
+    already seen, e.g. the old chunks of a dataset which grew, is loaded instead of
+    multiplied again.
+
+    Parameters
+    ----------
+    statistics : dict
+        The statistics of the previous chunks, see `correlation_statistics`.
+    chunks : iterable of pd.DataFrame
+        The new chunks, with the columns of the statistics.
+    block_size : int, optional
+        The number of rows multiplied at once, by default `CORRELATION_BLOCK_SIZE`.
+    cache_dir : str, pathlib.Path or None, optional
+        The directory caching the statistics of every chunk, by default None which
+        doesn't cache them.
+
+    Returns
+    -------
+    dict
+        The statistics of the previous and the new chunks.
+
+    Raises
+    ------
+    ValueError
+        If a chunk doesn't have the columns of the statistics.
+    """
+    if cache_dir is not None:
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+    statistics = {**statistics, "hashes": list(statistics["hashes"]),
+                  **{name: statistics[name].copy() for name in STATISTICS}}
+    for chunk in chunks:
+        if list(chunk.columns) != statistics["columns"]:
+            raise ValueError(f"The chunk has the columns {list(chunk.columns)} instead of {statistics['columns']}.")
+
+        key = data_hash(chunk)
+        cache_path = cache_dir / f"{key}.npz" if cache_dir is not None else None
+        if cache_path is not None and cache_path.exists():
+            with np.load(cache_path) as cached:
+                chunk_statistics = {name: cached[name] for name in STATISTICS}
+        else:
+            chunk_statistics = block_statistics(chunk.to_numpy(dtype=np.float64), block_size)
+            if cache_path is not None:
+                np.savez(cache_path, **chunk_statistics)
+
+        for name in STATISTICS:
+            statistics[name] += chunk_statistics[name]
+        statistics["hashes"].append(key)
+
+    return statistics
+
+
+def correlation_statistics(chunks, block_size=CORRELATION_BLOCK_SIZE, cache_dir=None):
+    """
+    Accumulates the sufficient statistics of the pairwise correlations of numeric data in one pass.
+
+    Parameters
+    ----------
+    chunks : iterable of pd.DataFrame
+        The numeric data, chunk by chunk, e.g. the output of `correlation_columns`.
+    block_size : int, optional
+        The number of rows multiplied at once, by default `CORRELATION_BLOCK_SIZE`.
+    cache_dir : str, pathlib.Path or None, optional
+        The directory caching the statistics of every chunk, by default None.
+
+    Returns
+    -------
+    dict
+        The "columns", the "hashes" of the chunks and the `STATISTICS` matrices, see
+        `block_statistics`. New chunks are added with `update_correlation_statistics`.
+
+    Raises
+    ------
+    ValueError
+        If there are no chunks.
+    """
+    chunks = iter(chunks)
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        raise ValueError("The data doesn't contain any chunks.")
+
+    n_columns = first_chunk.shape[1]
+    empty = {"columns": list(first_chunk.columns), "hashes": [],
+             **{name: np.zeros((n_columns, n_columns)) for name in STATISTICS}}
+
+    return update_correlation_statistics(empty, chain([first_chunk], chunks), block_size, cache_dir)
+
+
+def correlation_matrix(statistics, columns=None):
+    """
+    Computes the Pearson correlation matrix from its sufficient statistics.
+
+    Like `pd.DataFrame.corr`, every pair uses the rows where both columns are present,
+    and the correlations with constant columns or of less than two rows are NaN. The
+    variances are differences of raw sums in float64, a variance lost in the rounding of
+    the sum of squares counts as constant.
+
+    Parameters
+    ----------
+    statistics : dict
+        The output of `correlation_statistics`.
+    columns : list of str or None, optional
+        The columns of the matrix, by default all the columns of the statistics.
+
+    Returns
+    -------
+    pd.DataFrame
+        The correlation matrix.
+    """
+    names = statistics["columns"]
+    index = np.arange(len(names)) if columns is None else np.array([names.index(column) for column in columns])
+    n, sums, squares, products = (statistics[name][np.ix_(index, index)] for name in STATISTICS)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = products - sums * sums.T / n
+        variance = squares - sums ** 2 / n
+        correlations = covariance / np.sqrt(variance * variance.T)
+        constant = variance <= 1e-12 * squares
+        correlations[(n < 2) | constant | constant.T] = np.nan
+    np.fill_diagonal(correlations, np.where(np.isnan(np.diag(correlations)), np.nan, 1.0))
+
+    names = [names[i] for i in index]
+
+    return pd.DataFrame(np.clip(correlations, -1, 1), index=names, columns=names)
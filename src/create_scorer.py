@@ -1,7 +1,18 @@
 import pandas as pd
 import numpy as np
+from functools import partial
 from sklearn.metrics import make_scorer, precision_score, recall_score, f1_score, accuracy_score
 
+from src.confusion_metrics import confusion_counts, metrics_from_confusion
+
+# The metrics names of the scorers and their names in `metrics_from_confusion`
+METRIC_NAMES = {
+    'accuracy': 'Accuracy',
+    'precision': 'Precision',
+    'recall': 'Recall',
+    'f1': 'F1-Score'
+}
+
 def create_scorer(eval_metric, pos_label='satisfied'):
     """
     Creates a custom scoring function for model evaluation based on the specified evaluation metric.
@@ -27,5 +38,43 @@ def create_scorer(eval_metric, pos_label='satisfied'):
     if eval_metric not in metrics:
         raise ValueError(f"Invalid metric name. Available metrics are {list(metrics.keys())}.")
     
+    # The accuracy has no positive class
+    if eval_metric == 'accuracy':
+        return make_scorer(accuracy_score)
+
     # Return the scorer
     return make_scorer(metrics[eval_metric], pos_label=pos_label)
+
+
+def _score_all_metrics(estimator, X, y, eval_metrics, pos_label):
+    """Predicts once and computes every metric from the confusion matrix of the predictions."""
+    # The classes come from the estimator, a fold may miss the positive class in both its labels and predictions
+    cm, classes = confusion_counts(y, estimator.predict(X), classes=estimator.classes_)
+    scores = metrics_from_confusion(cm, classes, pos_label=pos_label)
+
+    return {metric: scores[METRIC_NAMES[metric]] for metric in eval_metrics}
+
+
+def create_multi_metric_scorer(eval_metrics=None, pos_label='satisfied'):
+    """
+    Creates a scoring function computing several evaluation metrics from a single `predict` call.
+
+    Parameters:
+    - eval_metrics (list of str, optional): The evaluation metrics to compute, among ['precision', 'recall', 'f1', 'accuracy']. Defaults to all of them.
+    - pos_label (str, optional): The positive class label to consider for metrics like precision, recall, and F1 score. Defaults to 'satisfied'.
+
+    Returns:
+    - callable: A scorer `scorer(estimator, X, y)` returning a dictionary of the scores, accepted as `scoring` by `GridSearchCV` (which then needs `refit` to be one of the metric names).
+
+    Raises:
+    - ValueError: If one of the provided eval_metrics is not valid.
+    """
+    eval_metrics = list(METRIC_NAMES.keys()) if eval_metrics is None else list(eval_metrics)
+
+    # If an eval metric is not in the metrics, raise a value error
+    invalid_metrics = [metric for metric in eval_metrics if metric not in METRIC_NAMES]
+    if invalid_metrics:
+        raise ValueError(f"Invalid metric name {invalid_metrics}. Available metrics are {list(METRIC_NAMES.keys())}.")
+
+    # Return the scorer
+    return partial(_score_all_metrics, eval_metrics=eval_metrics, pos_label=pos_label)
@@ -1,12 +1,72 @@
+import re
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
 
+# The columns renamed after the normalization of their name
+COLUMN_RENAMES = {"departure/arrival_time_convenient": "time_convenient"}
+
+# The columns of the data, by their role in the preprocessor
+ID_COLUMN = "id"
+TARGET_COLUMN = "satisfaction"
+CATEGORICAL_COLUMNS = ['gender', 'customer_type', 'type_of_travel', 'class']
+ORDINAL_COLUMNS = ['inflight_wifi_service', 'time_convenient', 'ease_of_online_booking',
+                   'gate_location', 'food_and_drink', 'online_boarding', 'seat_comfort',
+                   'inflight_entertainment', 'on_board_service', 'leg_room_service',
+                   'baggage_handling', 'checkin_service', 'inflight_service', 'cleanliness']
+NUMERICAL_COLUMNS = ['age', 'flight_distance', 'departure_delay_in_minutes']
+
+# The columns dropped by the preprocessor, the readers feeding a fitted model can skip them
+UNUSED_COLUMNS = [ID_COLUMN, "arrival_delay_in_minutes"]
+
+# The columns read by every stage, the other columns of a wide feed are never parsed
+FEATURE_COLUMNS = CATEGORICAL_COLUMNS + ORDINAL_COLUMNS + NUMERICAL_COLUMNS
+MODEL_COLUMNS = FEATURE_COLUMNS + [TARGET_COLUMN]
+RAW_COLUMNS = UNUSED_COLUMNS + MODEL_COLUMNS
+
+# The operators of the row filters, `(column, operator, value)` tuples
+FILTER_OPERATORS = {
+    "==": lambda column, value: column == value,
+    "!=": lambda column, value: column != value,
+    "<": lambda column, value: column < value,
+    "<=": lambda column, value: column <= value,
+    ">": lambda column, value: column > value,
+    ">=": lambda column, value: column >= value,
+    "in": lambda column, value: column.isin(value),
+    "not in": lambda column, value: ~column.isin(value),
+}
+
+@lru_cache(maxsize=None)
+def normalize_column_name(name):
+    """
+    Normalize one column name, memoized since every reader sees the same few headers.
+
+    Lowercases the name, replaces whitespaces and dashes with underscores, and renames
+    the problematic columns listed in `COLUMN_RENAMES`.
+
+    Parameters:
+    -----------
+    name : str
+        The raw column name.
+
+    Returns:
+    --------
+    str
+        The normalized column name.
+    """
+    name = re.sub(r'\s+', '_', str(name).lower()).replace('-', '_')
+
+    return COLUMN_RENAMES.get(name, name)
+
+
 def clean_column_names(df):
     """
     Clean column names in a pandas DataFrame.
 
     Converts column names to lowercase, replaces spaces/dashes with underscores,
-    and renames specific problematic columns for clarity.
+    and renames specific problematic columns for clarity. The input DataFrame is
+    left untouched and the data is not copied.
 
     Parameters:
     -----------
@@ -25,15 +85,159 @@ def clean_column_names(df):
     """
     if not isinstance(df, pd.DataFrame):
         raise TypeError("Input must be a pandas DataFrame")
-    
-    df.columns = (
-        df.columns
-        .str.lower()
-        .str.replace(r'\s+', '_', regex=True)
-        .str.replace(r'-', '_', regex=True)
-    )
-    df = df.rename({"departure/arrival_time_convenient": "time_convenient"}, axis=1)
-    return df
+
+    return df.set_axis([normalize_column_name(column) for column in df.columns], axis=1, copy=False)
+
+
+def read_header(path):
+    """
+    Read the raw column names of a CSV file, without reading its rows.
+
+    Parameters:
+    -----------
+    path : str or pathlib.Path
+        The CSV file.
+
+    Returns:
+    --------
+    list
+        The raw column names.
+    """
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def parse_filter(text):
+    """
+    Parse a row filter written as "column operator value", e.g. "class == Eco" or "age in 20,30".
+
+    Parameters:
+    -----------
+    text : str
+        The filter.
+
+    Returns:
+    --------
+    tuple
+        The `(column, operator, value)` filter, the numeric values converted to floats and
+        the values of "in" and "not in" split on commas.
+
+    Raises:
+    -------
+    ValueError
+        If the filter is malformed or its operator is unknown.
+    """
+    def parse_value(value):
+        try:
+            return float(value)
+        except ValueError:
+            return value.strip()
+
+    match = re.fullmatch(r'\s*(\S+)\s+(==|!=|<=|>=|<|>|not in|in)\s+(.+?)\s*', text)
+    if match is None:
+        raise ValueError(f"The filter '{text}' should be written as 'column operator value' "
+                         f"with an operator in {list(FILTER_OPERATORS)}.")
+    column, operator, value = match.groups()
+    if operator in ("in", "not in"):
+        return column, operator, [parse_value(item) for item in value.split(",")]
+
+    return column, operator, parse_value(value)
+
+
+def filter_rows(data, filters):
+    """
+    Keep the rows of a DataFrame matching every filter.
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        The data.
+    filters : list of tuple
+        The `(column, operator, value)` filters, see `FILTER_OPERATORS`.
+
+    Returns:
+    --------
+    pd.DataFrame
+        The matching rows.
+    """
+    mask = np.ones(len(data), dtype=bool)
+    for column, operator, value in filters:
+        mask &= FILTER_OPERATORS[operator](data[column], value).to_numpy()
+
+    return data[mask] if not mask.all() else data
+
+
+def _iter_filtered(chunks, filters, keep):
+    """Filter the chunks of a CSV file, then drop the columns only read for the filters, skipping the empty chunks."""
+    for chunk in chunks:
+        filtered = filter_rows(chunk, filters)[keep]
+        if len(filtered):
+            yield filtered
+
+
+def read_data(path, columns=None, exclude=(), optional=(), filters=None, chunksize=None):
+    """
+    Read a CSV file with normalized column names, loading only the needed columns and rows.
+
+    The header row alone is normalized, then the projection is pushed down to the reader,
+    so the skipped columns are never parsed. The row filters are applied to every chunk
+    as soon as it is parsed.
+
+    Parameters:
+    -----------
+    path : str or pathlib.Path
+        The CSV file.
+    columns : list or None, optional
+        The normalized names of the columns to read, all of them by default.
+    exclude : list or tuple, optional
+        The normalized names of columns to skip, e.g. `UNUSED_COLUMNS`.
+    optional : list or tuple, optional
+        The requested columns which may be missing from the file, e.g. the target column
+        of unlabelled data.
+    filters : list of tuple or None, optional
+        The `(column, operator, value)` row filters, see `parse_filter`. Their columns are
+        read even if they are not requested.
+    chunksize : int or None, optional
+        The number of rows of every chunk, None reads the file at once. The filtered chunks
+        can be smaller, and the chunks without a matching row are skipped.
+
+    Returns:
+    --------
+    pd.DataFrame or iterator of pd.DataFrame
+        The data, or an iterator over its chunks when `chunksize` is given. The columns
+        keep the order of the file.
+
+    Raises:
+    -------
+    ValueError
+        If two columns have the same normalized name, a requested column is missing or a
+        filter operator is unknown.
+    """
+    header = read_header(path)
+    names = [normalize_column_name(column) for column in header]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Some columns of {path} have the same normalized name: {names}.")
+
+    filters = list(filters or [])
+    unknown = sorted({operator for _, operator, _ in filters} - set(FILTER_OPERATORS))
+    if unknown:
+        raise ValueError(f"Unknown filter operators {unknown}. Available operators are {list(FILTER_OPERATORS)}.")
+
+    filter_columns = {column for column, _, _ in filters}
+    missing = sorted((set(columns or []) | filter_columns) - set(names) - set(optional))
+    if missing:
+        raise ValueError(f"The columns {missing} are not in {path}.")
+
+    keep = [name for name in names if (columns is None or name in columns) and name not in exclude]
+    read = [name for name in names if name in keep or name in filter_columns]
+
+    # The normalized names replace the header row, and the projection uses them
+    data = pd.read_csv(path, header=0, names=names, usecols=read, chunksize=chunksize)
+    if not filters:
+        return data
+    if chunksize is not None:
+        return _iter_filtered(data, filters, keep)
+
+    return filter_rows(data, filters)[keep].reset_index(drop=True)
 
 
 def correct_precision_after_scaling(df, ordinal_features):
@@ -0,0 +1,438 @@
+import base64
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# The number of bits of the hash choosing a HyperLogLog register, 2**10 registers give a ~3% error
+HLL_PRECISION = 10
+
+# The relative accuracy of the quantile sketch of the numeric columns
+SKETCH_ACCURACY = 0.01
+
+# The columns having more distinct values only keep their quantile sketch and distinct count
+MAX_TRACKED_VALUES = 100
+
+# The quantiles summarizing the numeric columns
+PROFILE_QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+
+
+def profile_path(data_path):
+    """
+    Names the profile saved next to a data file, e.g. `satisfaction_train_profile.json`.
+
+    Parameters
+    ----------
+    data_path : str or pathlib.Path
+        The data file.
+
+    Returns
+    -------
+    pathlib.Path
+        The path of its profile.
+    """
+    data_path = Path(data_path)
+
+    return data_path.with_name(f"{data_path.stem}_profile.json")
+
+
+def _bit_length(values):
+    """Computes the number of significant bits of uint64 values, exactly."""
+    high, low = values >> np.uint64(32), values & np.uint64(0xFFFFFFFF)
+
+    # The 32-bit halves are exact in float64, so the exponent of frexp is their bit length
+    return np.where(high > 0, 32 + np.frexp(high.astype(np.float64))[1], np.frexp(low.astype(np.float64))[1])
+
+
+def hyperloglog_registers(values, precision=HLL_PRECISION):
+    """
+    Computes the HyperLogLog registers of a set of values.
+
+    Every value is hashed to 64 bits: the first `precision` bits choose a register, which
+    keeps the maximum position of the first set bit in the remaining bits. The registers of
+    two sets are merged with an element-wise maximum.
+
+    Parameters
+    ----------
+    values : pd.Series
+        The non-missing values.
+    precision : int, optional
+        The number of bits choosing a register, by default `HLL_PRECISION`.
+
+    Returns
+    -------
+    np.ndarray
+        The `2**precision` uint8 registers.
+    """
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    indices = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    ranks = np.minimum(64 - _bit_length(hashes << np.uint64(precision)) + 1, 64 - precision + 1)
+
+    registers = np.zeros(2 ** precision, dtype=np.uint8)
+    np.maximum.at(registers, indices, ranks.astype(np.uint8))
+
+    return registers
+
+
+def hyperloglog_estimate(registers):
+    """
+    Estimates the number of distinct values from HyperLogLog registers.
+
+    Parameters
+    ----------
+    registers : np.ndarray
+        The registers.
+
+    Returns
+    -------
+    int
+        The estimated number of distinct values, using linear counting for the small ones.
+    """
+    m = len(registers)
+    estimate = 0.7213 / (1 + 1.079 / m) * m ** 2 / np.sum(2.0 ** -registers.astype(np.float64))
+    n_empty = np.count_nonzero(registers == 0)
+    if estimate <= 2.5 * m and n_empty > 0:
+        estimate = m * np.log(m / n_empty)
+
+    return int(round(estimate))
+
+
+def _encode_registers(registers):
+    return base64.b64encode(registers.tobytes()).decode("ascii")
+
+
+def _decode_registers(encoded):
+    return np.frombuffer(base64.b64decode(encoded), dtype=np.uint8)
+
+
+def sketch_indices(values, relative_accuracy=SKETCH_ACCURACY):
+    """
+    Maps positive values to the buckets of a quantile sketch with a relative accuracy.
+
+    Bucket `i` holds the values in `(gamma**(i - 1), gamma**i]` with
+    `gamma = (1 + relative_accuracy) / (1 - relative_accuracy)`, so every quantile read from
+    the bucket counts is within `relative_accuracy` of the true value.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The positive values.
+    relative_accuracy : float, optional
+        The relative accuracy, by default `SKETCH_ACCURACY`.
+
+    Returns
+    -------
+    np.ndarray
+        The bucket index of every value.
+    """
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+
+    return np.ceil(np.log(values) / np.log(gamma)).astype(np.int64)
+
+
+def _sketch_value(index, relative_accuracy):
+    """The value representing a bucket of the quantile sketch."""
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+
+    return 2 * gamma ** index / (gamma + 1)
+
+
+def _count_dict(keys):
+    """Counts the keys, as a dict of their string representation."""
+    counts = pd.Series(keys).value_counts(sort=False)
+
+    return {str(key): int(count) for key, count in counts.items()}
+
+
+def _merge_counts(a, b):
+    """Adds two dicts of counts, None meaning too many values were seen."""
+    if a is None or b is None:
+        return None
+    merged = dict(a)
+    for key, count in b.items():
+        merged[key] = merged.get(key, 0) + count
+
+    return merged
+
+
+def profile_column(column):
+    """
+    Profiles one column of a chunk of data.
+
+    Parameters
+    ----------
+    column : pd.Series
+        The column.
+
+    Returns
+    -------
+    dict
+        The mergeable statistics of the column: the "kind" (numeric or categorical), the
+        number of rows and missing values, the HyperLogLog registers, the counts of its values
+        while there are at most `MAX_TRACKED_VALUES` of them, and the minimum, maximum and
+        quantile sketch of a numeric column.
+    """
+    values = column.dropna()
+    numeric = pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column)
+    if numeric:
+        # Integers and floats of the same value hash the same, whatever the dtype of the chunk
+        values = values.astype(np.float64)
+    else:
+        values = values.astype(str)
+
+    counts = _count_dict(values.to_numpy()) if len(values) else {}
+    profile = {
+        "kind": "numeric" if numeric else "categorical",
+        "count": int(len(column)),
+        "null_count": int(len(column) - len(values)),
+        "hll": _encode_registers(hyperloglog_registers(values)),
+        "values": counts if len(counts) <= MAX_TRACKED_VALUES else None,
+    }
+
+    if numeric:
+        array = values.to_numpy()
+        profile.update({
+            "min": float(array.min()) if len(array) else None,
+            "max": float(array.max()) if len(array) else None,
+            "sketch": {
+                "negative": _count_dict(sketch_indices(-array[array < 0])),
+                "zero": int(np.count_nonzero(array == 0)),
+                "positive": _count_dict(sketch_indices(array[array > 0])),
+            },
+        })
+
+    return profile
+
+
+def merge_column_profiles(a, b):
+    """
+    Merges the profiles of a column computed on two chunks of data.
+
+    Parameters
+    ----------
+    a : dict
+        The profile of the column on the first chunk.
+    b : dict
+        The profile of the column on the second chunk.
+
+    Returns
+    -------
+    dict
+        The profile of the column on both chunks.
+
+    Raises
+    ------
+    ValueError
+        If the column is numeric in a chunk and categorical in the other.
+    """
+    if a["kind"] != b["kind"]:
+        raise ValueError(f"The column is {a['kind']} in a chunk and {b['kind']} in another.")
+
+    registers = np.maximum(_decode_registers(a["hll"]), _decode_registers(b["hll"]))
+    merged = {
+        "kind": a["kind"],
+        "count": a["count"] + b["count"],
+        "null_count": a["null_count"] + b["null_count"],
+        "hll": _encode_registers(registers),
+        "values": _merge_counts(a["values"], b["values"]),
+    }
+    if merged["values"] is not None and len(merged["values"]) > MAX_TRACKED_VALUES:
+        merged["values"] = None
+
+    if a["kind"] == "numeric":
+        merged.update({
+            "min": min((v for v in [a["min"], b["min"]] if v is not None), default=None),
+            "max": max((v for v in [a["max"], b["max"]] if v is not None), default=None),
+            "sketch": {
+                "negative": _merge_counts(a["sketch"]["negative"], b["sketch"]["negative"]),
+                "zero": a["sketch"]["zero"] + b["sketch"]["zero"],
+                "positive": _merge_counts(a["sketch"]["positive"], b["sketch"]["positive"]),
+            },
+        })
+
+    return merged
+
+
+def sketch_quantiles(profile, quantiles=PROFILE_QUANTILES):
+    """
+    Reads quantiles from the sketch of a numeric column profile.
+
+    Parameters
+    ----------
+    profile : dict
+        The profile of a numeric column.
+    quantiles : list of float, optional
+        The quantiles, by default `PROFILE_QUANTILES`.
+
+    Returns
+    -------
+    dict
+        The value of every quantile, within the sketch accuracy and clipped to the column range.
+    """
+    sketch = profile["sketch"]
+
+    # The buckets in increasing order of their values: the negative ones, zero and the positive ones
+    negative = sorted(((-_sketch_value(int(i), SKETCH_ACCURACY), c) for i, c in sketch["negative"].items()))
+    positive = sorted(((_sketch_value(int(i), SKETCH_ACCURACY), c) for i, c in sketch["positive"].items()))
+    buckets = negative + ([(0.0, sketch["zero"])] if sketch["zero"] else []) + positive
+    if not buckets:
+        return {str(q): None for q in quantiles}
+
+    bucket_values = np.array([value for value, _ in buckets])
+    cumulative_counts = np.cumsum([count for _, count in buckets])
+    ranks = np.asarray(quantiles) * (cumulative_counts[-1] - 1)
+    estimates = np.clip(bucket_values[np.searchsorted(cumulative_counts, ranks, side="right")],
+                        profile["min"], profile["max"])
+
+    return {str(q): float(estimate) for q, estimate in zip(quantiles, estimates)}
+
+
+def summarize_column(profile):
+    """
+    Adds the null rate, the distinct count and the quantiles to a column profile.
+
+    Parameters
+    ----------
+    profile : dict
+        The profile of a column.
+
+    Returns
+    -------
+    dict
+        The profile with its "null_rate", its "distinct_count" (exact while its values are
+        tracked, estimated from the HyperLogLog registers otherwise) and, for a numeric column,
+        its "quantiles".
+    """
+    summary = {
+        **profile,
+        "null_rate": profile["null_count"] / profile["count"] if profile["count"] else 0.0,
+        "distinct_count": len(profile["values"]) if profile["values"] is not None
+        else hyperloglog_estimate(_decode_registers(profile["hll"])),
+    }
+    if profile["kind"] == "numeric":
+        summary["quantiles"] = sketch_quantiles(profile)
+
+    return summary
+
+
+def profile_data(chunks):
+    """
+    Profiles every column of chunks of data in one pass.
+
+    Parameters
+    ----------
+    chunks : iterable of pd.DataFrame
+        The data, chunk by chunk, e.g. `pd.read_csv(path, chunksize=...)`.
+
+    Returns
+    -------
+    dict
+        The number of rows and the summarized profile of every column, see `summarize_column`.
+
+    Raises
+    ------
+    ValueError
+        If there are no rows or the chunks don't have the same columns.
+    """
+    n_rows, columns = 0, None
+    for chunk in chunks:
+        if columns is None:
+            columns = {name: profile_column(chunk[name]) for name in chunk.columns}
+        elif list(chunk.columns) != list(columns):
+            raise ValueError("The chunks of data should have the same columns.")
+        else:
+            columns = {name: merge_column_profiles(profile, profile_column(chunk[name]))
+                       for name, profile in columns.items()}
+        n_rows += len(chunk)
+
+    if not n_rows:
+        raise ValueError("The data doesn't contain any rows.")
+
+    return {"n_rows": n_rows, "columns": {name: summarize_column(profile) for name, profile in columns.items()}}
+
+
+def save_profile(profile, path):
+    """
+    Saves a profile as a JSON file.
+
+    Parameters
+    ----------
+    profile : dict
+        The output of `profile_data`.
+    path : str or pathlib.Path
+        The JSON file, see `profile_path`.
+
+    Returns
+    -------
+    None
+        The profile is saved to the path.
+    """
+    with open(path, "w") as profile_file:
+        json.dump(profile, profile_file)
+    print(f"Data profile saved in the directory: \033[1m{path}\033[0m\n")
+
+
+def load_profile(path):
+    """
+    Loads a profile saved by `save_profile`.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The JSON file.
+
+    Returns
+    -------
+    dict
+        The profile.
+    """
+    with open(path) as profile_file:
+        return json.load(profile_file)
+
+
+def compare_profiles(reference, current, null_rate_tolerance=0.05):
+    """
+    Validates the profile of new data against a reference profile, without rescanning either.
+
+    The checks are, for every column of the reference:
+
+    - "present": the column is in the new data, with the same kind.
+    - "null_rate": the null rate didn't grow by more than `null_rate_tolerance`.
+    - "min" and "max": a numeric column stays in the reference range.
+    - "categories": a categorical column has no value unseen in the reference, when the
+      values of both profiles are tracked.
+
+    Parameters
+    ----------
+    reference : dict
+        The profile of the reference data, e.g. the training data.
+    current : dict
+        The profile of the new data.
+    null_rate_tolerance : float, optional
+        The accepted growth of the null rate, by default 0.05.
+
+    Returns
+    -------
+    pd.DataFrame
+        The "column", "check", "reference" and "current" values of every check, and whether
+        it "passed".
+    """
+    checks = []
+    for name, ref in reference["columns"].items():
+        cur = current["columns"].get(name)
+        present = cur is not None and cur["kind"] == ref["kind"]
+        checks.append((name, "present", ref["kind"], cur["kind"] if cur is not None else None, present))
+        if not present:
+            continue
+
+        checks.append((name, "null_rate", ref["null_rate"], cur["null_rate"],
+                       cur["null_rate"] <= ref["null_rate"] + null_rate_tolerance))
+        if ref["kind"] == "numeric" and ref["min"] is not None and cur["min"] is not None:
+            checks.append((name, "min", ref["min"], cur["min"], cur["min"] >= ref["min"]))
+            checks.append((name, "max", ref["max"], cur["max"], cur["max"] <= ref["max"]))
+        if ref["kind"] == "categorical" and ref["values"] is not None and cur["values"] is not None:
+            unseen = sorted(set(cur["values"]) - set(ref["values"]))
+            checks.append((name, "categories", len(ref["values"]), ", ".join(unseen) or None, not unseen))
+
+    return pd.DataFrame(checks, columns=["column", "check", "reference", "current", "passed"])
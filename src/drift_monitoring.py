@@ -0,0 +1,325 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.data_profile import sketch_quantiles
+from src.threshold_tuning import predict_from_proba
+
+# The name of the binned predictions in the drift reference
+PREDICTION_FEATURE = "prediction"
+
+# The smoothing added to the bin proportions, so that empty bins keep the PSI finite
+PSI_EPSILON = 1e-4
+
+
+def drift_reference_path(data_path):
+    """
+    Names the drift reference saved next to a data file, e.g. `satisfaction_train_drift_reference.json`.
+
+    Parameters
+    ----------
+    data_path : str or pathlib.Path
+        The data file.
+
+    Returns
+    -------
+    pathlib.Path
+        The path of its drift reference.
+    """
+    data_path = Path(data_path)
+
+    return data_path.with_name(f"{data_path.stem}_drift_reference.json")
+
+
+def reference_bins(profile, n_bins=10, exclude=("id",)):
+    """
+    Chooses the bins of every column from its data profile.
+
+    The columns whose values are tracked by the profile, e.g. the categorical columns and
+    the ratings, get one bin per value plus an "other" bin for unseen values. The other
+    numeric columns are cut at the quantiles of their sketch. Every column has a last bin
+    counting the missing values.
+
+    Parameters
+    ----------
+    profile : dict
+        The output of `src.data_profile.profile_data`.
+    n_bins : int, optional
+        The number of quantile bins of the numeric columns, by default 10. Repeated
+        quantiles are merged, so a column can have fewer bins.
+    exclude : tuple of str, optional
+        The columns left out, by default the "id" column.
+
+    Returns
+    -------
+    dict
+        The "kind" ("categorical" or "numeric"), the "categories" or the "edges", and the
+        "n_bins" of every column.
+    """
+    bins = {}
+    for name, column in profile["columns"].items():
+        if name in exclude:
+            continue
+        if column["values"] is not None:
+            categories = sorted(column["values"], key=float if column["kind"] == "numeric" else str)
+            bins[name] = {"kind": "categorical", "numeric": column["kind"] == "numeric",
+                          "categories": categories, "n_bins": len(categories) + 2}
+        else:
+            quantiles = sketch_quantiles(column, list(np.arange(1, n_bins) / n_bins))
+            edges = sorted(set(quantiles.values()))
+            bins[name] = {"kind": "numeric", "edges": edges, "n_bins": len(edges) + 2}
+
+    return bins
+
+
+def bin_counts(column, spec):
+    """
+    Counts the values of a column in its bins.
+
+    Parameters
+    ----------
+    column : pd.Series
+        The column of one chunk of data.
+    spec : dict
+        The bins of the column, see `reference_bins`.
+
+    Returns
+    -------
+    np.ndarray
+        The count of every bin, the missing values in the last one.
+    """
+    missing = column.isna().to_numpy()
+    values = column[~missing]
+    if spec["kind"] == "categorical":
+        # The values are matched on their string representation, the numeric ones as floats like in the profile
+        values = values.astype(np.float64).astype(str) if spec["numeric"] else values.astype(str)
+        codes = pd.Categorical(values, categories=spec["categories"]).codes.astype(np.int64)
+        codes[codes == -1] = len(spec["categories"])
+    else:
+        codes = np.searchsorted(spec["edges"], values.to_numpy(dtype=np.float64), side="right")
+
+    counts = np.bincount(codes, minlength=spec["n_bins"])
+    counts[-1] += np.count_nonzero(missing)
+
+    return counts
+
+
+def stream_bin_counts(chunks, bins, model=None, optional=("satisfaction",)):
+    """
+    Counts the values of every column in its bins, chunk by chunk in bounded memory.
+
+    Parameters
+    ----------
+    chunks : iterable of pd.DataFrame
+        The data, chunk by chunk.
+    bins : dict
+        The bins of every column, see `reference_bins`.
+    model : sklearn.pipeline.Pipeline or None, optional
+        A fitted model whose predicted labels are also counted under `PREDICTION_FEATURE`,
+        in the bins of its classes.
+    optional : tuple of str, optional
+        The columns which may be missing from the data, by default the label column. Their
+        counts stay zero.
+
+    Returns
+    -------
+    dict
+        The counts of every column, as lists.
+
+    Raises
+    ------
+    ValueError
+        If a column of the bins is missing from the data.
+    """
+    counts = {name: np.zeros(spec["n_bins"], dtype=np.int64) for name, spec in bins.items()}
+    if model is not None:
+        counts[PREDICTION_FEATURE] = np.zeros(len(model.classes_), dtype=np.int64)
+
+    for chunk in chunks:
+        missing = sorted(set(bins) - set(chunk.columns) - set(optional))
+        if missing:
+            raise ValueError(f"The data doesn't contain the columns {missing}.")
+        for name, spec in bins.items():
+            if name in chunk.columns:
+                counts[name] += bin_counts(chunk[name], spec)
+        if model is not None:
+            labels = predict_from_proba(model, model.predict_proba(chunk.drop(columns=["satisfaction"], errors="ignore")))
+            counts[PREDICTION_FEATURE] += np.bincount(np.searchsorted(model.classes_, labels),
+                                                      minlength=len(model.classes_))
+
+    return {name: column_counts.tolist() for name, column_counts in counts.items()}
+
+
+def build_drift_reference(profile, chunks, n_bins=10, label_column="satisfaction"):
+    """
+    Builds the drift reference of the training data: the bins and the counts of every column.
+
+    The data is prepared before the model is fitted, so the reference has no prediction
+    counts yet, see `add_prediction_reference`.
+
+    Parameters
+    ----------
+    profile : dict
+        The data profile of the training data, choosing the bins.
+    chunks : iterable of pd.DataFrame
+        The training data, chunk by chunk.
+    n_bins : int, optional
+        The number of quantile bins of the numeric columns, by default 10.
+    label_column : str, optional
+        The label column, by default "satisfaction".
+
+    Returns
+    -------
+    dict
+        The "bins" and the "counts" of every column, and the "classes" of the predictions.
+    """
+    bins = reference_bins(profile, n_bins)
+    counts = stream_bin_counts(chunks, bins)
+
+    return {"bins": bins, "counts": counts, "classes": bins[label_column]["categories"]}
+
+
+def add_prediction_reference(reference, model, chunks):
+    """
+    Adds the counts of the labels a fitted model predicts on the training data to a drift reference.
+
+    The predictions of new data are compared with the predictions of the same model on the
+    training data rather than with the training labels, so the bias of the model doesn't
+    count as drift.
+
+    Parameters
+    ----------
+    reference : dict
+        The output of `build_drift_reference`.
+    model : sklearn.pipeline.Pipeline
+        The fitted model whose predictions are checked.
+    chunks : iterable of pd.DataFrame
+        The training data, chunk by chunk, holding the features of the model.
+
+    Returns
+    -------
+    dict
+        The reference with the counts of the predicted labels under `PREDICTION_FEATURE`.
+
+    Raises
+    ------
+    ValueError
+        If the classes of the model are not the classes of the reference.
+    """
+    if list(model.classes_) != reference["classes"]:
+        raise ValueError(f"The classes of the model {list(model.classes_)} are not the reference "
+                         f"classes {reference['classes']}.")
+
+    counts = stream_bin_counts(chunks, {}, model=model)
+
+    return {**reference, "counts": {**reference["counts"], PREDICTION_FEATURE: counts[PREDICTION_FEATURE]}}
+
+
+def save_drift_reference(reference, path):
+    """
+    Saves a drift reference as a JSON file.
+
+    Parameters
+    ----------
+    reference : dict
+        The output of `build_drift_reference`.
+    path : str or pathlib.Path
+        The JSON file, see `drift_reference_path`.
+
+    Returns
+    -------
+    None
+        The drift reference is saved to the path.
+    """
+    with open(path, "w") as reference_file:
+        json.dump(reference, reference_file)
+    print(f"Drift reference saved in the directory: \033[1m{path}\033[0m\n")
+
+
+def drift_statistics(reference_counts, current_counts, ordered):
+    """
+    Compares two binned distributions with the PSI, the KS statistic and a chi-square test.
+
+    Parameters
+    ----------
+    reference_counts : array-like
+        The counts of the reference bins.
+    current_counts : array-like
+        The counts of the new data in the same bins.
+    ordered : bool
+        Whether the bins are ordered, the KS statistic is only defined for ordered bins and
+        ignores the last bin of missing values.
+
+    Returns
+    -------
+    dict
+        The "psi", the "ks" statistic (NaN for unordered bins), and the "chi2" statistic and
+        its "chi2_pvalue".
+    """
+    reference_counts = np.asarray(reference_counts, dtype=np.float64)
+    current_counts = np.asarray(current_counts, dtype=np.float64)
+    p, q = reference_counts / reference_counts.sum(), current_counts / current_counts.sum()
+
+    psi = np.sum((q - p) * np.log((q + PSI_EPSILON) / (p + PSI_EPSILON)))
+
+    ks = np.nan
+    if ordered:
+        p_values, q_values = reference_counts[:-1], current_counts[:-1]
+        if p_values.sum() and q_values.sum():
+            ks = np.max(np.abs(np.cumsum(p_values / p_values.sum()) - np.cumsum(q_values / q_values.sum())))
+
+    # The expected counts are smoothed so that a value unseen in the reference doesn't divide by zero
+    expected = (reference_counts + 0.5) / (reference_counts + 0.5).sum() * current_counts.sum()
+    chi2, chi2_pvalue = stats.chisquare(current_counts, expected)
+
+    return {"psi": psi, "ks": ks, "chi2": chi2, "chi2_pvalue": chi2_pvalue}
+
+
+def check_drift(reference, counts, psi_threshold=0.2, ks_threshold=0.1, chi2_alpha=None):
+    """
+    Computes the drift of every column and of the predictions of new data from their binned counts.
+
+    Parameters
+    ----------
+    reference : dict
+        The drift reference of the training data.
+    counts : dict
+        The counts of the new data in the reference bins, see `stream_bin_counts`.
+    psi_threshold : float, optional
+        The PSI above which a column drifted, by default 0.2.
+    ks_threshold : float, optional
+        The KS statistic above which a numeric column drifted, by default 0.1.
+    chi2_alpha : float or None, optional
+        The chi-square p-value below which a column drifted, by default None which doesn't
+        use the test. The test rejects tiny shifts of large batches, so it is opt-in.
+
+    Returns
+    -------
+    pd.DataFrame
+        The "feature", its drift statistics and whether it "drifted", the most drifted first.
+
+    Raises
+    ------
+    ValueError
+        If the reference has no counts of a counted column, e.g. the predictions of a
+        reference without `add_prediction_reference`.
+    """
+    rows = []
+    for name, current_counts in counts.items():
+        if not np.sum(current_counts):
+            continue
+        if name not in reference["counts"]:
+            raise ValueError(f"The drift reference has no counts of {name}.")
+        spec = reference["bins"].get(name, {"kind": "categorical", "numeric": False})
+        ordered = spec["kind"] == "numeric" or spec.get("numeric", False)
+        rows.append({"feature": name, **drift_statistics(reference["counts"][name], current_counts, ordered)})
+
+    report = pd.DataFrame(rows, columns=["feature", "psi", "ks", "chi2", "chi2_pvalue"])
+    report["drifted"] = (report["psi"] > psi_threshold) | (report["ks"] > ks_threshold)
+    if chi2_alpha is not None:
+        report["drifted"] |= report["chi2_pvalue"] < chi2_alpha
+
+    return report.sort_values("psi", ascending=False, ignore_index=True)
@@ -1,9 +1,124 @@
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import seaborn as sns
 from pathlib import Path
 
-def save_target_distribution(train_data, save_path, target_column="satisfaction"):
+from src.correlation_statistics import correlation_columns, correlation_statistics, correlation_matrix
+
+# The ways to sample the rows of the plots
+SAMPLE_STRATEGIES = ["stratified", "uniform"]
+
+# The continuous variables are plotted as densities, the other numeric columns as counts
+CONTINUOUS_VARS = ['age', 'flight_distance', 'departure_delay_in_minutes']
+
+# The number of histogram bins the densities are estimated from
+DENSITY_BINS = 512
+
+
+def sample_rows(labels, max_rows=None, strategy="stratified", random_state=123):
+    """
+    Samples at most `max_rows` rows to plot, keeping the class proportions by default.
+
+    Parameters
+    ----------
+    labels : array-like
+        The target of every row.
+    max_rows : int or None, optional
+        The maximum number of rows, by default None which keeps all the rows.
+    strategy : str, optional
+        "stratified" samples every class in proportion to its size, keeping at least one
+        row of every class, and "uniform" samples the rows regardless of their class.
+        By default "stratified".
+    random_state : int, optional
+        The seed of the sample, by default 123.
+
+    Returns
+    -------
+    np.ndarray
+        The sorted positions of the sampled rows.
+
+    Raises
+    ------
+    ValueError
+        If the strategy is unknown.
+    """
+    if strategy not in SAMPLE_STRATEGIES:
+        raise ValueError(f"The sample strategy should be one of {SAMPLE_STRATEGIES}. You have {strategy}.")
+
+    labels = np.asarray(labels)
+    if max_rows is None or len(labels) <= max_rows:
+        return np.arange(len(labels))
+
+    rng = np.random.default_rng(random_state)
+    if strategy == "uniform":
+        return np.sort(rng.choice(len(labels), size=max_rows, replace=False))
+
+    _, codes = np.unique(labels, return_inverse=True)
+    rows = []
+    for class_rows in np.split(np.argsort(codes, kind="stable"), np.cumsum(np.bincount(codes))[:-1]):
+        size = max(1, round(max_rows * len(class_rows) / len(labels)))
+        rows.append(rng.choice(class_rows, size=size, replace=False))
+
+    return np.sort(np.concatenate(rows))
+
+
+def class_counts(train_data, column, target_column):
+    """
+    Counts the rows of every value of a column and class of the target, the summary the count plots are drawn from.
+
+    Parameters
+    ----------
+    train_data : pd.DataFrame
+        The training dataset.
+    column : str
+        The counted column.
+    target_column : str
+        The target column.
+
+    Returns
+    -------
+    pd.DataFrame
+        The `column`, the `target_column` and the "count" of every pair present in the data.
+    """
+    return train_data.groupby([column, target_column], observed=True).size().rename("count").reset_index()
+
+
+def class_histograms(train_data, column, target_column, bins=DENSITY_BINS):
+    """
+    Bins a continuous column for every class of the target, the summary the density plots are estimated from.
+
+    Parameters
+    ----------
+    train_data : pd.DataFrame
+        The training dataset.
+    column : str
+        The continuous column, its missing values are left out.
+    target_column : str
+        The target column.
+    bins : int, optional
+        The number of bins shared by the classes, by default `DENSITY_BINS`.
+
+    Returns
+    -------
+    pd.DataFrame
+        The bin centers as `column`, the `target_column` and the "count" of every non-empty bin.
+    """
+    data = train_data[[column, target_column]].dropna(subset=[column])
+    edges = np.histogram_bin_edges(data[column].to_numpy(dtype=np.float64), bins=bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+
+    histograms = []
+    for label, values in data.groupby(target_column, sort=False, observed=True)[column]:
+        counts, _ = np.histogram(values.to_numpy(dtype=np.float64), bins=edges)
+        histograms.append(pd.DataFrame({column: centers, target_column: label, "count": counts}))
+
+    histograms = pd.concat(histograms, ignore_index=True)
+
+    return histograms[histograms["count"] > 0].reset_index(drop=True)
+
+
+def save_target_distribution(train_data, save_path, target_column="satisfaction", dpi=100, file_format="png"):
     """
     Saves a count plot of the target variable distribution to the specified path.
 
@@ -16,6 +131,10 @@ def save_target_distribution(train_data, save_path, target_column="satisfaction"
         will be converted to a Path object.
     target_column : str, optional
         The name of the target column to visualize, by default "satisfaction".
+    dpi : int, optional
+        The resolution of the saved plot in dots per inch, by default 100.
+    file_format : str, optional
+        The image format of the saved plot, e.g. "png" or "webp", by default "png".
 
     Returns
     -------
@@ -25,9 +144,9 @@ def save_target_distribution(train_data, save_path, target_column="satisfaction"
 
     Notes
     -----
-    - The function generates a count plot for the distribution of the target column.
+    - The function generates a bar plot of the counts of the target classes.
     - Counts are displayed as text above each bar in the plot.
-    - The saved plot is named `target_variable_distribution.png`.
+    - The saved plot is named `target_variable_distribution.<file_format>`.
 
     Examples
     --------
@@ -43,8 +162,10 @@ def save_target_distribution(train_data, save_path, target_column="satisfaction"
     # Define the figure size
     plt.figure(figsize=(5, 5))
 
-    # Create the countplot
-    ax = sns.countplot(data=train_data, x = target_column, hue = target_column, palette=["lightcoral", "lightgreen"], legend=False)
+    # Count the classes and plot the counts
+    counts = train_data[target_column].value_counts(sort=False).rename("count").rename_axis(target_column).reset_index()
+    ax = sns.barplot(data=counts, x=target_column, y="count", hue=target_column,
+                     palette=["lightcoral", "lightgreen"], legend=False, errorbar=None)
     
     # Create the title
     plt.title("Target Variable Distribution")
@@ -75,16 +196,17 @@ def save_target_distribution(train_data, save_path, target_column="satisfaction"
     assert (save_path.exists() and save_path.is_dir()), f"The path {save_path} doesn't exist or is not a directory."
     
     # Define the file where the plot will be saved to
-    file_to_save = save_path / 'target_variable_distribution.png'
+    file_to_save = save_path / f'target_variable_distribution.{file_format}'
 
-    # Save the figure
-    plt.savefig(file_to_save)
+    # Save and close the figure
+    plt.savefig(file_to_save, dpi=dpi, format=file_format)
+    plt.close()
 
     # Print about successful save
     print(f"Target variable distribution plot saved in: \033[1m{file_to_save}\033[0m\n")
 
 
-def save_correlation_matrix(train_data, save_path):
+def save_correlation_matrix(train_data, save_path, statistics=None, dpi=100, file_format="png"):
     """
     Saves a heatmap of the correlation matrix for numeric columns in the dataset to the specified path.
 
@@ -95,6 +217,14 @@ def save_correlation_matrix(train_data, save_path):
     save_path : str or pathlib.Path
         The directory where the correlation heatmap should be saved. If a string is provided, 
         it will be converted to a Path object.
+    statistics : dict or None, optional
+        The sufficient statistics of the correlations of the training data, see
+        `src.correlation_statistics.correlation_statistics`. By default they are computed
+        from `train_data`.
+    dpi : int, optional
+        The resolution of the saved plot in dots per inch, by default 100.
+    file_format : str, optional
+        The image format of the saved plot, e.g. "png" or "webp", by default "png".
 
     Returns
     -------
@@ -104,10 +234,11 @@ def save_correlation_matrix(train_data, save_path):
 
     Notes
     -----
-    - Only columns with float data types are considered for the correlation matrix.
+    - Only columns with float data types are considered for the correlation matrix, other
+      columns of the statistics, e.g. the target indicators, are left out.
     - The heatmap includes annotations with correlation values, uses the `coolwarm` colormap, and 
       has a format of two decimal places for the annotations.
-    - The saved heatmap is named `correlation_matrix.png`.
+    - The saved heatmap is named `correlation_matrix.<file_format>`.
 
     Examples
     --------
@@ -119,16 +250,18 @@ def save_correlation_matrix(train_data, save_path):
     assert (isinstance(save_path, str) or isinstance(save_path, Path)), f"The variable 'save_path' should be a string or Path class. You have {type(save_path)}."
 
     # Take only the columns having a float data type
-    numeric_data = train_data.select_dtypes(include=['float'])
-    
-    # Calculate the correlation across the variables
-    correlation_matrix = numeric_data.corr()
+    float_columns = list(train_data.select_dtypes(include=['float']).columns)
+
+    # Calculate the correlation across the variables from their sufficient statistics
+    if statistics is None:
+        statistics = correlation_statistics([correlation_columns(train_data)])
+    correlations = correlation_matrix(statistics, columns=float_columns)
 
     # Define the plot and its size
     plt.figure(figsize=(12, 8))
     
     # Create a heatmap
-    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', fmt='.2f', linewidths=0.5)
+    sns.heatmap(correlations, annot=True, cmap='coolwarm', fmt='.2f', linewidths=0.5)
 
     # Add title
     plt.title('Correlation Heatmap')
@@ -143,17 +276,18 @@ def save_correlation_matrix(train_data, save_path):
     assert (save_path.exists() and save_path.is_dir()), f"The path {save_path} doesn't exist or is not a directory."
 
     # Define the file where the plot will be saved to
-    file_to_save = save_path / 'correlation_matrix.png'
+    file_to_save = save_path / f'correlation_matrix.{file_format}'
 
-    # Save the figure
-    plt.savefig(file_to_save)
+    # Save and close the figure
+    plt.savefig(file_to_save, dpi=dpi, format=file_format)
+    plt.close()
 
     # Print about successful save
     print(f"Correlation matrix saved in: \033[1m{file_to_save}\033[0m\n")
 
 
 
-def save_continuous_feat_target_plots(train_data, save_path, target_column="satisfaction"):
+def save_continuous_feat_target_plots(train_data, save_path, target_column="satisfaction", dpi=100, file_format="png"):
     """
     Saves density plots of continuous variables against a target variable to the specified path.
 
@@ -167,6 +301,10 @@ def save_continuous_feat_target_plots(train_data, save_path, target_column="sati
     target_column : str, optional
         The name of the target column used to differentiate densities by hue, 
         by default "satisfaction".
+    dpi : int, optional
+        The resolution of the saved plot in dots per inch, by default 100.
+    file_format : str, optional
+        The image format of the saved plot, e.g. "png" or "webp", by default "png".
 
     Returns
     -------
@@ -181,7 +319,9 @@ def save_continuous_feat_target_plots(train_data, save_path, target_column="sati
     - Two plots are created:
       - One row with density plots for `age` and `flight_distance`.
       - Another row with a density plot for `departure_delay_in_minutes`.
-    - The saved plot is named `numeric_feat_target_plots.png`.
+    - The densities are estimated from `DENSITY_BINS` weighted histogram bins per class
+      instead of the raw rows, so the cost of drawing doesn't grow with the data.
+    - The saved plot is named `numeric_feat_target_plots.<file_format>`.
 
     Examples
     --------
@@ -195,7 +335,10 @@ def save_continuous_feat_target_plots(train_data, save_path, target_column="sati
     assert (target_column in train_data.columns), f"The {target_column} column should be in the training data. It is missing..."
 
     # Take the continuous variables
-    continuous_vars = ['age', 'flight_distance', 'departure_delay_in_minutes']
+    continuous_vars = CONTINUOUS_VARS
+
+    # The densities of the binned variables use Scott's bandwidth of the rows of a class, not of the bins
+    bandwidth = (len(train_data) / max(train_data[target_column].nunique(), 1)) ** (-1 / 5)
 
     # Define the number of rows and columns
     n_rows = 2
@@ -213,8 +356,9 @@ def save_continuous_feat_target_plots(train_data, save_path, target_column="sati
         # Add a subplot to the gridspec in the first row
         ax = fig.add_subplot(gs[0, i])
 
-        # Create a density plot with target variable providing the color
-        sns.kdeplot(data=train_data, x=column, hue=target_column, fill=True, ax=ax, common_norm=False)
+        # Create a density plot of the binned variable with target variable providing the color
+        sns.kdeplot(data=class_histograms(train_data, column, target_column), x=column, weights="count",
+                    hue=target_column, fill=True, ax=ax, common_norm=False, bw_method=bandwidth)
         
         # Add the title
         ax.set_title(f'Density Plot of {column}')
@@ -228,8 +372,9 @@ def save_continuous_feat_target_plots(train_data, save_path, target_column="sati
     # For the last variable add a subplot in the second row
     ax = fig.add_subplot(gs[1, :])
 
-    # Create a density plot with target variable providing the color 
-    sns.kdeplot(data=train_data, x=continuous_vars[2], hue=target_column, fill=True, ax=ax, common_norm=False)
+    # Create a density plot of the binned variable with target variable providing the color
+    sns.kdeplot(data=class_histograms(train_data, continuous_vars[2], target_column), x=continuous_vars[2],
+                weights="count", hue=target_column, fill=True, ax=ax, common_norm=False, bw_method=bandwidth)
     
     # Add the title
     ax.set_title(f'Density Plot of {continuous_vars[-1]}')
@@ -250,16 +395,17 @@ def save_continuous_feat_target_plots(train_data, save_path, target_column="sati
     assert (save_path.exists() and save_path.is_dir()), f"The path {save_path} doesn't exist or is not a directory."
 
     # Define the file where the plot will be saved to
-    file_to_save = save_path / 'numeric_feat_target_plots.png'
+    file_to_save = save_path / f'numeric_feat_target_plots.{file_format}'
 
-    # Save the plot
-    plt.savefig(file_to_save)
+    # Save and close the plot
+    plt.savefig(file_to_save, dpi=dpi, format=file_format)
+    plt.close(fig)
 
     # Print about the successful save
     print(f"Numeric features vs. Target variable plots saved in: \033[1m{file_to_save}\033[0m\n")
 
 
-def save_cat_feat_target_plots(train_data, save_path, target_column="satisfaction"):
+def save_cat_feat_target_plots(train_data, save_path, target_column="satisfaction", dpi=100, file_format="png"):
     """
     Saves count plots of categorical features against a target variable to the specified path.
 
@@ -273,6 +419,10 @@ def save_cat_feat_target_plots(train_data, save_path, target_column="satisfactio
     target_column : str, optional
         The name of the target column used to differentiate counts by hue,
         by default "satisfaction".
+    dpi : int, optional
+        The resolution of the saved plot in dots per inch, by default 100.
+    file_format : str, optional
+        The image format of the saved plot, e.g. "png" or "webp", by default "png".
 
     Returns
     -------
@@ -283,8 +433,9 @@ def save_cat_feat_target_plots(train_data, save_path, target_column="satisfactio
     Notes
     -----
     - Categorical features are identified as numeric columns not listed among continuous variables.
-    - Count plots are generated for all categorical features, colored by the target variable.
-    - The saved plot is named `cat_feat_target_plots.png`.
+    - Count plots are generated for all categorical features, colored by the target variable,
+      as bar plots of the pre-aggregated counts.
+    - The saved plot is named `cat_feat_target_plots.<file_format>`.
     - Subplots are organized dynamically based on the number of categorical features:
         - Each row contains up to 3 plots.
         - Empty subplots in the grid are turned off.
@@ -301,7 +452,7 @@ def save_cat_feat_target_plots(train_data, save_path, target_column="satisfactio
     assert (target_column in train_data.columns), f"The {target_column} column should be in the training data. It is missing..."
 
     # Take the continuous variables
-    continuous_vars = ['age', 'flight_distance', 'departure_delay_in_minutes']
+    continuous_vars = CONTINUOUS_VARS
 
     # Get the categorical columns by taking the set difference of all numeric columns and the continuous ones
     categorical_cols = list(set(train_data.select_dtypes(include=['number']).columns) - set(continuous_vars))
@@ -319,8 +470,9 @@ def save_cat_feat_target_plots(train_data, save_path, target_column="satisfactio
     # For categorical column
     for i, column in enumerate(categorical_cols):
 
-        # Create a count plot with target column as the color
-        sns.countplot(data=train_data, x=column, hue=target_column, ax=axes[i])
+        # Create a bar plot of the counts with target column as the color
+        sns.barplot(data=class_counts(train_data, column, target_column), x=column, y="count",
+                    hue=target_column, errorbar=None, ax=axes[i])
 
         # Add title
         axes[i].set_title(f'Count Plot of {column}')
@@ -345,10 +497,11 @@ def save_cat_feat_target_plots(train_data, save_path, target_column="satisfactio
     assert (save_path.exists() and save_path.is_dir()), f"The path {save_path} doesn't exist or is not a directory."
 
     # Define the file where the plot will be saved to
-    file_to_save = save_path / 'cat_feat_target_plots.png'
+    file_to_save = save_path / f'cat_feat_target_plots.{file_format}'
 
-    # Save the file
-    plt.savefig(file_to_save)
+    # Save and close the file
+    plt.savefig(file_to_save, dpi=dpi, format=file_format)
+    plt.close(fig)
 
     # Print about the successful save
     print(f"Categorical features vs. Target variable plots saved in: \033[1m{file_to_save}\033[0m\n")
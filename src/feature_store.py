@@ -0,0 +1,273 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.threshold_tuning import ThresholdClassifier
+
+SCHEMA_NAME = "schema.json"
+
+# The groups holding the model features, in the order of the preprocessor output, and the target group
+FEATURE_GROUPS = ["onehot", "ordinal", "numerical"]
+TARGET_GROUP = "target"
+
+# The learned scaling parameters recorded with the store, checked against the preprocessor of a model
+SCALING_PARAMETERS = ["min_", "scale_", "mean_"]
+
+# The size reserved for the header of every .npy file, rewritten with the final shape
+HEADER_SIZE = 128
+
+
+def _npy_header(dtype, shape):
+    """Builds a version 1.0 .npy header padded to `HEADER_SIZE` bytes."""
+    header = repr({"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": shape})
+    header_length = HEADER_SIZE - len(np.lib.format.magic(1, 0)) - 2
+
+    return np.lib.format.magic(1, 0) + np.uint16(header_length).tobytes() + \
+        (header.ljust(header_length - 1) + "\n").encode("latin1")
+
+
+def _encode_group(chunk, spec):
+    """Converts the columns of a group to its dtype, or to the codes of its categories."""
+    values = chunk[spec["columns"]]
+    if "categories" in spec:
+        values = values.apply(lambda column: pd.Categorical(column, categories=spec["categories"]).codes)
+        if (values.to_numpy() == -1).any():
+            raise ValueError(f"The columns {spec['columns']} contain values outside of {spec['categories']}.")
+
+    values = values.to_numpy()
+    array = np.ascontiguousarray(values, dtype=spec["dtype"])
+    if np.issubdtype(array.dtype, np.integer) and not np.array_equal(array, values):
+        raise ValueError(f"The columns {spec['columns']} don't fit in {spec['dtype']}.")
+
+    return array
+
+
+def scaling_parameters(preprocessor):
+    """
+    Collects the learned scaling parameters of the transformers of a fitted column transformer.
+
+    Parameters
+    ----------
+    preprocessor : sklearn.compose.ColumnTransformer
+        The fitted column transformer.
+
+    Returns
+    -------
+    dict
+        The `SCALING_PARAMETERS` of every transformer having them, as lists.
+    """
+    return {
+        name: {attribute: getattr(transformer, attribute).tolist()
+               for attribute in SCALING_PARAMETERS if hasattr(transformer, attribute)}
+        for name, transformer, _ in preprocessor.transformers_
+        if any(hasattr(transformer, attribute) for attribute in SCALING_PARAMETERS)
+    }
+
+
+def write_feature_store(chunks, store_dir, groups, preprocessor=None):
+    """
+    Writes chunks of processed data to a feature store, one contiguous .npy file per column group.
+
+    The chunks are appended to the files as they come, so the data never has to fit in
+    memory, and the headers are rewritten with the number of rows at the end. A schema
+    file records the columns, the dtype and the categories of every group.
+
+    Parameters
+    ----------
+    chunks : iterable of pd.DataFrame
+        The processed data, chunk by chunk.
+    store_dir : str or pathlib.Path
+        The directory of the feature store, its files are overwritten.
+    groups : dict
+        The "columns" and the "dtype" of every group, e.g. `{"ordinal": {"columns": [...],
+        "dtype": "float64"}}`. A group with "categories" stores the codes of its values.
+    preprocessor : sklearn.compose.ColumnTransformer or None, optional
+        The fitted column transformer which processed the data, its scaling parameters are
+        recorded so that a model can check it would process the data the same way.
+
+    Returns
+    -------
+    dict
+        The schema of the feature store, also saved as `schema.json`.
+
+    Raises
+    ------
+    ValueError
+        If there are no rows or the values of a group don't fit in its dtype or categories.
+    """
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    n_rows = 0
+
+    files = {name: open(store_dir / f"{name}.npy", "wb") for name in groups}
+    try:
+        for name, spec in groups.items():
+            files[name].write(_npy_header(spec["dtype"], (0, len(spec["columns"]))))
+
+        for chunk in chunks:
+            for name, spec in groups.items():
+                files[name].write(_encode_group(chunk, spec).tobytes())
+            n_rows += len(chunk)
+
+        # Rewrite the headers with the final shapes
+        for name, spec in groups.items():
+            files[name].seek(0)
+            files[name].write(_npy_header(spec["dtype"], (n_rows, len(spec["columns"]))))
+    finally:
+        for file in files.values():
+            file.close()
+
+    if n_rows == 0:
+        raise ValueError("The data doesn't contain any rows.")
+
+    schema = {
+        "n_rows": n_rows,
+        "groups": {name: {"file": f"{name}.npy", **spec} for name, spec in groups.items()},
+    }
+    if preprocessor is not None:
+        schema["scaling"] = scaling_parameters(preprocessor)
+    with open(store_dir / SCHEMA_NAME, "w") as schema_file:
+        json.dump(schema, schema_file, indent=2)
+
+    return schema
+
+
+def load_feature_store(store_dir, groups=None, mmap_mode="r"):
+    """
+    Opens the column groups of a feature store, memory-mapped by default.
+
+    The memory-mapped arrays are read from disk on demand and the operating system shares
+    their pages across the processes opening the same store.
+
+    Parameters
+    ----------
+    store_dir : str or pathlib.Path
+        The directory of the feature store.
+    groups : list of str or None, optional
+        The groups to open, all of them by default.
+    mmap_mode : str or None, optional
+        The memory-map mode of `np.load`, by default "r". None reads the arrays in memory.
+
+    Returns
+    -------
+    tuple
+        The array of every group and the schema of the feature store.
+
+    Raises
+    ------
+    ValueError
+        If a group is not in the feature store.
+    """
+    store_dir = Path(store_dir)
+    with open(store_dir / SCHEMA_NAME) as schema_file:
+        schema = json.load(schema_file)
+
+    groups = list(schema["groups"]) if groups is None else list(groups)
+    unknown = sorted(set(groups) - set(schema["groups"]))
+    if unknown:
+        raise ValueError(f"The feature store has no groups {unknown}. Available groups are {list(schema['groups'])}.")
+
+    arrays = {name: np.load(store_dir / schema["groups"][name]["file"], mmap_mode=mmap_mode) for name in groups}
+
+    return arrays, schema
+
+
+def feature_store_frame(store_dir, groups=None, rows=None):
+    """
+    Reads groups of a feature store as one dataframe, decoding the categorical groups.
+
+    Parameters
+    ----------
+    store_dir : str or pathlib.Path
+        The directory of the feature store.
+    groups : list of str or None, optional
+        The groups to read, all of them by default.
+    rows : slice, array-like of int or None, optional
+        The rows to read, all of them by default. Only these rows are read from disk.
+
+    Returns
+    -------
+    pd.DataFrame
+        The columns of the groups, with their stored dtypes.
+    """
+    arrays, schema = load_feature_store(store_dir, groups)
+
+    frames = []
+    for name, array in arrays.items():
+        spec = schema["groups"][name]
+        array = array if rows is None else array[rows]
+        values = np.asarray(spec["categories"], dtype=object)[array] if "categories" in spec else array
+        frames.append(pd.DataFrame(values, columns=spec["columns"]))
+
+    return pd.concat(frames, axis=1)
+
+
+def store_predictions(model, store_dir, feature_groups=FEATURE_GROUPS, target_group=TARGET_GROUP,
+                      batch_size=100_000):
+    """
+    Predicts the probabilities of the rows of a feature store batch by batch, skipping the preprocessing.
+
+    The processed features go straight to the steps following the column transformer of
+    the model, so only the rows of the current batch are read from disk.
+
+    Parameters
+    ----------
+    model : sklearn.pipeline.Pipeline or ThresholdClassifier
+        The fitted model pipeline, its first step being the `ColumnTransformer` whose output
+        is stored in the feature groups.
+    store_dir : str or pathlib.Path
+        The directory of the feature store.
+    feature_groups : list of str, optional
+        The groups holding the features, in the order of the column transformer output,
+        by default `FEATURE_GROUPS`.
+    target_group : str, optional
+        The group holding the labels, by default "target".
+    batch_size : int, optional
+        The number of rows predicted at once, by default 100,000.
+
+    Yields
+    ------
+    tuple
+        The predicted probabilities and the labels of every batch.
+
+    Raises
+    ------
+    ValueError
+        If the stored columns are not the output columns of the column transformer, the
+        store was scaled with other parameters than the ones of the column transformer, or
+        it rounded the scaled features to a narrower float than the column transformer output.
+    """
+    arrays, schema = load_feature_store(store_dir, list(feature_groups) + [target_group])
+    pipeline = model.estimator if isinstance(model, ThresholdClassifier) else model
+
+    # The output names of the column transformer are prefixed with the name of their transformer
+    columns = [column for name in feature_groups for column in schema["groups"][name]["columns"]]
+    expected_columns = [name.split("__", 1)[-1] for name in pipeline[0].get_feature_names_out()]
+    if columns != expected_columns:
+        raise ValueError(f"The feature store columns {columns} are not the columns output "
+                         f"by the preprocessor of the model {expected_columns}.")
+
+    # The scaled features should be stored as the float64 the column transformer outputs, the steps after it
+    # like the histogram binning would otherwise see other values than on the raw data
+    narrowed = [name for name in feature_groups
+                if np.issubdtype(np.dtype(schema["groups"][name]["dtype"]), np.floating)
+                and np.dtype(schema["groups"][name]["dtype"]) != np.float64]
+    if narrowed:
+        raise ValueError(f"The feature store groups {narrowed} are rounded to a narrower float than the float64 "
+                         f"output of the preprocessor, write the store again with float64 groups.")
+
+    # The features should have been scaled like the column transformer of the model would
+    model_scaling = scaling_parameters(pipeline[0])
+    for name, parameters in schema.get("scaling", {}).items():
+        for attribute, values in parameters.items():
+            if not np.allclose(values, model_scaling.get(name, {}).get(attribute, np.nan)):
+                raise ValueError(f"The feature store was scaled with another {name}.{attribute} "
+                                 f"than the preprocessor of the model.")
+
+    head = pipeline[1:]
+    categories = np.asarray(schema["groups"][target_group]["categories"], dtype=object)
+    for start in range(0, schema["n_rows"], batch_size):
+        X = np.hstack([arrays[name][start:start + batch_size] for name in feature_groups])
+        yield head.predict_proba(X), categories[arrays[target_group][start:start + batch_size, 0]]
@@ -0,0 +1,118 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def hash_ids(ids, seed):
+    """
+    Hashes identifiers to 64-bit integers, deterministically for a given seed.
+
+    Parameters
+    ----------
+    ids : pd.Series or np.ndarray
+        The identifiers, e.g. the passenger ids.
+    seed : int
+        The seed mixed into the hash.
+
+    Returns
+    -------
+    np.ndarray
+        The uint64 hash of every identifier, the same on every run and platform.
+    """
+    hash_key = f"{seed:016x}"[-16:]
+
+    return pd.util.hash_pandas_object(pd.Series(ids).astype(str), index=False, hash_key=hash_key).to_numpy()
+
+
+def hash_split_mask(ids, test_size, seed):
+    """
+    Assigns every identifier to the test set with probability `test_size`, from its hash only.
+
+    A passenger always lands in the same split for a given seed, whatever the other rows,
+    so appending new data never moves the existing rows between the splits.
+
+    Parameters
+    ----------
+    ids : pd.Series or np.ndarray
+        The identifiers.
+    test_size : float
+        The expected proportion of the test set, between 0 and 1.
+    seed : int
+        The seed of the split.
+
+    Returns
+    -------
+    np.ndarray
+        True for the rows of the test set.
+
+    Raises
+    ------
+    ValueError
+        If `test_size` is not between 0 and 1.
+    """
+    if not 0 < test_size < 1:
+        raise ValueError("test_size should be between 0 and 1.")
+
+    # The 53 high bits of the hash give a uniform number in [0, 1)
+    uniform = (hash_ids(ids, seed) >> np.uint64(11)).astype(np.float64) / 2**53
+
+    return uniform < test_size
+
+
+def stream_hash_split(chunks, train_path, test_path, test_size, seed, id_column="id",
+                      stratify_column="satisfaction"):
+    """
+    Splits chunks of data into a train and a test file in one streaming pass.
+
+    Every stratum of `stratify_column` gets `test_size` of its rows in the test set in
+    expectation, since the assignment only depends on the hash of the id.
+
+    Parameters
+    ----------
+    chunks : iterable of pd.DataFrame
+        The chunks of data, e.g. `pd.read_csv(path, chunksize=...)` after cleaning.
+    train_path : str or pathlib.Path
+        The CSV file receiving the train rows, overwritten.
+    test_path : str or pathlib.Path
+        The CSV file receiving the test rows, overwritten.
+    test_size : float
+        The expected proportion of the test set.
+    seed : int
+        The seed of the split.
+    id_column : str, optional
+        The column identifying the rows, by default "id".
+    stratify_column : str or None, optional
+        The column whose strata are counted in the summary, by default "satisfaction".
+
+    Returns
+    -------
+    pd.DataFrame
+        The number of train and test rows of every stratum, with the test proportion.
+
+    Raises
+    ------
+    ValueError
+        If there are no rows.
+    """
+    train_path, test_path = Path(train_path), Path(test_path)
+    counts = []
+    first_chunk = True
+
+    for chunk in chunks:
+        is_test = hash_split_mask(chunk[id_column], test_size, seed)
+        mode = "w" if first_chunk else "a"
+        chunk[~is_test].to_csv(train_path, mode=mode, header=first_chunk, index=False)
+        chunk[is_test].to_csv(test_path, mode=mode, header=first_chunk, index=False)
+        first_chunk = False
+
+        strata = chunk[stratify_column] if stratify_column is not None else pd.Series("all", index=chunk.index)
+        counts.append(pd.crosstab(strata, np.where(is_test, "test", "train")))
+
+    if first_chunk:
+        raise ValueError("The data doesn't contain any rows.")
+
+    summary = pd.concat(counts).groupby(level=0).sum().reindex(columns=["train", "test"], fill_value=0)
+    summary.index.name, summary.columns.name = stratify_column, None
+
+    return summary.assign(test_proportion=summary["test"] / (summary["train"] + summary["test"]))
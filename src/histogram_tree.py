@@ -0,0 +1,430 @@
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin, TransformerMixin
+from sklearn.utils.validation import check_is_fitted
+
+
+def compute_bin_edges(X, max_bins=255):
+    """
+    Computes the bin edges used to discretize every column of a feature matrix.
+
+    Columns with fewer distinct values than `max_bins` (the ratings and the one-hot columns)
+    get one bin per value, the edges being the midpoints between consecutive values.
+    The other columns are quantile-binned.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        The 2D feature matrix, missing values are ignored.
+    max_bins : int, optional
+        The maximum number of bins per column, between 2 and 256, by default 255.
+
+    Returns
+    -------
+    list of np.ndarray
+        The increasing bin edges of every column. A value `x` falls in bin `b` when
+        `edges[b - 1] < x <= edges[b]`, missing values fall in the last bin.
+
+    Raises
+    ------
+    ValueError
+        If `max_bins` is not between 2 and 256 or if `X` is not a 2D array.
+    """
+    if not isinstance(max_bins, int) or max_bins < 2 or max_bins > 256:
+        raise ValueError("max_bins should be an integer between 2 and 256.")
+
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim != 2:
+        raise ValueError("X should be a 2D array.")
+
+    bin_edges = []
+    for column in X.T:
+        # Ignore the missing values
+        column = column[~np.isnan(column)]
+        values = np.unique(column)
+
+        # Discrete column, one bin per distinct value
+        if len(values) <= max_bins:
+            edges = (values[:-1] + values[1:]) / 2
+
+        # Continuous column, the edges are the quantiles of the values
+        else:
+            edges = np.unique(np.quantile(column, np.linspace(0, 1, max_bins + 1)[1:-1], method="midpoint"))
+
+        bin_edges.append(edges.astype(np.float64))
+
+    return bin_edges
+
+
+def bin_features(X, bin_edges):
+    """
+    Discretizes a feature matrix into uint8 bin codes.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        The 2D feature matrix.
+    bin_edges : list of np.ndarray
+        The edges of every column, as returned by `compute_bin_edges`.
+
+    Returns
+    -------
+    np.ndarray
+        The uint8 matrix of bin codes, having the same shape as `X`.
+
+    Raises
+    ------
+    ValueError
+        If the number of columns of `X` does not match the number of bin edges.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim != 2 or X.shape[1] != len(bin_edges):
+        raise ValueError(f"X should have {len(bin_edges)} columns.")
+
+    codes = np.empty(X.shape, dtype=np.uint8)
+    for i, edges in enumerate(bin_edges):
+        # NaN is sorted after every edge, missing values end up in the last bin
+        codes[:, i] = np.searchsorted(edges, X[:, i], side="left")
+
+    return codes
+
+
+class HistogramBinner(TransformerMixin, BaseEstimator):
+    """
+    Discretizes the features into uint8 bin codes, to be used before a prebinned `HistogramTreeClassifier`.
+
+    Binning is the only step of the histogram tree that sorts the feature values. Running it as a
+    separate pipeline step lets a `Pipeline(memory=...)` cache the codes of every cross-validation
+    fold, so all the hyperparameter candidates of a fold reuse the same binned matrix.
+
+    Parameters
+    ----------
+    max_bins : int, optional
+        The maximum number of bins per feature, between 2 and 256, by default 255.
+    """
+
+    def __init__(self, max_bins=255):
+        self.max_bins = max_bins
+
+    def fit(self, X, y=None):
+        """
+        Computes the bin edges of every feature.
+
+        Parameters
+        ----------
+        X : array-like
+            The 2D feature matrix.
+        y : None
+            Ignored.
+
+        Returns
+        -------
+        HistogramBinner
+            The fitted transformer.
+        """
+        self.bin_edges_ = compute_bin_edges(X, self.max_bins)
+        self.n_features_in_ = len(self.bin_edges_)
+
+        return self
+
+    def transform(self, X):
+        """
+        Discretizes the features into uint8 bin codes.
+
+        Parameters
+        ----------
+        X : array-like
+            The 2D feature matrix.
+
+        Returns
+        -------
+        np.ndarray
+            The uint8 matrix of bin codes.
+        """
+        check_is_fitted(self, "bin_edges_")
+
+        return bin_features(X, self.bin_edges_)
+
+
+class HistogramTreeClassifier(ClassifierMixin, BaseEstimator):
+    """
+    A single decision tree grown from per-feature histograms.
+
+    The features are discretized once into at most `max_bins` bins, then the tree is grown
+    level by level: one pass over the binned rows accumulates the (feature, bin, class) counts
+    of every open node, and the best split of each node is found from the cumulative counts
+    in O(bins) instead of sorting the feature values. Because the tree only needs these
+    aggregates, it can also be grown from chunks streamed from disk (see `grow`).
+
+    Parameters
+    ----------
+    max_depth : int or None, optional
+        The maximum depth of the tree, None grows it until the leaves are pure.
+    max_bins : int, optional
+        The maximum number of bins per feature, between 2 and 256, by default 255.
+    min_samples_split : int, optional
+        The minimum number of samples required to split a node, by default 2.
+    min_samples_leaf : int, optional
+        The minimum number of samples required in each leaf, by default 1.
+    prebinned : bool, optional
+        Whether the input already contains the uint8 codes of a `HistogramBinner`, by default False.
+        `max_bins` is then ignored and the thresholds are expressed in bin codes.
+    """
+
+    def __init__(self, max_depth=None, max_bins=255, min_samples_split=2, min_samples_leaf=1, prebinned=False):
+        self.max_depth = max_depth
+        self.max_bins = max_bins
+        self.min_samples_split = min_samples_split
+        self.min_samples_leaf = min_samples_leaf
+        self.prebinned = prebinned
+
+    def fit(self, X, y):
+        """
+        Bins the features and grows the tree from the in-memory data.
+
+        Parameters
+        ----------
+        X : array-like
+            The 2D feature matrix.
+        y : array-like
+            The target labels.
+
+        Returns
+        -------
+        HistogramTreeClassifier
+            The fitted estimator.
+        """
+        X = np.asarray(X)
+        y = np.asarray(y).ravel()
+        if X.shape[0] != y.shape[0]:
+            raise ValueError("X and y should have the same number of rows.")
+
+        # Encode the labels
+        self.classes_, y_codes = np.unique(y, return_inverse=True)
+
+        # The codes are already binned, the edges sit halfway between consecutive codes
+        if self.prebinned:
+            if X.dtype != np.uint8:
+                raise ValueError("Prebinned X should contain the uint8 codes of a HistogramBinner.")
+            codes = X
+            self.bin_edges_ = [np.arange(n_edges) + 0.5 for n_edges in codes.max(axis=0, initial=0)]
+
+        # Discretize the features once
+        else:
+            self.bin_edges_ = compute_bin_edges(X, self.max_bins)
+            codes = bin_features(X, self.bin_edges_)
+
+        return self.grow(lambda: iter([(codes, y_codes)]))
+
+    def grow(self, iter_binned_chunks):
+        """
+        Grows the tree level by level from chunks of binned rows.
+
+        `classes_` and `bin_edges_` must be set before calling this method.
+
+        Parameters
+        ----------
+        iter_binned_chunks : callable
+            A function returning a fresh iterator of `(codes, y_codes)` tuples, where `codes` is
+            the uint8 matrix of bin codes and `y_codes` the index of each label in `classes_`.
+            It is called once per level of the tree and must yield the same chunks every time.
+            The node reached by every row is kept between the levels (4 bytes per row).
+
+        Returns
+        -------
+        HistogramTreeClassifier
+            The fitted estimator.
+        """
+        n_classes = len(self.classes_)
+        n_bins = np.array([len(edges) + 1 for edges in self.bin_edges_])
+
+        # The bins of all the features are laid out one after another in the histograms
+        offsets = np.concatenate([[0], np.cumsum(n_bins)[:-1]])
+        feature_of_bin = np.repeat(np.arange(len(n_bins)), n_bins)
+        total_bins = int(n_bins.sum())
+
+        # Node arrays, a leaf has -1 as its feature and children
+        feature, split_bin, left, right, depth, value = [-1], [0], [-1], [-1], [0], [None]
+        frontier = [0]
+
+        # Node reached by every row of every chunk, the rows move down one level per pass
+        nodes_of_chunks = []
+
+        while frontier:
+            # Slot of every open node in the histogram, -1 for the other nodes
+            slot_of_node = np.full(len(feature), -1)
+            slot_of_node[frontier] = np.arange(len(frontier))
+            feature_arr, split_arr = np.array(feature), np.array(split_bin)
+            left_arr, right_arr = np.array(left), np.array(right)
+
+            # Accumulate the (node, feature, bin, class) counts in one pass over the chunks
+            hist = np.zeros(len(frontier) * total_bins * n_classes, dtype=np.int64)
+            for i, (codes, y_codes) in enumerate(iter_binned_chunks()):
+                if i == len(nodes_of_chunks):
+                    nodes_of_chunks.append(np.zeros(codes.shape[0], dtype=np.int32))
+                nodes = nodes_of_chunks[i]
+
+                # Move the rows of the nodes split at the previous level to their children
+                active = np.flatnonzero(left_arr[nodes] >= 0)
+                current = nodes[active]
+                goes_left = codes[active, feature_arr[current]] <= split_arr[current]
+                nodes[active] = np.where(goes_left, left_arr[current], right_arr[current])
+
+                slots = slot_of_node[nodes]
+                is_open = slots >= 0
+                index = (slots[is_open, None] * total_bins + offsets + codes[is_open]) * n_classes \
+                    + np.asarray(y_codes)[is_open, None]
+                hist += np.bincount(index.ravel(), minlength=len(hist))
+            hist = hist.reshape(len(frontier), total_bins, n_classes)
+
+            # The class counts of the nodes are the counts of the first feature's bins
+            node_counts = hist[:, offsets[0]:offsets[0] + n_bins[0]].sum(axis=1)
+
+            next_frontier = []
+            best_bins, left_counts = self._best_splits(hist, offsets, feature_of_bin)
+            for slot, node in enumerate(frontier):
+                counts = node_counts[slot]
+                if value[node] is None:
+                    value[node] = counts
+
+                best_bin = best_bins[slot]
+                if best_bin < 0:
+                    continue
+
+                # Split the node and add the children
+                feature[node] = int(feature_of_bin[best_bin])
+                split_bin[node] = int(best_bin - offsets[feature[node]])
+                for side_counts in (left_counts[slot], counts - left_counts[slot]):
+                    feature.append(-1)
+                    split_bin.append(0)
+                    left.append(-1)
+                    right.append(-1)
+                    depth.append(depth[node] + 1)
+                    value.append(side_counts)
+                    if self._can_split(side_counts, depth[-1]):
+                        next_frontier.append(len(feature) - 1)
+                left[node], right[node] = len(feature) - 2, len(feature) - 1
+
+            frontier = next_frontier
+
+        # Store the tree, the thresholds are the upper edges of the split bins
+        self.feature_ = np.array(feature)
+        self.split_bin_ = np.array(split_bin)
+        self.children_left_ = np.array(left)
+        self.children_right_ = np.array(right)
+        self.value_ = np.array([v if v is not None else np.zeros(n_classes, dtype=np.int64) for v in value])
+        self.threshold_ = np.array([
+            self.bin_edges_[f][b] if f >= 0 else np.nan for f, b in zip(feature, split_bin)
+        ])
+        self.max_depth_ = max(depth)
+        self.n_features_in_ = len(self.bin_edges_)
+
+        return self
+
+    def _can_split(self, counts, node_depth):
+        """Whether a node with the given class counts and depth goes to the next level."""
+        n_samples = counts.sum()
+        return (
+            (self.max_depth is None or node_depth < self.max_depth)
+            and n_samples >= max(self.min_samples_split, 2 * self.min_samples_leaf)
+            and np.count_nonzero(counts) > 1
+        )
+
+    def _best_splits(self, hist, offsets, feature_of_bin):
+        """Finds the Gini-optimal split bin of every open node from its histogram."""
+        # Counts on the left of every candidate split, reset at the start of each feature
+        cumulative = np.cumsum(hist, axis=1)
+        start = np.zeros_like(cumulative)
+        start[:, offsets[1:]] = cumulative[:, offsets[1:] - 1]
+        start = np.maximum.accumulate(start, axis=1)
+        left_counts = cumulative - start
+
+        # Totals of the node for the feature of every bin
+        feature_end = np.concatenate([offsets[1:], [hist.shape[1]]]) - 1
+        totals = (cumulative[:, feature_end] - start[:, feature_end])[:, feature_of_bin]
+        right_counts = totals - left_counts
+
+        n_left = left_counts.sum(axis=2)
+        n_right = right_counts.sum(axis=2)
+        valid = (n_left >= self.min_samples_leaf) & (n_right >= self.min_samples_leaf)
+
+        # Minimizing the weighted Gini impurity is maximizing sum(counts^2) / n on both sides
+        with np.errstate(divide="ignore", invalid="ignore"):
+            score = (left_counts ** 2).sum(axis=2) / n_left + (right_counts ** 2).sum(axis=2) / n_right
+            parent = (totals ** 2).sum(axis=2) / (n_left + n_right)
+        gain = np.where(valid, score - parent, -np.inf)
+
+        best_bins = gain.argmax(axis=1)
+        rows = np.arange(hist.shape[0])
+        best_gain = gain[rows, best_bins]
+
+        # No valid split or no impurity decrease leaves the node as a leaf
+        best_bins = np.where(best_gain > 1e-12, best_bins, -1)
+
+        return best_bins, left_counts[rows, best_bins]
+
+    @staticmethod
+    def _route(values, feature, threshold, left, right):
+        """Returns the node reached by every row, following the splits down the tree."""
+        node = np.zeros(values.shape[0], dtype=np.int64)
+        active = np.flatnonzero(left[node] >= 0)
+        while len(active):
+            current = node[active]
+            goes_left = values[active, feature[current]] <= threshold[current]
+            node[active] = np.where(goes_left, left[current], right[current])
+            active = active[left[node[active]] >= 0]
+
+        return node
+
+    def apply(self, X):
+        """
+        Returns the index of the leaf reached by every row.
+
+        Parameters
+        ----------
+        X : array-like
+            The 2D feature matrix.
+
+        Returns
+        -------
+        np.ndarray
+            The leaf index of every row.
+        """
+        check_is_fitted(self, "feature_")
+        X = np.asarray(X, dtype=np.float64)
+
+        # Missing values are never lower than a threshold, they go right like in the binned space
+        return self._route(X, self.feature_, self.threshold_, self.children_left_, self.children_right_)
+
+    def predict_proba(self, X):
+        """
+        Predicts the class probabilities as the class proportions of the reached leaves.
+
+        Parameters
+        ----------
+        X : array-like
+            The 2D feature matrix.
+
+        Returns
+        -------
+        np.ndarray
+            The probabilities, one column per class of `classes_`.
+        """
+        counts = self.value_[self.apply(X)].astype(np.float64)
+
+        return counts / counts.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        """
+        Predicts the majority class of the reached leaves.
+
+        Parameters
+        ----------
+        X : array-like
+            The 2D feature matrix.
+
+        Returns
+        -------
+        np.ndarray
+            The predicted labels.
+        """
+        return self.classes_[self.value_[self.apply(X)].argmax(axis=1)]
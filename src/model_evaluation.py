@@ -1,16 +1,15 @@
 import matplotlib.pyplot as plt
 import pandas as pd
-from sklearn.metrics import (
-    precision_score,
-    recall_score,
-    f1_score,
-    accuracy_score,
-    classification_report,
-    confusion_matrix,
-    ConfusionMatrixDisplay,
-)
+from sklearn.metrics import ConfusionMatrixDisplay
 from pathlib import Path
 
+from src.confusion_metrics import (
+    confusion_counts,
+    metrics_from_confusion,
+    classification_report_from_confusion,
+    bootstrap_metric_intervals,
+)
+
 
 def check_directory_exists(dir_path):
     """
@@ -33,7 +32,7 @@ def check_directory_exists(dir_path):
     return path
 
 
-def plot_save_confusion_matrix(y_obs, y_pred, model, plots_to):
+def plot_save_confusion_matrix(y_obs, y_pred, labels, plots_to, cm=None):
     """
     Creates a confusion matrix plot from observed and predicted values,
     then saves the plot to the specified directory.
@@ -44,10 +43,14 @@ def plot_save_confusion_matrix(y_obs, y_pred, model, plots_to):
         The true labels (observed values) of the target variable.
     y_pred : pd.Series or np.ndarray
         The predicted labels generated by the model.
-    model : object
-        A trained model object.
+    labels : array-like
+        The classes of the trained model, e.g. its `classes_`, in the order of the
+        rows of the confusion matrix.
     plots_to : pathlib.Path
         The directory path where the confusion matrix plot will be saved.
+    cm : np.ndarray or None, optional
+        A confusion matrix already computed, e.g. by `evaluate_model`, in which case
+        `y_obs` and `y_pred` are not read again.
 
     Returns
     -------
@@ -57,31 +60,33 @@ def plot_save_confusion_matrix(y_obs, y_pred, model, plots_to):
     Notes
     -----
     - The confusion matrix is displayed with a "Blues" colormap for visual clarity.
-    - The saved plot is named "confusion_matrix.png".
-    - The model object contains a `classes_` attribute, associated with scikit-learn model.
+    - The saved plot is named "confusion_matrix.png" and its figure is closed.
+    - Only the labels are passed, so the figure can be drawn in another process without
+      pickling the model.
     """
-
-    # Check if the model has the `classes_` attribute
-    if not hasattr(model, "classes_"):
-        raise AttributeError(f"The model object is missing the 'classes_' attribute.")
-
-    cm = confusion_matrix(y_obs, y_pred)
-    disp = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=model.classes_)
+    if cm is None:
+        cm, _ = confusion_counts(y_obs, y_pred)
+    disp = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=labels)
     disp.plot(cmap="Blues")
     plt.title("Confusion Matrix")
     plt.tight_layout()
     conf_matrix_save_path = plots_to / "confusion_matrix.png"
     disp.figure_.savefig(conf_matrix_save_path)
+    plt.close(disp.figure_)
     print(
         f"Confusion matrix saved in the directory: \033[1m{conf_matrix_save_path}\033[0m\n"
     )
 
 
-def evaluate_model(y_obs, y_pred, results_to):
+def evaluate_model(y_obs, y_pred, results_to, cm=None, classes=None, n_bootstrap=None, confidence_level=0.95,
+                   random_state=None):
     """
     Evaluates the performance of a classification model using various metrics and
     saves the evaluation results to the specified directory.
 
+    The labels are encoded and counted into a confusion matrix once, and every metric
+    and the classification report are derived from it.
+
     Parameters
     ----------
     y_obs : pd.Series or np.ndarray
@@ -90,15 +95,29 @@ def evaluate_model(y_obs, y_pred, results_to):
         The predicted labels generated by the model.
     results_to : pathlib.Path
         The directory path where the evaluation metrics and classification report will be saved.
+    cm : np.ndarray or None, optional
+        A confusion matrix already computed, e.g. accumulated over chunks with
+        `accumulate_confusion_matrix`, in which case `y_obs` and `y_pred` are ignored.
+    classes : np.ndarray or None, optional
+        The classes indexing `cm`, required when `cm` is given.
+    n_bootstrap : int or None, optional
+        The number of bootstrap resamples of the predictions used to compute confidence
+        intervals of the test scores, None only saves the point estimates.
+    confidence_level : float, optional
+        The confidence level of the bootstrap intervals, by default 0.95.
+    random_state : int or None, optional
+        The seed of the bootstrap resamples.
 
     Returns
     -------
-    None
-        This function saves the plot to the directory without returning any value.
+    tuple
+        The confusion matrix and its classes, to be reused by `plot_save_confusion_matrix`.
 
     Notes
     -----
-    - Saves a CSV file named `test_scores.csv` containing the performance metrics.
+    - Saves a CSV file named `test_scores.csv` containing the performance metrics. In bootstrap
+      mode, a "Statistic" column tells the point estimates (first row) from the bounds of the
+      confidence intervals.
     - Saves another CSV file named `classification_report.csv` containing the classification report.
     - Metrics Calculated
         - Accuracy : the proportion of correct predictions to the total number of predictions
@@ -106,15 +125,26 @@ def evaluate_model(y_obs, y_pred, results_to):
         - Precision : the proportion of true positive predictions to the positive predictions
         - F-1 Score : the harmonic mean of precision and recall
     """
+    # Count the predictions once
+    if cm is None:
+        cm, classes = confusion_counts(y_obs, y_pred)
+    elif classes is None:
+        raise ValueError("The classes of the confusion matrix are required.")
+
     # calculates model performance based on metrics
     scoring_metrics = pd.DataFrame(
-        {
-            "Accuracy": [accuracy_score(y_obs, y_pred)],
-            "Recall": [recall_score(y_obs, y_pred, pos_label="satisfied")],
-            "Precision": [precision_score(y_obs, y_pred, pos_label="satisfied")],
-            "F1-Score": [f1_score(y_obs, y_pred, pos_label="satisfied")],
-        }
+        {name: [value] for name, value in metrics_from_confusion(cm, classes, pos_label="satisfied").items()}
     )
+
+    # Add the bootstrap confidence intervals below the point estimates
+    if n_bootstrap is not None:
+        intervals = bootstrap_metric_intervals(cm, classes, pos_label="satisfied", n_resamples=n_bootstrap,
+                                               confidence_level=confidence_level, random_state=random_state)
+        level = f"{confidence_level:.0%} CI"
+        scoring_metrics = pd.concat(
+            [scoring_metrics, pd.DataFrame([intervals["lower"], intervals["upper"]])], ignore_index=True
+        )
+        scoring_metrics.insert(0, "Statistic", ["Estimate", f"Lower ({level})", f"Upper ({level})"])
     test_scores_save_path = results_to / "test_scores.csv"
     scoring_metrics.to_csv(test_scores_save_path, index=False)
     print(
@@ -122,9 +152,11 @@ def evaluate_model(y_obs, y_pred, results_to):
     )
 
     # Create a classification report and save it
-    class_report = pd.DataFrame(classification_report(y_obs, y_pred, output_dict=True))
+    class_report = pd.DataFrame(classification_report_from_confusion(cm, classes))
     class_report_save_path = results_to / "classification_report.csv"
     class_report.to_csv(class_report_save_path, index=False)
     print(
         f"Classification report saved in the directory: \033[1m{class_report_save_path}\033[0m\n"
     )
+
+    return cm, classes
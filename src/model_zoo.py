@@ -0,0 +1,248 @@
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from sklearn.pipeline import make_pipeline
+from sklearn.tree import DecisionTreeClassifier
+
+from src.seeding import child_seeds
+
+# The estimator families of the zoo
+ESTIMATORS = {
+    "decision_tree": DecisionTreeClassifier,
+    "random_forest": RandomForestClassifier,
+    "hist_gradient_boosting": HistGradientBoostingClassifier,
+    "logistic_regression": LogisticRegression,
+}
+
+# The zoo tuned when no configuration file is given
+DEFAULT_MODEL_ZOO = {
+    "decision_tree": {"max_depth": list(range(6, 27, 3))},
+    "random_forest": {"n_estimators": [100], "max_depth": [12, 18, 24]},
+    "hist_gradient_boosting": {"learning_rate": [0.05, 0.1], "max_iter": [200]},
+    "logistic_regression": {"C": [0.1, 1.0, 10.0], "max_iter": [1000]},
+}
+
+
+def load_model_zoo_config(config_path=None):
+    """
+    Loads the estimators and the parameter grids to tune.
+
+    Parameters
+    ----------
+    config_path : str, pathlib.Path or None, optional
+        The path of a JSON file mapping estimator names to their parameter grids, e.g.
+        `{"decision_tree": {"max_depth": [6, 9]}, "random_forest": {"n_estimators": [100]}}`.
+        None returns `DEFAULT_MODEL_ZOO`.
+
+    Returns
+    -------
+    dict
+        The parameter grid of every estimator.
+
+    Raises
+    ------
+    ValueError
+        If an estimator name is not valid or a parameter grid is not a dictionary of lists.
+    """
+    if config_path is None:
+        return DEFAULT_MODEL_ZOO
+
+    with open(Path(config_path)) as f:
+        config = json.load(f)
+
+    for name, grid in config.items():
+        if name not in ESTIMATORS:
+            raise ValueError(f"Invalid estimator name '{name}'. Available estimators are {list(ESTIMATORS.keys())}.")
+        if not isinstance(grid, dict) or not all(isinstance(values, list) for values in grid.values()):
+            raise ValueError(f"The parameter grid of '{name}' should map parameter names to lists of values.")
+
+    return config
+
+
+def estimate_job_cost(name, params):
+    """
+    Estimates the relative cost of one fit, used to schedule the longest jobs first.
+
+    Only the order of the costs matters: trees grow with their depth, ensembles with their
+    number of trees or iterations, and the logistic regression is the cheapest.
+
+    Parameters
+    ----------
+    name : str
+        The estimator name.
+    params : dict
+        The parameters of the fit.
+
+    Returns
+    -------
+    float
+        The relative cost of the fit.
+    """
+    depth = params.get("max_depth") or 30
+    if name == "decision_tree":
+        return float(depth)
+    if name == "random_forest":
+        return float(params.get("n_estimators", 100) * min(depth, 30)) / 4
+    if name == "hist_gradient_boosting":
+        return float(params.get("max_iter", 100)) / 2
+
+    return 5.0
+
+
+def _preprocess_fold(preprocessor, X, y, train_index, val_index):
+    """Fits a copy of the preprocessor on the training part of a fold and transforms both parts."""
+    fold_preprocessor = clone(preprocessor).fit(X.iloc[train_index], y[train_index])
+
+    return (
+        np.asarray(fold_preprocessor.transform(X.iloc[train_index]), dtype=np.float64),
+        np.asarray(fold_preprocessor.transform(X.iloc[val_index]), dtype=np.float64),
+    )
+
+
+def preprocess_folds(preprocessor, X, y, folds, memory=None):
+    """
+    Preprocesses every fold once, to be shared by all the estimators and parameters.
+
+    Parameters
+    ----------
+    preprocessor : sklearn.compose.ColumnTransformer
+        The unfitted preprocessor, refitted on the training part of every fold.
+    X : pd.DataFrame
+        The training features.
+    y : np.ndarray
+        The training labels.
+    folds : list of tuple
+        The `(train_index, val_index)` pairs.
+    memory : joblib.Memory or None, optional
+        Caches the preprocessed folds on disk so later runs on the same data reuse them.
+
+    Returns
+    -------
+    list of tuple
+        The `(X_train, X_val)` transformed matrices of every fold.
+    """
+    preprocess = _preprocess_fold if memory is None else memory.cache(_preprocess_fold)
+
+    return [preprocess(preprocessor, X, y, train_index, val_index) for train_index, val_index in folds]
+
+
+def _fit_score_job(name, params, fold, X_train, y_train, X_val, y_val, scorer, random_state):
+    """Fits one estimator on one preprocessed fold and scores it on both parts."""
+    estimator = ESTIMATORS[name](**params)
+    if "random_state" in estimator.get_params():
+        estimator.set_params(random_state=random_state)
+
+    start = time.perf_counter()
+    estimator.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    return {
+        "model": name,
+        "params": json.dumps(params, sort_keys=True),
+        "fold": fold,
+        "val_score": scorer(estimator, X_val, y_val),
+        "train_score": scorer(estimator, X_train, y_train),
+        "fit_time": fit_time,
+    }
+
+
+def tune_model_zoo(preprocessor, X, y, zoo, scorer, cv=30, n_jobs=1, memory=None, random_state=None):
+    """
+    Tunes several estimators on the same folds in one shared pool of workers.
+
+    Every fold is preprocessed once, then all the (estimator, parameters, fold) fits are
+    scheduled together, the most expensive first, so the workers do not sit idle at the
+    end of a model family. The winner is the estimator and parameters with the best mean
+    validation score, refitted on the whole training data.
+
+    Parameters
+    ----------
+    preprocessor : sklearn.compose.ColumnTransformer
+        The unfitted preprocessor.
+    X : pd.DataFrame
+        The training features.
+    y : pd.Series or np.ndarray
+        The training labels.
+    zoo : dict
+        The parameter grid of every estimator, see `load_model_zoo_config`.
+    scorer : callable
+        A scorer, e.g. the output of `create_scorer`.
+    cv : int, optional
+        The number of stratified folds, by default 30.
+    n_jobs : int, optional
+        The number of workers, by default 1. Use it inside `parallel_search_backend`
+        to choose the backend.
+    memory : joblib.Memory or None, optional
+        Caches the preprocessed folds.
+    random_state : int or None, optional
+        The random state of the estimators accepting one. Every fold gets its own seed
+        derived from it, see `child_seeds`, and the refit uses it as is.
+
+    Returns
+    -------
+    tuple
+        The refitted best pipeline and the cross-validation results, one row per
+        (estimator, parameters) with their mean, standard deviation and standard error.
+    """
+    y = np.asarray(y).ravel()
+
+    # Split and preprocess the folds once for all the estimators
+    folds = list(StratifiedKFold(n_splits=cv).split(X, y))
+    preprocessed_folds = preprocess_folds(preprocessor, X, y, folds, memory)
+
+    # Derive the seed of every fold, whatever the worker and the order of its fits
+    fold_seeds = child_seeds(random_state, len(folds))
+
+    # Schedule all the fits together, longest jobs first
+    jobs = [
+        (estimate_job_cost(name, params), name, params, fold)
+        for name, grid in zoo.items()
+        for params in ParameterGrid(grid)
+        for fold in range(len(folds))
+    ]
+    jobs.sort(key=lambda job: job[0], reverse=True)
+
+    results = Parallel(n_jobs=n_jobs, batch_size=1, pre_dispatch="all")(
+        delayed(_fit_score_job)(
+            name, params, fold,
+            preprocessed_folds[fold][0], y[folds[fold][0]],
+            preprocessed_folds[fold][1], y[folds[fold][1]],
+            scorer, fold_seeds[fold]
+        )
+        for _, name, params, fold in jobs
+    )
+
+    # Aggregate the folds of every (estimator, parameters)
+    cv_results = (
+        pd.DataFrame(results)
+        .groupby(["model", "params"], sort=False)
+        .agg(
+            mean_val_score=("val_score", "mean"),
+            std_val_score=("val_score", lambda scores: scores.std(ddof=0)),
+            mean_train_score=("train_score", "mean"),
+            std_train_score=("train_score", lambda scores: scores.std(ddof=0)),
+            mean_fit_time=("fit_time", "mean"),
+        )
+        .reset_index()
+    )
+    cv_results = cv_results.assign(
+        se_val_score=cv_results.std_val_score / cv**0.5,
+        se_train_score=cv_results.std_train_score / cv**0.5,
+    ).sort_values("mean_val_score", ascending=False, ignore_index=True)
+
+    # Refit the winner on the whole training data
+    best = cv_results.iloc[0]
+    best_estimator = ESTIMATORS[best["model"]](**json.loads(best["params"]))
+    if "random_state" in best_estimator.get_params():
+        best_estimator.set_params(random_state=random_state)
+    final_model = make_pipeline(clone(preprocessor), best_estimator).fit(X, y)
+
+    return final_model, cv_results
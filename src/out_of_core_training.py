@@ -0,0 +1,161 @@
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import make_pipeline
+
+from src.data_preprocessing import read_data
+from src.histogram_tree import HistogramTreeClassifier, compute_bin_edges, bin_features
+
+
+def iter_csv_chunks(file_path, chunk_size=100_000, columns=None):
+    """
+    Returns a function streaming a CSV file from disk in chunks.
+
+    Parameters
+    ----------
+    file_path : str or pathlib.Path
+        The path of the CSV file.
+    chunk_size : int, optional
+        The number of rows per chunk, by default 100,000.
+    columns : list of str or None, optional
+        The only columns read, all of them by default.
+
+    Returns
+    -------
+    callable
+        A function returning a fresh iterator of DataFrames every time it is called.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist.
+    ValueError
+        If `chunk_size` is not a positive integer.
+    """
+    file_path = Path(file_path)
+    if not file_path.is_file():
+        raise FileNotFoundError(f"The file {file_path} doesn't exist.")
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError("chunk_size should be a positive integer.")
+
+    return lambda: read_data(file_path, columns=columns, chunksize=chunk_size)
+
+
+def sample_chunks(read_chunks, sample_size, target_column, random_state=None):
+    """
+    Draws a uniform sample of rows from chunks streamed from disk.
+
+    Every row gets a random priority and the rows with the lowest priorities are kept, so the
+    sample is uniform over the whole file while only `sample_size` rows are held in memory.
+
+    Parameters
+    ----------
+    read_chunks : callable
+        A function returning an iterator of DataFrames.
+    sample_size : int
+        The number of rows to keep.
+    target_column : str
+        The name of the target column.
+    random_state : int or None, optional
+        The seed of the priorities.
+
+    Returns
+    -------
+    tuple
+        The sampled DataFrame, the sorted array of all the target labels seen in the file
+        and the total number of rows.
+    """
+    rng = np.random.default_rng(random_state)
+    sample, priorities = None, np.empty(0)
+    labels = set()
+    n_rows = 0
+
+    for chunk in read_chunks():
+        n_rows += len(chunk)
+        labels.update(chunk[target_column].unique())
+
+        # Keep the rows having the lowest priorities among the sample and the new chunk
+        candidates = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+        candidate_priorities = np.concatenate([priorities, rng.random(len(chunk))])
+        keep = np.sort(np.argsort(candidate_priorities, kind="stable")[:sample_size])
+        sample = candidates.iloc[keep].reset_index(drop=True)
+        priorities = candidate_priorities[keep]
+
+    if sample is None:
+        raise ValueError("The file doesn't contain any rows.")
+
+    return sample, np.array(sorted(labels)), n_rows
+
+
+def fit_out_of_core_pipeline(read_chunks, preprocessor, target_column="satisfaction", max_depth=None,
+                             max_bins=255, sample_size=100_000, random_state=None, cache_dir=None):
+    """
+    Fits a preprocessor and a histogram-based decision tree on data larger than the memory.
+
+    1. One pass draws a uniform sample of rows, used to fit the preprocessor and to compute
+       the bin edges of the transformed features.
+    2. One pass transforms and bins every chunk, writing the uint8 bin codes to a memory-mapped
+       file (about one byte per feature and row).
+    3. The tree is grown level by level, each level being one pass over the bin codes.
+
+    Parameters
+    ----------
+    read_chunks : callable
+        A function returning a fresh iterator of DataFrames every time it is called.
+    preprocessor : sklearn.compose.ColumnTransformer
+        The unfitted preprocessor.
+    target_column : str, optional
+        The name of the target column, by default "satisfaction".
+    max_depth : int or None, optional
+        The maximum depth of the tree.
+    max_bins : int, optional
+        The maximum number of bins per feature, by default 255.
+    sample_size : int, optional
+        The number of rows used to fit the preprocessor and the bin edges, by default 100,000.
+    random_state : int or None, optional
+        The seed of the sample.
+    cache_dir : str, pathlib.Path or None, optional
+        The directory holding the temporary bin codes, None uses the system's temporary directory.
+
+    Returns
+    -------
+    sklearn.pipeline.Pipeline
+        The fitted pipeline made of the preprocessor and the `HistogramTreeClassifier`,
+        having the same shape as the in-memory model pipeline.
+    """
+    # First pass, sample the rows and collect the labels
+    sample, classes, n_rows = sample_chunks(read_chunks, sample_size, target_column, random_state)
+
+    # Fit the preprocessor and the bin edges on the sample
+    preprocessor.fit(sample.drop(columns=[target_column]))
+    tree = HistogramTreeClassifier(max_depth=max_depth, max_bins=max_bins)
+    tree.classes_ = classes
+    tree.bin_edges_ = compute_bin_edges(preprocessor.transform(sample.drop(columns=[target_column])), max_bins)
+    del sample
+
+    with tempfile.TemporaryDirectory(dir=cache_dir) as tmp_dir:
+        # Second pass, transform and bin every chunk once
+        codes = np.lib.format.open_memmap(Path(tmp_dir) / "codes.npy", mode="w+", dtype=np.uint8,
+                                          shape=(n_rows, len(tree.bin_edges_)))
+        y_codes = np.lib.format.open_memmap(Path(tmp_dir) / "y_codes.npy", mode="w+", dtype=np.int64,
+                                            shape=(n_rows,))
+        start = 0
+        chunk_sizes = []
+        for chunk in read_chunks():
+            stop = start + len(chunk)
+            codes[start:stop] = bin_features(preprocessor.transform(chunk.drop(columns=[target_column])),
+                                             tree.bin_edges_)
+            y_codes[start:stop] = np.searchsorted(classes, chunk[target_column].to_numpy())
+            chunk_sizes.append(len(chunk))
+            start = stop
+        codes.flush()
+        y_codes.flush()
+
+        # Grow the tree from the memory-mapped codes, one pass per level
+        bounds = np.concatenate([[0], np.cumsum(chunk_sizes)])
+        tree.grow(lambda: ((codes[a:b], y_codes[a:b]) for a, b in zip(bounds[:-1], bounds[1:])))
+        del codes, y_codes
+
+    return make_pipeline(preprocessor, tree)
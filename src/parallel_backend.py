@@ -0,0 +1,148 @@
+import os
+from contextlib import contextmanager
+
+import pandas as pd
+from joblib import cpu_count, parallel_config
+from threadpoolctl import threadpool_limits
+
+# Map the user facing backend names to the joblib backends
+BACKENDS = {
+    "process": "loky",
+    "thread": "threading",
+    "sequential": "sequential",
+}
+
+
+def resolve_n_jobs(n_jobs=None, inner_threads=1):
+    """
+    Resolves the number of workers to use for a parallel search.
+
+    Parameters
+    ----------
+    n_jobs : int or None, optional
+        The requested number of workers. None or -1 means "use all the cores",
+        which is split between the workers according to `inner_threads`. An explicit
+        number is capped to the workers the cores can hold.
+    inner_threads : int, optional
+        The number of BLAS/OpenMP threads each worker is allowed to start, by default 1.
+
+    Returns
+    -------
+    int
+        The number of workers so that `n_jobs * inner_threads` never exceeds the number of cores.
+
+    Raises
+    ------
+    ValueError
+        If `n_jobs` is 0 or lower than -1, or if `inner_threads` is lower than 1.
+
+    Examples
+    --------
+    On 8 cores:
+
+    >>> resolve_n_jobs(4, inner_threads=2)
+    4
+    >>> resolve_n_jobs(16, inner_threads=4)
+    2
+    """
+    if not isinstance(inner_threads, int) or inner_threads < 1:
+        raise ValueError("inner_threads should be a positive integer.")
+    if n_jobs is not None and (not isinstance(n_jobs, int) or n_jobs == 0 or n_jobs < -1):
+        raise ValueError("n_jobs should be a positive integer, -1 or None.")
+
+    # Split all the available cores between the workers, never more workers than they can hold
+    max_workers = max(1, cpu_count() // inner_threads)
+    if n_jobs is None or n_jobs == -1:
+        return max_workers
+
+    return min(n_jobs, max_workers)
+
+
+def share_frame(df):
+    """
+    Prepares a DataFrame to be shared with process workers through memory-mapping.
+
+    joblib memory-maps the numpy arrays backing a DataFrame instead of pickling them,
+    but it cannot do it for `object` columns. Converting the string columns to the
+    `category` dtype leaves only numeric blocks (the category codes), so the whole
+    frame is shared with the workers without copies.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame to share with the workers.
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy of the DataFrame where the `object` columns are stored as `category`.
+
+    Raises
+    ------
+    TypeError
+        If the input is not a pandas DataFrame.
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError("Input must be a pandas DataFrame")
+
+    # Take the string columns, they are the only ones joblib cannot memory-map
+    object_cols = df.select_dtypes(include=["object"]).columns
+
+    return df.astype({column: "category" for column in object_cols})
+
+
+@contextmanager
+def parallel_search_backend(backend="process", n_jobs=None, inner_threads=1, max_nbytes="1M", temp_folder=None):
+    """
+    Context manager configuring how scikit-learn searches run their fits in parallel.
+
+    Parameters
+    ----------
+    backend : str, optional
+        One of "process" (loky workers), "thread" or "sequential", by default "process".
+    n_jobs : int or None, optional
+        The number of workers, see `resolve_n_jobs`. Ignored by the sequential backend.
+    inner_threads : int, optional
+        The number of BLAS/OpenMP threads each worker is allowed to use, by default 1.
+    max_nbytes : str or int, optional
+        Arrays larger than this are memory-mapped to the process workers instead of being
+        pickled, by default "1M".
+    temp_folder : str or None, optional
+        The folder holding the memory-mapped arrays. None lets joblib pick one
+        (`/dev/shm` when available).
+
+    Yields
+    ------
+    int
+        The resolved number of workers to pass to the search's `n_jobs`.
+
+    Raises
+    ------
+    ValueError
+        If the backend is not valid.
+
+    Examples
+    --------
+    >>> with parallel_search_backend("process", n_jobs=16) as n_jobs:
+    ...     GridSearchCV(pipe, param_grid, n_jobs=n_jobs).fit(X_train, y_train)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Invalid backend name. Available backends are {list(BACKENDS.keys())}.")
+
+    # The sequential backend runs everything in the main process
+    n_jobs = 1 if backend == "sequential" else resolve_n_jobs(n_jobs, inner_threads)
+
+    config = {"backend": BACKENDS[backend], "n_jobs": n_jobs}
+
+    # Only the process workers receive their data through memory-mapping
+    if backend == "process":
+        config.update(
+            inner_max_num_threads=inner_threads,
+            max_nbytes=max_nbytes,
+            mmap_mode="r",
+            temp_folder=temp_folder if temp_folder is None else os.fspath(temp_folder),
+        )
+
+    # Pin the thread pools of the main process too, it runs the thread workers
+    with parallel_config(**config), threadpool_limits(limits=inner_threads):
+        yield n_jobs
@@ -0,0 +1,252 @@
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from src.confusion_metrics import encode_labels, metrics_from_confusion
+from src.data_preprocessing import MODEL_COLUMNS, read_data
+
+# The name of the manifest recording the scored partitions
+MANIFEST_NAME = "partition_manifest.json"
+
+
+def list_partitions(partitions_dir):
+    """
+    Lists the CSV partitions of a dataset, e.g. one file per day of holdout data.
+
+    Parameters
+    ----------
+    partitions_dir : str or pathlib.Path
+        The directory holding the partitions.
+
+    Returns
+    -------
+    list of pathlib.Path
+        The CSV files of the directory, sorted by name.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the directory doesn't exist or contains no CSV file.
+    """
+    partitions_dir = Path(partitions_dir)
+    if not partitions_dir.is_dir():
+        raise FileNotFoundError(f"The directory {partitions_dir} doesn't exist.")
+
+    partitions = sorted(partitions_dir.glob("*.csv"))
+    if not partitions:
+        raise FileNotFoundError(f"The directory {partitions_dir} doesn't contain any CSV file.")
+
+    return partitions
+
+
+def file_fingerprint(file_path, content=False):
+    """
+    Identifies a version of a file.
+
+    Parameters
+    ----------
+    file_path : str or pathlib.Path
+        The path of the file.
+    content : bool, optional
+        Hashes the content of the file instead of using its size and modification time,
+        by default False.
+
+    Returns
+    -------
+    str
+        The fingerprint of the file.
+    """
+    file_path = Path(file_path)
+    if content:
+        return hashlib.sha256(file_path.read_bytes()).hexdigest()
+
+    stat = file_path.stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def slice_confusion_matrices(y_obs, y_pred, slices, classes):
+    """
+    Computes the confusion matrix of every slice with a single `np.bincount`.
+
+    Parameters
+    ----------
+    y_obs : np.ndarray
+        The true labels.
+    y_pred : np.ndarray
+        The predicted labels.
+    slices : pd.DataFrame
+        The columns defining the slices, with one row per prediction. With no columns,
+        all the rows form a single slice.
+    classes : np.ndarray
+        The sorted classes indexing the confusion matrices.
+
+    Returns
+    -------
+    dict
+        The confusion matrix of every slice, keyed by the tuple of its column values.
+    """
+    n_classes = len(classes)
+    if slices.shape[1] == 0:
+        slice_codes, slice_keys = np.zeros(len(y_obs), dtype=np.int64), [()]
+    else:
+        slice_codes, slice_keys = pd.factorize(pd.MultiIndex.from_frame(slices.astype(str)))
+        slice_keys = list(slice_keys)
+
+    cells = (slice_codes * n_classes + encode_labels(y_obs, classes)) * n_classes + encode_labels(y_pred, classes)
+    cms = np.bincount(cells, minlength=len(slice_keys) * n_classes * n_classes)
+    cms = cms.reshape(len(slice_keys), n_classes, n_classes)
+
+    return {tuple(key): cm for key, cm in zip(slice_keys, cms)}
+
+
+def score_partition(model, partition_path, slice_by, classes, target_column="satisfaction"):
+    """
+    Predicts one partition and counts the confusion matrix of every slice.
+
+    Parameters
+    ----------
+    model : object
+        The fitted model pipeline.
+    partition_path : pathlib.Path
+        The CSV file of the partition.
+    slice_by : list of str
+        The columns defining the slices.
+    classes : np.ndarray
+        The sorted classes of the model.
+    target_column : str, optional
+        The name of the target column, by default "satisfaction".
+
+    Returns
+    -------
+    dict
+        The number of rows and the confusion matrix of every slice of the partition, in the
+        format stored in the manifest.
+    """
+    data = read_data(partition_path, columns=MODEL_COLUMNS + [target_column] + list(slice_by))
+    y_pred = model.predict(data.drop(columns=[target_column]))
+    cms = slice_confusion_matrices(data[target_column].to_numpy(), y_pred, data[list(slice_by)], classes)
+
+    return {
+        "n_rows": len(data),
+        "slices": [{"slice": list(key), "confusion_matrix": cm.tolist()} for key, cm in cms.items()],
+    }
+
+
+def load_manifest(manifest_path, model_fingerprint, slice_by):
+    """
+    Loads the scored partitions, forgetting them if the model or the slices changed.
+
+    Parameters
+    ----------
+    manifest_path : pathlib.Path
+        The path of the manifest.
+    model_fingerprint : str
+        The fingerprint of the model file.
+    slice_by : list of str
+        The columns defining the slices.
+
+    Returns
+    -------
+    dict
+        The manifest, with an empty "partitions" entry when nothing can be reused.
+    """
+    manifest = {"model": model_fingerprint, "slice_by": list(slice_by), "partitions": {}}
+    if manifest_path.is_file():
+        with open(manifest_path) as f:
+            previous = json.load(f)
+        if previous.get("model") == model_fingerprint and previous.get("slice_by") == list(slice_by):
+            manifest["partitions"] = previous["partitions"]
+
+    return manifest
+
+
+def evaluate_partitions(model, model_path, partitions_dir, results_to, slice_by=(), n_jobs=1,
+                        target_column="satisfaction"):
+    """
+    Scores the new partitions of a dataset in a pool of workers and merges their confusion matrices.
+
+    The partitions already listed in the manifest of `results_to`, unchanged and scored by
+    the same model with the same slices, are not predicted again.
+
+    Parameters
+    ----------
+    model : object
+        The fitted model pipeline.
+    model_path : str or pathlib.Path
+        The file the model was loaded from, whose content identifies the model in the manifest.
+    partitions_dir : str or pathlib.Path
+        The directory holding the CSV partitions.
+    results_to : pathlib.Path
+        The directory of the manifest and of the slice and partition scores.
+    slice_by : list of str, optional
+        The columns defining the slices, e.g. ["class", "type_of_travel"].
+    n_jobs : int, optional
+        The number of workers, by default 1.
+    target_column : str, optional
+        The name of the target column, by default "satisfaction".
+
+    Returns
+    -------
+    tuple
+        The overall confusion matrix and its classes.
+
+    Notes
+    -----
+    - Saves `partition_scores.csv` with the scores of every partition.
+    - Saves `slice_scores.csv` with the scores of every slice over all the partitions.
+    """
+    classes = np.asarray(model.classes_)
+    slice_by = list(slice_by)
+    manifest_path = results_to / MANIFEST_NAME
+    manifest = load_manifest(manifest_path, file_fingerprint(model_path, content=True), slice_by)
+
+    # Only score the new or modified partitions
+    partitions = list_partitions(partitions_dir)
+    fingerprints = {partition.name: file_fingerprint(partition) for partition in partitions}
+    to_score = [
+        partition for partition in partitions
+        if manifest["partitions"].get(partition.name, {}).get("fingerprint") != fingerprints[partition.name]
+    ]
+    print(f"Scoring \033[1m{len(to_score)}\033[0m of {len(partitions)} partitions\n")
+
+    scored = Parallel(n_jobs=n_jobs)(
+        delayed(score_partition)(model, partition, slice_by, classes, target_column) for partition in to_score
+    )
+    for partition, result in zip(to_score, scored):
+        manifest["partitions"][partition.name] = {"fingerprint": fingerprints[partition.name], **result}
+
+    # Forget the partitions which were removed, then save the manifest
+    manifest["partitions"] = {name: manifest["partitions"][name] for name in fingerprints}
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Merge the confusion matrices by partition and by slice
+    partition_rows, slice_cms = [], {}
+    for name, result in manifest["partitions"].items():
+        partition_cm = np.zeros((len(classes), len(classes)), dtype=np.int64)
+        for entry in result["slices"]:
+            cm = np.asarray(entry["confusion_matrix"])
+            partition_cm += cm
+            key = tuple(entry["slice"])
+            slice_cms[key] = slice_cms[key] + cm if key in slice_cms else cm
+        partition_rows.append({"partition": name, "n_rows": result["n_rows"],
+                               **metrics_from_confusion(partition_cm, classes)})
+
+    partition_scores_save_path = results_to / "partition_scores.csv"
+    pd.DataFrame(partition_rows).to_csv(partition_scores_save_path, index=False)
+    print(f"Partition scores saved in the directory: \033[1m{partition_scores_save_path}\033[0m\n")
+
+    if slice_by:
+        slice_scores = pd.DataFrame([
+            {**dict(zip(slice_by, key)), "n_rows": int(cm.sum()), **metrics_from_confusion(cm, classes)}
+            for key, cm in sorted(slice_cms.items())
+        ])
+        slice_scores_save_path = results_to / "slice_scores.csv"
+        slice_scores.to_csv(slice_scores_save_path, index=False)
+        print(f"Slice scores saved in the directory: \033[1m{slice_scores_save_path}\033[0m\n")
+
+    return sum(slice_cms.values()), classes
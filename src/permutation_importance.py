@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from joblib import Parallel, delayed
+from pathlib import Path
+from scipy import sparse
+
+from src.confusion_metrics import confusion_counts, metrics_from_confusion
+from src.threshold_tuning import ThresholdClassifier
+
+# The metrics whose drop measures the importance, and their names in `metrics_from_confusion`
+IMPORTANCE_METRICS = {
+    "accuracy": "Accuracy",
+    "precision": "Precision",
+    "recall": "Recall",
+    "f1": "F1-Score",
+}
+
+
+def split_model(model):
+    """
+    Splits a model pipeline into its column transformer and a function predicting from the transformed features.
+
+    Parameters
+    ----------
+    model : sklearn.pipeline.Pipeline or ThresholdClassifier
+        The fitted model pipeline, its first step being a `ColumnTransformer`.
+
+    Returns
+    -------
+    tuple
+        The fitted column transformer and a function predicting the labels from its output.
+
+    Raises
+    ------
+    ValueError
+        If the first step of the pipeline is not a column transformer.
+    """
+    pipeline = model.estimator if isinstance(model, ThresholdClassifier) else model
+    preprocessor = pipeline[0]
+    if not hasattr(preprocessor, "output_indices_"):
+        raise ValueError("The first step of the model pipeline should be a fitted ColumnTransformer.")
+
+    head = pipeline[1:]
+    if isinstance(model, ThresholdClassifier):
+        return preprocessor, lambda Z: model._labels(head.predict_proba(Z))
+
+    return preprocessor, head.predict
+
+
+def _transformer_columns(preprocessor):
+    """Maps the name of every transformer outputting features to its fitted transformer and its input columns."""
+    columns = {}
+    for name, transformer, transformer_columns in preprocessor.transformers_:
+        if transformer == "drop" or preprocessor.output_indices_[name].start == preprocessor.output_indices_[name].stop:
+            continue
+        transformer_columns = list(transformer_columns)
+        if transformer_columns and isinstance(transformer_columns[0], (int, np.integer)):
+            transformer_columns = list(preprocessor.feature_names_in_[transformer_columns])
+        columns[name] = (transformer, transformer_columns)
+
+    return columns
+
+
+def feature_groups(preprocessor, groups=None):
+    """
+    Lists the features permuted together, every used input column alone by default.
+
+    Parameters
+    ----------
+    preprocessor : sklearn.compose.ColumnTransformer
+        The fitted column transformer.
+    groups : dict or None, optional
+        Extra groups of input columns permuted jointly, e.g. `{"delays": ["departure_delay_in_minutes",
+        "arrival_delay_in_minutes"]}`. Their columns are not permuted alone.
+
+    Returns
+    -------
+    dict
+        The input columns of every group.
+
+    Raises
+    ------
+    ValueError
+        If a group contains a column unused by the preprocessor.
+    """
+    used_columns = [
+        column for _, transformer_columns in _transformer_columns(preprocessor).values()
+        for column in transformer_columns
+    ]
+    groups = dict(groups or {})
+    for name, columns in groups.items():
+        unknown = sorted(set(columns) - set(used_columns))
+        if unknown:
+            raise ValueError(f"The group '{name}' contains columns unused by the preprocessor: {unknown}.")
+
+    grouped_columns = {column for columns in groups.values() for column in columns}
+
+    return {**{column: [column] for column in used_columns if column not in grouped_columns}, **groups}
+
+
+def _score(y_obs, y_pred, metric, classes):
+    """Computes one metric from the confusion matrix of the predictions."""
+    return metrics_from_confusion(*confusion_counts(y_obs, y_pred, classes))[IMPORTANCE_METRICS[metric]]
+
+
+def _permuted_scores(model, X, Z, y, columns, metric, classes, n_repeats, seed):
+    """Permutes a group of input columns and scores the predictions, re-transforming only the affected blocks."""
+    preprocessor, predict = split_model(model)
+    rng = np.random.default_rng(seed)
+
+    # The transformers using the group and the columns of the group they use
+    touched = {
+        name: (transformer, transformer_columns, [column for column in columns if column in transformer_columns])
+        for name, (transformer, transformer_columns) in _transformer_columns(preprocessor).items()
+        if set(columns) & set(transformer_columns)
+    }
+
+    scores = []
+    for _ in range(n_repeats):
+        permutation = rng.permutation(len(X))
+        Z_permuted = Z.copy()
+        for name, (transformer, transformer_columns, permuted_columns) in touched.items():
+            block = X[transformer_columns].copy()
+            block[permuted_columns] = block[permuted_columns].to_numpy()[permutation]
+            transformed = transformer.transform(block) if transformer != "passthrough" else block.to_numpy()
+            if sparse.issparse(transformed):
+                transformed = transformed.toarray()
+            Z_permuted[:, preprocessor.output_indices_[name]] = transformed
+        scores.append(_score(y, predict(Z_permuted), metric, classes))
+
+    return scores
+
+
+def permutation_importance(model, X, y, metric="f1", groups=None, n_repeats=5, n_jobs=1, random_state=None):
+    """
+    Computes the drop of a test metric when every input feature (or group of features) is permuted.
+
+    The test features are transformed once. Permuting an input column only re-transforms the
+    block of the transformer using it, e.g. the one-hot columns of `class` when `class` is
+    permuted, and the predictions are scored from a single confusion matrix.
+
+    Parameters
+    ----------
+    model : sklearn.pipeline.Pipeline or ThresholdClassifier
+        The fitted model pipeline, its first step being a `ColumnTransformer`.
+    X : pd.DataFrame
+        The test features.
+    y : pd.Series or np.ndarray
+        The test labels.
+    metric : str, optional
+        The metric, one of `IMPORTANCE_METRICS`, by default "f1".
+    groups : dict or None, optional
+        Groups of input columns permuted jointly, see `feature_groups`.
+    n_repeats : int, optional
+        The number of permutations of every feature, by default 5.
+    n_jobs : int, optional
+        The number of workers permuting the features, by default 1.
+    random_state : int or None, optional
+        The seed of the permutations.
+
+    Returns
+    -------
+    pd.DataFrame
+        The "feature", "importance_mean" and "importance_std" of every feature or group,
+        the most important first.
+
+    Raises
+    ------
+    ValueError
+        If the metric is not valid.
+    """
+    if metric not in IMPORTANCE_METRICS:
+        raise ValueError(f"Invalid metric name. Available metrics are {list(IMPORTANCE_METRICS.keys())}.")
+
+    preprocessor, predict = split_model(model)
+    y = np.asarray(y)
+    classes = np.asarray(model.classes_)
+
+    # Transform the test features once and score the untouched predictions
+    Z = preprocessor.transform(X)
+    Z = np.asarray(Z.toarray() if sparse.issparse(Z) else Z, dtype=np.float64)
+    baseline = _score(y, predict(Z), metric, classes)
+
+    # Permute every group in the workers
+    groups = feature_groups(preprocessor, groups)
+    seeds = np.random.SeedSequence(random_state).spawn(len(groups))
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_permuted_scores)(model, X, Z, y, columns, metric, classes, n_repeats, seed)
+        for columns, seed in zip(groups.values(), seeds)
+    )
+
+    drops = baseline - np.asarray(scores)
+    importances = pd.DataFrame({
+        "feature": list(groups.keys()),
+        "importance_mean": drops.mean(axis=1),
+        "importance_std": drops.std(axis=1),
+    })
+
+    return importances.sort_values("importance_mean", ascending=False, ignore_index=True)
+
+
+def plot_permutation_importance(importances, metric, plot_save_path):
+    """
+    Creates and saves a bar plot of the permutation importances.
+
+    Parameters
+    ----------
+    importances : pd.DataFrame
+        The output of `permutation_importance`.
+    metric : str
+        The metric whose drop is plotted.
+    plot_save_path : str or pathlib.Path
+        The directory where the plot should be saved.
+
+    Returns
+    -------
+    None
+        The plot is saved to the directory as "permutation_importance.png".
+    """
+    plot_save_path = Path(plot_save_path)
+    plot_save_path.mkdir(parents=True, exist_ok=True)
+
+    ordered = importances.iloc[::-1]
+    plt.figure(figsize=(8, 0.3 * len(ordered) + 1.5))
+    plt.barh(ordered["feature"], ordered["importance_mean"], xerr=ordered["importance_std"],
+             color="gray", ecolor="black", capsize=3)
+    plt.xlabel(f"Mean drop in test {metric.title()} when permuted")
+    plt.title("Permutation Feature Importance")
+    plt.tight_layout()
+    plt.savefig(plot_save_path / "permutation_importance.png")
+    plt.close()
+    print(f"Permutation importance plot saved in the directory: \033[1m{plot_save_path / 'permutation_importance.png'}\033[0m\n")
@@ -0,0 +1,116 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import matplotlib
+
+# The non-interactive backend the figures are drawn with
+RENDER_BACKEND = "Agg"
+
+# The pools opened by `render_pool`, the innermost one receives the submitted figures
+_ACTIVE_POOLS = []
+
+
+def _init_render_worker():
+    """Switches a render worker to the non-interactive backend."""
+    matplotlib.use(RENDER_BACKEND)
+
+
+def render_figure(plot_function, *args, **kwargs):
+    """
+    Runs a plot function and closes every figure it opened, even if it fails.
+
+    Parameters
+    ----------
+    plot_function : callable
+        The function drawing and saving the figure, e.g. `save_cv_results_plot`.
+    *args, **kwargs
+        The arguments of the plot function.
+
+    Returns
+    -------
+    object
+        The return value of the plot function.
+    """
+    import matplotlib.pyplot as plt
+
+    open_figures = set(plt.get_fignums())
+    try:
+        return plot_function(*args, **kwargs)
+    finally:
+        for number in set(plt.get_fignums()) - open_figures:
+            plt.close(number)
+
+
+@contextmanager
+def render_pool(n_workers=1):
+    """
+    Opens a pool of background processes drawing the figures submitted with `submit_figure`.
+
+    The workers are started when the pool opens, before the caller starts its own
+    threads, and draw with the Agg backend. Leaving the context waits for the submitted
+    figures, then raises the error of the first one which failed.
+
+    Parameters
+    ----------
+    n_workers : int, optional
+        The number of render processes, by default 1.
+
+    Yields
+    ------
+    concurrent.futures.ProcessPoolExecutor
+        The executor of the pool.
+
+    Raises
+    ------
+    ValueError
+        If `n_workers` is lower than 1.
+
+    Examples
+    --------
+    >>> with render_pool():
+    ...     submit_figure(save_cv_results_plot, cv_results, "f1", "results/figures")
+    ...     # Keep working while the figure is drawn
+    """
+    if not isinstance(n_workers, int) or n_workers < 1:
+        raise ValueError("n_workers should be a positive integer.")
+
+    executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_render_worker)
+    jobs = [executor.submit(_init_render_worker) for _ in range(n_workers)]
+    _ACTIVE_POOLS.append((executor, jobs))
+    try:
+        yield executor
+    finally:
+        _ACTIVE_POOLS.remove((executor, jobs))
+        executor.shutdown(wait=True)
+
+    for job in jobs:
+        job.result()
+
+
+def submit_figure(plot_function, *args, **kwargs):
+    """
+    Draws a figure in the innermost open `render_pool`, or right away without a pool.
+
+    The arguments are pickled to the render process, so they should be the small
+    summaries the figure is drawn from rather than the data.
+
+    Parameters
+    ----------
+    plot_function : callable
+        A module level function drawing and saving the figure.
+    *args, **kwargs
+        The arguments of the plot function.
+
+    Returns
+    -------
+    concurrent.futures.Future or object
+        The future of the figure in a pool, else the return value of the plot function.
+    """
+    if not _ACTIVE_POOLS:
+        return render_figure(plot_function, *args, **kwargs)
+
+    executor, jobs = _ACTIVE_POOLS[-1]
+    job = executor.submit(render_figure, plot_function, *args, **kwargs)
+    jobs.append(job)
+
+    return job
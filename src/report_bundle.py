@@ -0,0 +1,199 @@
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from src.data_preprocessing import normalize_column_name, read_data, read_header
+from src.save_cv_results_plot import VALIDATION_SPLITS, cv_results_frame
+
+# The tables of the report, read from the tables directory
+REPORT_TABLES = ["test_scores", "cv_results", "classification_report", "slice_analysis"]
+
+# The figures of the report, read from the figures directory
+REPORT_FIGURES = [
+    "target_variable_distribution",
+    "numeric_feat_target_plots",
+    "cat_feat_target_plots",
+    "correlation_matrix",
+    "cv_results_plot",
+    "confusion_matrix",
+    "permutation_importance",
+]
+
+
+def file_hash(path, block_size=1 << 20):
+    """
+    Hashes the bytes of a file, block by block.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The file.
+    block_size : int, optional
+        The number of bytes read at once, by default 1 MiB.
+
+    Returns
+    -------
+    str
+        The SHA-256 hex digest of the file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def table_records(table):
+    """
+    Converts a table to JSON-ready "columns" and "data", rebuilt with `pd.DataFrame(**records)`.
+
+    Parameters
+    ----------
+    table : pd.DataFrame
+        The table, its index is dropped.
+
+    Returns
+    -------
+    dict
+        The "columns" and the rows of "data", missing values as None.
+    """
+    return json.loads(table.to_json(orient="split", index=False))
+
+
+def best_params(cv_results):
+    """
+    Finds the hyperparameters of the configuration with the best mean validation score.
+
+    Parameters
+    ----------
+    cv_results : pd.DataFrame
+        The cv results table, see `cv_results_frame`.
+
+    Returns
+    -------
+    dict
+        The "param_" columns of the best configuration, without the missing ones.
+
+    Raises
+    ------
+    KeyError
+        If the table has no mean validation scores.
+    """
+    cv_results = cv_results_frame(cv_results)
+    score_columns = [f"mean_{split}_score" for split in VALIDATION_SPLITS if f"mean_{split}_score" in cv_results]
+    if not score_columns:
+        raise KeyError("The cv results have no validation scores, e.g. mean_val_score or mean_test_score.")
+
+    best = cv_results.loc[cv_results[score_columns[0]].idxmax()]
+    params = best[[column for column in cv_results.columns if column.startswith("param_")]].dropna()
+
+    return json.loads(params.to_json())
+
+
+def dataset_shape(data_path, chunksize=100_000):
+    """
+    Counts the rows and columns of a data file, parsing only its first column.
+
+    Parameters
+    ----------
+    data_path : str or pathlib.Path
+        The CSV file.
+    chunksize : int, optional
+        The number of rows read at once, by default 100,000.
+
+    Returns
+    -------
+    dict
+        The "n_rows" and "n_columns" of the data.
+    """
+    header = read_header(data_path)
+    first_column = read_data(data_path, columns=[normalize_column_name(header[0])], chunksize=chunksize)
+    n_rows = sum(len(chunk) for chunk in first_column)
+
+    return {"n_rows": n_rows, "n_columns": len(header)}
+
+
+def build_report_bundle(tables_dir, figures_dir, data_path=None, tables=REPORT_TABLES, figures=REPORT_FIGURES):
+    """
+    Collects everything the report shows into one JSON-ready bundle.
+
+    Parameters
+    ----------
+    tables_dir : str or pathlib.Path
+        The directory of the "<name>.csv" tables.
+    figures_dir : str or pathlib.Path
+        The directory of the "<name>.png" figures.
+    data_path : str, pathlib.Path or None, optional
+        The dataset whose shape is reported, by default None which leaves it out.
+    tables : list of str, optional
+        The names of the tables, by default `REPORT_TABLES`.
+    figures : list of str, optional
+        The names of the figures, by default `REPORT_FIGURES`.
+
+    Returns
+    -------
+    dict
+        The "tables" as records, the "metrics" (the first row of the test scores and
+        the best hyperparameters of the cv results when those tables are included),
+        the "dataset" shape, and the "figures" with their path and SHA-256 hash, so the
+        bundle changes whenever a figure does.
+
+    Raises
+    ------
+    FileNotFoundError
+        If a table or a figure is missing.
+    """
+    tables_dir, figures_dir = Path(tables_dir), Path(figures_dir)
+    for path in [tables_dir / f"{name}.csv" for name in tables] + [figures_dir / f"{name}.png" for name in figures]:
+        if not path.exists():
+            raise FileNotFoundError(f"The report needs the file {path}, which doesn't exist.")
+
+    frames = {name: pd.read_csv(tables_dir / f"{name}.csv") for name in tables}
+    metrics = {}
+    if "test_scores" in frames:
+        metrics["test_scores"] = json.loads(frames["test_scores"].iloc[0].to_json())
+    if "cv_results" in frames:
+        metrics["best_params"] = best_params(frames["cv_results"])
+
+    return {
+        "tables": {name: table_records(frame) for name, frame in frames.items()},
+        "metrics": metrics,
+        "dataset": dataset_shape(data_path) if data_path is not None else None,
+        "figures": {name: {"path": str(figures_dir / f"{name}.png"), "sha256": file_hash(figures_dir / f"{name}.png")}
+                    for name in figures},
+    }
+
+
+def save_report_bundle(bundle, path):
+    """
+    Saves a report bundle as JSON, leaving the file untouched when its content didn't change.
+
+    Keeping the modification time of an unchanged bundle lets make skip rendering the
+    report again when the pipeline reproduced the same results.
+
+    Parameters
+    ----------
+    bundle : dict
+        The output of `build_report_bundle`.
+    path : str or pathlib.Path
+        The JSON file.
+
+    Returns
+    -------
+    bool
+        True if the file was written, False if it already held the bundle.
+    """
+    path = Path(path)
+    content = json.dumps(bundle, indent=2, sort_keys=True) + "\n"
+    if path.exists() and path.read_text() == content:
+        print(f"The report bundle is unchanged: \033[1m{path}\033[0m\n")
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    print(f"Report bundle saved in: \033[1m{path}\033[0m\n")
+
+    return True
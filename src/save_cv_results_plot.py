@@ -1,79 +1,220 @@
+import json
+import re
+
 import numpy as np
 import pandas as pd
-import pickle
 import matplotlib.pyplot as plt
-from sklearn.pipeline import make_pipeline
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.model_selection import GridSearchCV
 from pathlib import Path
 
+# The names of the validation and training splits in the cv results tables
+VALIDATION_SPLITS = ["val", "test"]
+TRAINING_SPLIT = "train"
+
+# The numeric parameters with more distinct values, e.g. from a random search, are binned into quantiles
+MAX_PARAMETER_VALUES = 50
+
+
+def cv_results_frame(cv_results):
+    """
+    Converts cv results to a table with one "param_" column per hyperparameter.
+
+    Parameters:
+    - cv_results (dict or pd.DataFrame): The `cv_results_` of a scikit-learn search, the summarized table
+      of the training script, or the model zoo results whose "model" and JSON "params" columns are expanded
+      into parameter columns.
+
+    Returns:
+    - pd.DataFrame: The cv results with their parameter columns.
+    """
+    cv_results = pd.DataFrame(cv_results)
+    if not any(column.startswith("param_") for column in cv_results.columns) and "params" in cv_results:
+        params = pd.DataFrame([json.loads(params) if isinstance(params, str) else params
+                               for params in cv_results["params"]], index=cv_results.index)
+        params = params.add_prefix("param_")
+        if "model" in cv_results:
+            params.insert(0, "param_model", cv_results["model"])
+        cv_results = pd.concat([cv_results, params], axis=1)
+
+    return cv_results
+
+
+def cv_metric_columns(cv_results, n_splits=None):
+    """
+    Finds the validation and training columns of every metric of cv results.
+
+    Parameters:
+    - cv_results (pd.DataFrame): The cv results, with "mean_<split>_<metric>" columns where the split is
+      "val", "test" or "train".
+    - n_splits (int, optional): The number of folds turning the standard deviations into standard errors.
+      Defaults to the number of "split<i>_test_<metric>" columns. Tables with "se_<split>_<metric>"
+      columns use them instead.
+
+    Returns:
+    - dict: The "val", "train", "se_val" and "se_train" series of every metric, the standard errors being
+      zero when they can't be computed.
 
-def save_cv_results_plot(cv_results, eval_metric, plot_save_path):
+    Raises:
+    - KeyError: If the table has no validation scores, or a metric has no training scores.
+    """
+    metrics = {}
+    for column in cv_results.columns:
+        match = re.fullmatch(rf"mean_({'|'.join(VALIDATION_SPLITS)})_(.+)", column)
+        if match is None:
+            continue
+        split, metric = match.groups()
+        if f"mean_{TRAINING_SPLIT}_{metric}" not in cv_results:
+            raise KeyError(f"The cv results have no training scores of the metric {metric}: "
+                           f"mean_{TRAINING_SPLIT}_{metric} is missing.")
+
+        curves = {}
+        for name, prefix in [("val", split), ("train", TRAINING_SPLIT)]:
+            curves[name] = cv_results[f"mean_{prefix}_{metric}"]
+            folds = n_splits or len([column for column in cv_results.columns
+                                     if re.fullmatch(rf"split\d+_{prefix}_{metric}", column)])
+            if f"se_{prefix}_{metric}" in cv_results:
+                curves[f"se_{name}"] = cv_results[f"se_{prefix}_{metric}"]
+            elif f"std_{prefix}_{metric}" in cv_results and folds:
+                curves[f"se_{name}"] = cv_results[f"std_{prefix}_{metric}"] / folds**0.5
+            else:
+                curves[f"se_{name}"] = pd.Series(0.0, index=cv_results.index)
+        metrics[metric] = curves
+
+    if not metrics:
+        raise KeyError("The cv results have no validation scores, e.g. mean_val_score or mean_test_score.")
+
+    return metrics
+
+
+def marginal_curve(cv_results, param_column, val_scores):
     """
-    Creates and saves a plot visualizing the mean validation and training scores along with error bounds for different hyperparameter values from cross-validation results.
+    Picks the best configuration at every value of a hyperparameter with one groupby.
 
     Parameters:
-    - cv_results (dict): A dictionary containing the cross-validation results with the following keys:
+    - cv_results (pd.DataFrame): The cv results.
+    - param_column (str): The hyperparameter column. Numeric columns with more than `MAX_PARAMETER_VALUES`
+      distinct values are grouped into that many quantile bins, placed at the median of their values.
+    - val_scores (pd.Series): The mean validation scores ranking the configurations.
+
+    Returns:
+    - tuple: The x positions, the tick labels (None for numeric parameters) and the index of the best
+      configuration of every group. The configurations without the hyperparameter are left out.
+    """
+    values = cv_results[param_column]
+    present = values.notna() & val_scores.notna()
+    values, scores = values[present], val_scores[present]
+
+    numeric_values = pd.to_numeric(values, errors="coerce")
+    numeric = bool(numeric_values.notna().all())
+    if numeric:
+        values = numeric_values
+        groups = pd.qcut(values, MAX_PARAMETER_VALUES, duplicates="drop") \
+            if values.nunique() > MAX_PARAMETER_VALUES else values
+    else:
+        values = values.astype(str)
+        groups = values
+
+    best = scores.groupby(groups, observed=True, sort=True).idxmax()
+    if numeric:
+        x = values.groupby(groups, observed=True, sort=True).median().to_numpy(dtype=np.float64)
+        return x, None, best.to_numpy()
+
+    return np.arange(len(best)), list(best.index), best.to_numpy()
+
+
+def parameter_label(param_column):
+    """Names a hyperparameter without the "param_" prefix and the pipeline step, e.g. "max_depth"."""
+    return param_column.removeprefix("param_").split("__")[-1]
+
+
+def save_cv_results_plot(cv_results, eval_metric, plot_save_path, param_column=None, metrics=None, n_splits=None):
+    """
+    Creates and saves small multiples of the mean validation and training scores along with error bounds
+    for every hyperparameter and metric of cross-validation results.
+
+    Every panel is the marginal curve of one hyperparameter: at each of its values, the scores of the
+    configuration with the best mean validation score, picked with a groupby instead of plotting every
+    configuration, so large random or halving searches draw as fast as a one dimensional grid.
+
+    Parameters:
+    - cv_results (dict or pd.DataFrame): The cross-validation results, see `cv_results_frame`, e.g. with
+      the keys:
       - "param_decisiontreeclassifier__max_depth": Hyperparameter values for max depth.
       - "mean_val_score": Mean validation scores across cross-validation folds.
       - "mean_train_score": Mean training scores across cross-validation folds.
       - "se_val_score": Standard error of validation scores.
       - "se_train_score": Standard error of training scores.
-    - eval_metric (str): The evaluation metric used for scoring (e.g., "precision", "recall", "f1").
+    - eval_metric (str): The evaluation metric used for scoring (e.g., "precision", "recall", "f1"), naming
+      the "score" metric.
     - plot_save_path (str or Path): The directory where the plot should be saved.
+    - param_column (str or list of str, optional): The hyperparameter columns to plot. Defaults to every
+      "param_" column.
+    - metrics (list of str, optional): The metrics to plot, one row of panels each. Defaults to every metric
+      of the results.
+    - n_splits (int, optional): The number of folds of the standard errors, see `cv_metric_columns`.
 
     Returns:
     - None: The plot is saved to the specified path as a PNG file.
 
+    Raises:
+    - KeyError: If the results have no parameter columns or miss the scores of a metric.
+
     Side Effects:
-    - Saves a plot showing the mean validation and training scores with error bars for different values of the hyperparameter "max_depth".
+    - Saves a plot showing the mean validation and training scores with error bars for the values of every
+      hyperparameter.
     - If the directory does not exist, it is created.
     """
-    # Get the parameters and their respective scores and standard deviations for both train and validation sets
-    parameters = cv_results["param_decisiontreeclassifier__max_depth"]
-    mean_validation_scores = cv_results["mean_val_score"]
-    mean_train_scores = cv_results["mean_train_score"]
-    validation_error = cv_results["se_val_score"]
-    train_error = cv_results["se_train_score"]
-
-    # Define the plot and its size
-    plt.figure(figsize=(8, 6))
-
-    # Plot the line plot of the mean scores for both sets
-    plt.plot(parameters, mean_validation_scores, color="black")
-    plt.plot(parameters, mean_train_scores, color="black")
-
-    # Plot the error bar for the validation scores
-    plt.errorbar(
-        parameters, mean_validation_scores, 
-        yerr=validation_error, 
-        fmt='o',  
-        ecolor='gray',  
-        elinewidth=1.5, 
-        capsize=4,
-        label=f"Mean Validation Score ({eval_metric.title()})"
-    )
-
-    plt.errorbar(
-        parameters, mean_train_scores, 
-        yerr=train_error, 
-        fmt='o',  
-        ecolor='gray',  
-        elinewidth=1.5, 
-        capsize=4,
-        label=f"Mean Validation Score ({eval_metric.title()})"
-    )
-
-    # Change the labels, add grid and change the xticks to match the hyperparameter values
-    plt.xlabel("Parameter Max Depth", fontsize=12)
-    plt.ylabel(eval_metric.title(), fontsize=12)
-    plt.title("Mean Validation Score with Error Bounds", fontsize=14)
-    plt.grid(True, linestyle='--', alpha=0.6)  
-    plt.xticks(list(parameters))
-
-    # Add a legend and tight layout
-    plt.legend()
-    plt.tight_layout()
+    # Get the parameters and their respective scores and standard errors for both train and validation sets
+    cv_results = cv_results_frame(cv_results)
+    param_columns = [column for column in cv_results.columns if column.startswith("param_")] \
+        if param_column is None else [param_column] if isinstance(param_column, str) else list(param_column)
+    if not param_columns:
+        raise KeyError("The cv results have no parameter columns, e.g. param_decisiontreeclassifier__max_depth.")
+    missing = [column for column in param_columns if column not in cv_results]
+    if missing:
+        raise KeyError(f"The cv results have no parameter columns {missing}.")
+
+    metric_curves = cv_metric_columns(cv_results, n_splits=n_splits)
+    metrics = list(metric_curves) if metrics is None else metrics
+    missing = [metric for metric in metrics if metric not in metric_curves]
+    if missing:
+        raise KeyError(f"The cv results have no scores of the metrics {missing}.")
+
+    # Define the small multiples, one row per metric and one column per hyperparameter
+    fig, axes = plt.subplots(len(metrics), len(param_columns), squeeze=False, layout="constrained",
+                             figsize=(max(8, 5 * len(param_columns)), 3.5 * len(metrics) + 1))
+
+    for row, metric in enumerate(metrics):
+        curves = metric_curves[metric]
+        metric_name = eval_metric.title() if metric == "score" else metric.title()
+        for col, column in enumerate(param_columns):
+            ax = axes[row, col]
+            x, labels, best = marginal_curve(cv_results, column, curves["val"])
+
+            # Plot the mean scores of both sets with their error bars, the values of categorical parameters unlinked
+            for name, label, marker, line in [("val", "Mean Validation Score", 'o', '-'),
+                                              ("train", "Mean Training Score", 's', '--')]:
+                ax.errorbar(
+                    x, curves[name].loc[best].to_numpy(dtype=np.float64),
+                    yerr=curves[f"se_{name}"].loc[best].to_numpy(dtype=np.float64),
+                    fmt=marker if labels is not None else marker + line,
+                    ecolor='gray',
+                    elinewidth=1.5,
+                    capsize=4,
+                    label=f"{label} ({metric_name})"
+                )
+
+            # Change the labels, add grid and change the xticks to match the hyperparameter values
+            ax.set_xlabel(f"Parameter {parameter_label(column).replace('_', ' ').title()}", fontsize=12)
+            ax.set_ylabel(metric_name, fontsize=12)
+            ax.grid(True, linestyle='--', alpha=0.6)
+            if labels is not None:
+                ax.set_xticks(x, labels, rotation=30, ha="right")
+            elif len(x) <= 20:
+                ax.set_xticks(x)
+            ax.legend(fontsize=8)
+
+    # Add the title, the constrained layout makes room for it
+    fig.suptitle("Mean Validation Score with Error Bounds", fontsize=14)
 
     # If the plot save path is not a Path class, make it
     if not isinstance(plot_save_path, Path):
@@ -87,8 +228,8 @@ def save_cv_results_plot(cv_results, eval_metric, plot_save_path):
     file_to_save = plot_save_path / 'cv_results_plot.png'
 
     # Save the figure, close it
-    plt.savefig(file_to_save)
-    plt.close()
+    fig.savefig(file_to_save)
+    plt.close(fig)
 
     # Print about successful save
     print(f"CV results plot saved in: \033[1m{file_to_save}\033[0m\n")
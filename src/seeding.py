@@ -0,0 +1,106 @@
+import hashlib
+
+import numpy as np
+
+# The stages of the pipeline drawing random numbers, each one gets its own stream of the root seed
+STAGES = ["split", "training", "evaluation", "importance", "eda"]
+
+# The root seed every script defaults to, so all the stages derive from the same root
+ROOT_SEED = 123
+
+
+def _stage_key(stage):
+    """Maps a stage name to a stable 32-bit spawn key, independent of the order of `STAGES`."""
+    if stage not in STAGES:
+        raise ValueError(f"Unknown stage {stage!r}, expected one of {STAGES}.")
+
+    return int.from_bytes(hashlib.sha256(stage.encode()).digest()[:4], "little")
+
+
+def stage_seed_sequence(seed, stage):
+    """
+    Derives the seed sequence of one stage of the pipeline from the root seed.
+
+    Every stage gets an independent stream keyed by its name, so adding a stage or
+    drawing more numbers in one stage doesn't change the numbers of the others.
+
+    Parameters
+    ----------
+    seed : int or None
+        The root seed, e.g. the `--seed` option of a script. None draws fresh entropy.
+    stage : str
+        One of `STAGES`.
+
+    Returns
+    -------
+    np.random.SeedSequence
+        The seed sequence of the stage.
+
+    Raises
+    ------
+    ValueError
+        If the stage is unknown.
+    """
+    return np.random.SeedSequence(seed, spawn_key=(_stage_key(stage),))
+
+
+def stage_seed(seed, stage):
+    """
+    Derives the integer seed of one stage, e.g. the `random_state` of a scikit-learn estimator.
+
+    Parameters
+    ----------
+    seed : int or None
+        The root seed.
+    stage : str
+        One of `STAGES`.
+
+    Returns
+    -------
+    int
+        A seed in [0, 2**32), accepted by scikit-learn and `np.random.default_rng`.
+    """
+    return int(stage_seed_sequence(seed, stage).generate_state(1)[0])
+
+
+def stage_rng(seed, stage):
+    """
+    Creates the random generator of one stage.
+
+    Parameters
+    ----------
+    seed : int or None
+        The root seed.
+    stage : str
+        One of `STAGES`.
+
+    Returns
+    -------
+    np.random.Generator
+        The generator of the stage.
+    """
+    return np.random.default_rng(stage_seed_sequence(seed, stage))
+
+
+def child_seeds(seed, n):
+    """
+    Derives one independent integer seed per fold, chunk or parallel task.
+
+    The seed of a task only depends on its position, not on the worker running it or
+    the order the tasks finish in, so parallel runs reproduce sequential runs exactly.
+
+    Parameters
+    ----------
+    seed : int, np.random.SeedSequence or None
+        The seed of the parent, e.g. the output of `stage_seed`.
+    n : int
+        The number of tasks.
+
+    Returns
+    -------
+    list of int
+        The seeds of the tasks, in [0, 2**32).
+    """
+    parent = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+    return [int(child.generate_state(1)[0]) for child in parent.spawn(n)]
@@ -0,0 +1,264 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from src.confusion_metrics import _divide
+
+# The default segments of the slice analysis, the numeric columns are bucketed
+SLICE_COLUMNS = ["class", "customer_type", "type_of_travel", "age", "flight_distance"]
+SLICE_BUCKETS = {
+    "age": [0, 25, 40, 60, np.inf],
+    "flight_distance": [0, 500, 1000, 2000, np.inf],
+}
+
+# The metrics ranked by the slice analysis
+SLICE_METRICS = ["accuracy", "precision", "recall", "f1"]
+
+
+def bucketize(values, edges):
+    """
+    Groups numeric values into left-closed buckets labelled by their bounds.
+
+    Parameters
+    ----------
+    values : pd.Series
+        The numeric values.
+    edges : list of float
+        The increasing bucket edges.
+
+    Returns
+    -------
+    pd.Series
+        The bucket label of every value, e.g. "[25, 40)".
+    """
+    labels = [f"[{low:g}, {high:g})" for low, high in zip(edges[:-1], edges[1:])]
+
+    return pd.cut(values, bins=edges, right=False, labels=labels).astype(str)
+
+
+def encode_segments(data, columns=SLICE_COLUMNS, buckets=SLICE_BUCKETS):
+    """
+    Encodes the segment columns to integer codes, bucketing the numeric ones first.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The test features.
+    columns : list of str, optional
+        The segment columns, by default `SLICE_COLUMNS`.
+    buckets : dict, optional
+        The bucket edges of the numeric columns, by default `SLICE_BUCKETS`.
+
+    Returns
+    -------
+    tuple
+        The codes of every column as a `(n_rows, n_columns)` array and the values of the
+        codes of every column.
+    """
+    codes, values = [], []
+    for column in columns:
+        segment = bucketize(data[column], buckets[column]) if column in buckets else data[column].astype(str)
+        column_codes, column_values = pd.factorize(segment, sort=True)
+        codes.append(column_codes)
+        values.append(np.asarray(column_values))
+
+    return np.column_stack(codes), values
+
+
+def slice_outcome_counts(y_obs, y_pred, data, columns=SLICE_COLUMNS, buckets=SLICE_BUCKETS, max_order=2,
+                         pos_label="satisfied"):
+    """
+    Counts the true/false positives and negatives of every slice and slice intersection.
+
+    The outcome of every prediction and the segments are encoded once, then every
+    combination of segment columns is one `np.bincount` over the combined codes.
+
+    Parameters
+    ----------
+    y_obs : pd.Series or np.ndarray
+        The true labels.
+    y_pred : pd.Series or np.ndarray
+        The predicted labels.
+    data : pd.DataFrame
+        The test features holding the segment columns.
+    columns : list of str, optional
+        The segment columns, by default `SLICE_COLUMNS`.
+    buckets : dict, optional
+        The bucket edges of the numeric columns, by default `SLICE_BUCKETS`.
+    max_order : int, optional
+        The maximum number of columns intersected, by default 2.
+    pos_label : str, optional
+        The positive class, by default "satisfied".
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per non-empty slice, with its "slice" description, its "order" (the number of
+        intersected columns) and its "tp", "fp", "fn", "tn" and "n_rows" counts. The first row,
+        of order 0, holds the counts of all the predictions.
+
+    Raises
+    ------
+    ValueError
+        If the inputs have different lengths.
+    """
+    y_obs, y_pred = np.asarray(y_obs), np.asarray(y_pred)
+    if not len(y_obs) == len(y_pred) == len(data):
+        raise ValueError("y_obs, y_pred and data should have the same length.")
+
+    # The outcome of every prediction: 0 TN, 1 FP, 2 FN, 3 TP
+    outcomes = 2 * (y_obs == pos_label) + (y_pred == pos_label)
+    codes, values = encode_segments(data, columns, buckets)
+    cardinalities = [len(column_values) for column_values in values]
+
+    tn, fp, fn, tp = np.bincount(outcomes, minlength=4)
+    slices = [{"slice": "all", "order": 0, "tp": tp, "fp": fp, "fn": fn, "tn": tn}]
+    for order in range(1, max_order + 1):
+        for combination in combinations(range(len(columns)), order):
+
+            # Combine the codes of the columns into one slice code, then count the outcomes
+            slice_codes = np.ravel_multi_index(codes[:, combination].T, [cardinalities[i] for i in combination])
+            n_slices = int(np.prod([cardinalities[i] for i in combination]))
+            counts = np.bincount(slice_codes * 4 + outcomes, minlength=n_slices * 4).reshape(n_slices, 4)
+
+            for slice_code in np.flatnonzero(counts.sum(axis=1)):
+                indices = np.unravel_index(slice_code, [cardinalities[i] for i in combination])
+                description = " & ".join(
+                    f"{columns[i]}={values[i][index]}" for i, index in zip(combination, indices)
+                )
+                tn, fp, fn, tp = counts[slice_code]
+                slices.append({"slice": description, "order": order, "tp": tp, "fp": fp, "fn": fn, "tn": tn})
+
+    counts = pd.DataFrame(slices, columns=["slice", "order", "tp", "fp", "fn", "tn"])
+
+    return counts.assign(n_rows=counts[["tp", "fp", "fn", "tn"]].sum(axis=1))
+
+
+def merge_slice_counts(counts, chunk_counts):
+    """
+    Adds the slice counts of a new chunk of predictions to the counts of the previous ones.
+
+    The true/false positive and negative counts are additive, so a test set streamed chunk
+    by chunk only keeps one row per slice.
+
+    Parameters
+    ----------
+    counts : pd.DataFrame or None
+        The counts of the previous chunks, None for the first chunk.
+    chunk_counts : pd.DataFrame
+        The output of `slice_outcome_counts` on the new chunk.
+
+    Returns
+    -------
+    pd.DataFrame
+        The counts of all the chunks, the row of all the predictions first.
+    """
+    if counts is None:
+        return chunk_counts
+
+    merged = (
+        pd.concat([counts, chunk_counts], ignore_index=True)
+        .groupby(["slice", "order"], sort=False)[["tp", "fp", "fn", "tn", "n_rows"]]
+        .sum()
+        .reset_index()
+    )
+
+    return merged.sort_values("order", kind="stable", ignore_index=True)
+
+
+def outcome_metrics(counts):
+    """
+    Computes the accuracy, precision, recall and F1-score from true/false positive and negative counts.
+
+    Parameters
+    ----------
+    counts : pd.DataFrame
+        The "tp", "fp", "fn" and "tn" columns.
+
+    Returns
+    -------
+    pd.DataFrame
+        The "accuracy", "precision", "recall" and "f1" columns.
+    """
+    tp, fp, fn, tn = (counts[name].to_numpy() for name in ["tp", "fp", "fn", "tn"])
+
+    return pd.DataFrame({
+        "accuracy": _divide(tp + tn, tp + fp + fn + tn),
+        "precision": _divide(tp, tp + fp),
+        "recall": _divide(tp, tp + fn),
+        "f1": _divide(2 * tp, 2 * tp + fp + fn),
+    }, index=counts.index)
+
+
+def rank_slices(counts, metric="f1", min_rows=30):
+    """
+    Ranks the slices by the gap between their metric and the overall one, the worst first.
+
+    Parameters
+    ----------
+    counts : pd.DataFrame
+        The output of `slice_outcome_counts`.
+    metric : str, optional
+        The metric to rank on, one of `SLICE_METRICS`, by default "f1".
+    min_rows : int, optional
+        The slices having fewer rows are dropped, by default 30.
+
+    Returns
+    -------
+    pd.DataFrame
+        The slices with their counts, their metrics and the "gap" of the ranked metric. The
+        row of all the predictions has a gap of 0.
+
+    Raises
+    ------
+    ValueError
+        If the metric is not valid.
+    """
+    if metric not in SLICE_METRICS:
+        raise ValueError(f"Invalid metric name. Available metrics are {SLICE_METRICS}.")
+
+    ranked = pd.concat([counts, outcome_metrics(counts)], axis=1)
+    overall_metric = ranked.loc[ranked["order"] == 0, metric].iloc[0]
+    ranked = ranked[ranked["n_rows"] >= min_rows].assign(gap=lambda df: df[metric] - overall_metric)
+
+    return ranked.sort_values(["gap", "n_rows"], ascending=[True, False], ignore_index=True)
+
+
+def save_slice_analysis(y_obs, y_pred, data, results_to, metric="f1", max_order=2, min_rows=30, counts=None):
+    """
+    Ranks the slices of the test predictions and saves the table.
+
+    Parameters
+    ----------
+    y_obs : pd.Series, np.ndarray or None
+        The true labels, ignored when `counts` is given.
+    y_pred : pd.Series, np.ndarray or None
+        The predicted labels, ignored when `counts` is given.
+    data : pd.DataFrame or None
+        The test features, ignored when `counts` is given.
+    results_to : pathlib.Path
+        The directory path where the table will be saved.
+    metric : str, optional
+        The metric to rank on, by default "f1".
+    max_order : int, optional
+        The maximum number of columns intersected, by default 2.
+    min_rows : int, optional
+        The slices having fewer rows are dropped, by default 30.
+    counts : pd.DataFrame or None, optional
+        The slice counts accumulated over the chunks of the test set, see
+        `merge_slice_counts`, by default None which counts the given predictions.
+
+    Returns
+    -------
+    pd.DataFrame
+        The ranked slices, also saved as `slice_analysis.csv`.
+    """
+    if counts is None:
+        counts = slice_outcome_counts(y_obs, y_pred, data, max_order=max_order)
+    ranked = rank_slices(counts, metric, min_rows)
+    slice_analysis_save_path = results_to / "slice_analysis.csv"
+    ranked.to_csv(slice_analysis_save_path, index=False)
+    print(f"Slice analysis saved in the directory: \033[1m{slice_analysis_save_path}\033[0m\n")
+
+    return ranked
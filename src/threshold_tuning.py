@@ -0,0 +1,307 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+
+# The metrics a threshold can be chosen on
+THRESHOLD_METRICS = ["precision", "recall", "f1"]
+
+# The decimals the scores of a streamed test set are rounded to, bounding its threshold counts
+THRESHOLD_DECIMALS = 6
+
+
+def positive_scores(proba, classes, pos_label="satisfied"):
+    """
+    Takes the probabilities of the positive class out of the output of `predict_proba`.
+
+    Parameters
+    ----------
+    proba : np.ndarray
+        The class probabilities, one column per class.
+    classes : np.ndarray
+        The classes of the columns, i.e. the `classes_` of the model.
+    pos_label : str, optional
+        The positive class, by default "satisfied".
+
+    Returns
+    -------
+    np.ndarray
+        The probability of the positive class of every row.
+
+    Raises
+    ------
+    ValueError
+        If `pos_label` is not one of the classes.
+    """
+    classes = list(classes)
+    if pos_label not in classes:
+        raise ValueError(f"pos_label={pos_label} is not a valid label. It should be one of {classes}.")
+
+    return np.asarray(proba)[:, classes.index(pos_label)]
+
+
+def threshold_counts(y_obs, scores, pos_label="satisfied", counts=None, decimals=None):
+    """
+    Counts the positive and negative rows of every distinct score, adding them to previous counts.
+
+    The counts are additive, so a test set streamed chunk by chunk only keeps one row per
+    distinct score instead of every label and score.
+
+    Parameters
+    ----------
+    y_obs : pd.Series or np.ndarray
+        The true labels.
+    scores : np.ndarray
+        The probabilities of the positive class.
+    pos_label : str, optional
+        The positive class, by default "satisfied".
+    counts : pd.DataFrame or None, optional
+        The counts of the previous chunks, by default None.
+    decimals : int or None, optional
+        Rounds the scores to this many decimals first, bounding the number of rows to
+        `10**decimals + 1`, by default None which keeps the exact scores.
+
+    Returns
+    -------
+    pd.DataFrame
+        The "positives" and "negatives" columns, indexed by the distinct scores in
+        decreasing order.
+
+    Raises
+    ------
+    ValueError
+        If the inputs have different lengths.
+    """
+    y_obs, scores = np.asarray(y_obs), np.asarray(scores, dtype=np.float64)
+    if len(y_obs) != len(scores):
+        raise ValueError(f"y_obs and scores should have the same length, got {len(y_obs)} and {len(scores)}.")
+    if decimals is not None:
+        scores = np.round(scores, decimals)
+
+    distinct, inverse = np.unique(scores, return_inverse=True)
+    is_positive = y_obs == pos_label
+    chunk_counts = pd.DataFrame({
+        "positives": np.bincount(inverse, weights=is_positive, minlength=len(distinct)).astype(np.int64),
+        "negatives": np.bincount(inverse, weights=~is_positive, minlength=len(distinct)).astype(np.int64),
+    }, index=pd.Index(distinct, name="threshold"))
+    if counts is not None:
+        chunk_counts = chunk_counts.add(counts, fill_value=0).astype(np.int64)
+
+    return chunk_counts.sort_index(ascending=False)
+
+
+def threshold_curve_from_counts(counts):
+    """
+    Computes the precision, recall and F1-score of every decision threshold from the counts of its scores.
+
+    The cumulative counts of positive and negative rows, from the highest score down, give
+    the true and false positives of every distinct threshold, a row being predicted
+    positive when its score is at least the threshold.
+
+    Parameters
+    ----------
+    counts : pd.DataFrame
+        The output of `threshold_counts`.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per distinct score, in decreasing order, with the columns "threshold",
+        "precision", "recall" and "f1".
+
+    Raises
+    ------
+    ValueError
+        If there are no counts.
+    """
+    if counts.empty:
+        raise ValueError("The threshold counts are empty.")
+
+    counts = counts.sort_index(ascending=False)
+    true_positives = np.cumsum(counts["positives"].to_numpy())
+    predicted_positives = true_positives + np.cumsum(counts["negatives"].to_numpy())
+    n_positives = true_positives[-1]
+
+    precision = true_positives / predicted_positives
+    recall = true_positives / n_positives if n_positives else np.zeros(len(true_positives))
+    f1 = 2 * true_positives / (n_positives + predicted_positives)
+
+    return pd.DataFrame({
+        "threshold": counts.index.to_numpy(dtype=np.float64),
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+    })
+
+
+def threshold_curve(y_obs, scores, pos_label="satisfied"):
+    """
+    Computes the precision, recall and F1-score of every decision threshold.
+
+    Parameters
+    ----------
+    y_obs : pd.Series or np.ndarray
+        The true labels.
+    scores : np.ndarray
+        The probabilities of the positive class.
+    pos_label : str, optional
+        The positive class, by default "satisfied".
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per distinct score, in decreasing order, with the columns "threshold",
+        "precision", "recall" and "f1", see `threshold_curve_from_counts`.
+
+    Raises
+    ------
+    ValueError
+        If the inputs are empty or have different lengths.
+    """
+    if len(y_obs) == 0 or len(y_obs) != len(scores):
+        raise ValueError(f"y_obs and scores should be non-empty and have the same length, "
+                         f"got {len(y_obs)} and {len(scores)}.")
+
+    return threshold_curve_from_counts(threshold_counts(y_obs, scores, pos_label))
+
+
+def choose_threshold(curve, metric="f1", min_precision=None, min_recall=None):
+    """
+    Chooses the threshold maximizing a metric, optionally under a minimum precision or recall.
+
+    Parameters
+    ----------
+    curve : pd.DataFrame
+        The output of `threshold_curve`.
+    metric : str, optional
+        The metric to maximize, one of `THRESHOLD_METRICS`, by default "f1".
+    min_precision : float or None, optional
+        Only the thresholds reaching this precision are considered.
+    min_recall : float or None, optional
+        Only the thresholds reaching this recall are considered.
+
+    Returns
+    -------
+    float
+        The chosen threshold, the highest one among ties.
+
+    Raises
+    ------
+    ValueError
+        If the metric is not valid or no threshold satisfies the constraints.
+    """
+    if metric not in THRESHOLD_METRICS:
+        raise ValueError(f"Invalid metric name. Available metrics are {THRESHOLD_METRICS}.")
+
+    candidates = curve
+    if min_precision is not None:
+        candidates = candidates[candidates["precision"] >= min_precision]
+    if min_recall is not None:
+        candidates = candidates[candidates["recall"] >= min_recall]
+    if candidates.empty:
+        raise ValueError("No threshold reaches the minimum precision and recall.")
+
+    return float(candidates["threshold"].iloc[np.argmax(candidates[metric].to_numpy())])
+
+
+def out_of_fold_scores(model, X, y, cv=30, pos_label="satisfied", n_jobs=1):
+    """
+    Collects the positive class probabilities of every training row from the fold it was left out of.
+
+    Parameters
+    ----------
+    model : sklearn.base.BaseEstimator
+        The model, cloned and refitted on every fold.
+    X : pd.DataFrame
+        The training features.
+    y : pd.Series or np.ndarray
+        The training labels.
+    cv : int, optional
+        The number of stratified folds, by default 30.
+    pos_label : str, optional
+        The positive class, by default "satisfied".
+    n_jobs : int, optional
+        The number of workers, by default 1.
+
+    Returns
+    -------
+    np.ndarray
+        The out-of-fold probability of the positive class of every row.
+    """
+    proba = cross_val_predict(clone(model), X, y, cv=StratifiedKFold(n_splits=cv), method="predict_proba",
+                              n_jobs=n_jobs)
+
+    return positive_scores(proba, np.unique(y), pos_label)
+
+
+def predict_from_proba(model, proba):
+    """
+    Turns the output of `predict_proba` into the labels `model.predict` would return.
+
+    Parameters
+    ----------
+    model : object
+        A fitted classifier, a `ThresholdClassifier` applies its threshold.
+    proba : np.ndarray
+        The class probabilities given by the model.
+
+    Returns
+    -------
+    np.ndarray
+        The predicted labels.
+    """
+    if isinstance(model, ThresholdClassifier):
+        return model._labels(proba)
+
+    return np.asarray(model.classes_)[np.argmax(proba, axis=1)]
+
+
+class ThresholdClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Predicts the positive class of a fitted classifier when its probability reaches a threshold.
+
+    Parameters
+    ----------
+    estimator : object
+        The fitted classifier, e.g. the model pipeline.
+    threshold : float, optional
+        The decision threshold on the probability of `pos_label`, by default 0.5.
+    pos_label : str, optional
+        The positive class, by default "satisfied".
+
+    Notes
+    -----
+    The estimator is not refitted, `fit` only fits it again when called explicitly.
+    """
+
+    def __init__(self, estimator, threshold=0.5, pos_label="satisfied"):
+        self.estimator = estimator
+        self.threshold = threshold
+        self.pos_label = pos_label
+
+    def fit(self, X, y):
+        """Fits the wrapped estimator."""
+        self.estimator.fit(X, y)
+
+        return self
+
+    @property
+    def classes_(self):
+        return self.estimator.classes_
+
+    def predict_proba(self, X):
+        """Returns the class probabilities of the wrapped estimator."""
+        return self.estimator.predict_proba(X)
+
+    def _labels(self, proba):
+        """Applies the threshold to the class probabilities."""
+        classes = np.asarray(self.classes_)
+        negative_label = classes[classes != self.pos_label][0]
+        is_positive = positive_scores(proba, classes, self.pos_label) >= self.threshold
+
+        return np.where(is_positive, self.pos_label, negative_label)
+
+    def predict(self, X):
+        """Predicts the positive class when its probability is at least the threshold."""
+        return self._labels(self.predict_proba(X))
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+from src.histogram_tree import HistogramTreeClassifier
+from src.permutation_importance import split_model
+from src.threshold_tuning import ThresholdClassifier
+
+
+def tree_structure(tree):
+    """
+    Extracts the arrays describing a fitted decision tree.
+
+    Parameters
+    ----------
+    tree : DecisionTreeClassifier or HistogramTreeClassifier
+        The fitted tree.
+
+    Returns
+    -------
+    tuple
+        The left children, the right children, the split feature and the class counts
+        (or fractions) of every node, -1 marking the leaves.
+
+    Raises
+    ------
+    ValueError
+        If the estimator is not a supported tree.
+    """
+    if isinstance(tree, DecisionTreeClassifier):
+        return tree.tree_.children_left, tree.tree_.children_right, tree.tree_.feature, tree.tree_.value[:, 0, :]
+    if isinstance(tree, HistogramTreeClassifier):
+        return tree.children_left_, tree.children_right_, tree.feature_, tree.value_
+
+    raise ValueError(f"Only DecisionTreeClassifier and HistogramTreeClassifier can be explained, "
+                     f"got {type(tree).__name__}.")
+
+
+def path_contributions(tree, pos_index, n_features):
+    """
+    Precomputes the feature contributions of the path leading to every node of a tree.
+
+    The contribution of a split is the change of the positive class probability from the
+    parent to the child, credited to the split feature. The probability of a leaf is the
+    probability of the root (the bias) plus the contributions along its path, so every row
+    landing in the leaf shares them.
+
+    Parameters
+    ----------
+    tree : DecisionTreeClassifier or HistogramTreeClassifier
+        The fitted tree.
+    pos_index : int
+        The column of the positive class in the class counts.
+    n_features : int
+        The number of input features of the tree.
+
+    Returns
+    -------
+    tuple
+        The positive class probability of the root and the `(n_nodes, n_features)` matrix of
+        the accumulated contributions of every node.
+    """
+    children_left, children_right, feature, value = tree_structure(tree)
+    value = np.asarray(value, dtype=np.float64)
+    probability = value[:, pos_index] / value.sum(axis=1)
+
+    # Find the parent of every node, the children have higher ids than their parent
+    n_nodes = len(children_left)
+    parent = np.full(n_nodes, -1)
+    internal = np.flatnonzero(children_left != -1)
+    parent[children_left[internal]] = internal
+    parent[children_right[internal]] = internal
+
+    contributions = np.zeros((n_nodes, n_features))
+    for node in range(1, n_nodes):
+        contributions[node] = contributions[parent[node]]
+        contributions[node, feature[parent[node]]] += probability[node] - probability[parent[node]]
+
+    return probability[0], contributions
+
+
+def explain_predictions(model, X, pos_label="satisfied", batch_size=1_000_000):
+    """
+    Computes the per-row feature contributions of a tree model pipeline.
+
+    The path contributions of the tree are computed once; every batch of rows is then
+    transformed, routed to its leaves and given the contributions of its leaf.
+
+    Parameters
+    ----------
+    model : sklearn.pipeline.Pipeline or ThresholdClassifier
+        The fitted model pipeline, a `ColumnTransformer` followed by a decision tree
+        (`DecisionTreeClassifier` or `HistogramTreeClassifier`, possibly after a binning step).
+    X : pd.DataFrame
+        The rows to explain.
+    pos_label : str, optional
+        The positive class, by default "satisfied".
+    batch_size : int, optional
+        The number of rows transformed at once, by default 1,000,000.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per input row with the "bias" (the positive class probability of the root),
+        the contribution of every transformed feature, named after the `ColumnTransformer`
+        output, and the "prediction", the positive class probability, equal to the bias plus
+        the contributions.
+
+    Raises
+    ------
+    ValueError
+        If the model does not end with a supported tree or `pos_label` is not one of its classes.
+    """
+    preprocessor, _ = split_model(model)
+    pipeline = model.estimator if isinstance(model, ThresholdClassifier) else model
+    tree, intermediate_steps = pipeline[-1], pipeline[1:-1]
+
+    classes = list(tree.classes_)
+    if pos_label not in classes:
+        raise ValueError(f"pos_label={pos_label} is not a valid label. It should be one of {classes}.")
+
+    feature_names = list(preprocessor.get_feature_names_out())
+    bias, contributions = path_contributions(tree, classes.index(pos_label), len(feature_names))
+
+    batches = []
+    for start in range(0, len(X), batch_size):
+        Z = preprocessor.transform(X.iloc[start:start + batch_size])
+        if len(intermediate_steps):
+            Z = intermediate_steps.transform(Z)
+        batches.append(contributions[tree.apply(Z)])
+    row_contributions = np.vstack(batches) if batches else np.empty((0, len(feature_names)))
+
+    explanations = pd.DataFrame(row_contributions, columns=feature_names, index=X.index)
+    explanations.insert(0, "bias", bias)
+    explanations["prediction"] = bias + row_contributions.sum(axis=1)
+
+    return explanations
@@ -0,0 +1,60 @@
+import pytest
+import sys
+import os
+import numpy as np
+import pandas as pd
+from sklearn.compose import make_column_transformer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, MinMaxScaler, PolynomialFeatures
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.chunked_preprocessing import fit_preprocessor_in_chunks
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    return pd.DataFrame({
+        "gender": rng.choice(["Male", "Female"], n),
+        "class": np.where(np.arange(n) < 4_000, rng.choice(["Eco", "Business"], n), "Eco Plus"),
+        "seat_comfort": rng.integers(0, 6, n).astype(float),
+        "age": rng.integers(7, 85, n),
+        "flight_distance": rng.exponential(1_000, n),
+        "id": np.arange(n),
+        "satisfaction": rng.choice(["satisfied", "neutral or dissatisfied"], n),
+    })
+
+def make_preprocessor():
+    return make_column_transformer(
+        (OneHotEncoder(drop='first', handle_unknown='ignore', dtype=np.int32), ['gender', 'class']),
+        (MinMaxScaler(), ['seat_comfort']),
+        (StandardScaler(), ['age', 'flight_distance']),
+        ('drop', ['id']),
+        remainder='passthrough'
+    )
+
+def iter_chunks(data, chunk_size=700):
+    return (data.iloc[start:start + chunk_size] for start in range(0, len(data), chunk_size))
+
+
+def test_fit_preprocessor_in_chunks_matches_in_memory(data):
+    in_memory = make_preprocessor().fit(data)
+    chunked = fit_preprocessor_in_chunks(make_preprocessor(), iter_chunks(data))
+    assert list(chunked.get_feature_names_out()) == list(in_memory.get_feature_names_out())
+    assert chunked.named_transformers_["minmaxscaler"].data_min_ == in_memory.named_transformers_["minmaxscaler"].data_min_
+    expected, result = in_memory.transform(data), chunked.transform(data)
+    assert np.array_equal(expected[:, -1], result[:, -1])
+    assert np.allclose(expected[:, :-1].astype(float), result[:, :-1].astype(float))
+
+def test_fit_preprocessor_in_chunks_category_in_late_chunk(data):
+    chunked = fit_preprocessor_in_chunks(make_preprocessor(), iter_chunks(data))
+    categories = chunked.named_transformers_["onehotencoder"].categories_[1]
+    assert list(categories) == ["Business", "Eco", "Eco Plus"]
+
+def test_fit_preprocessor_in_chunks_unsupported_transformer(data):
+    preprocessor = make_column_transformer((PolynomialFeatures(), ['age']))
+    with pytest.raises(ValueError, match="cannot be fitted in chunks"):
+        fit_preprocessor_in_chunks(preprocessor, iter_chunks(data))
+
+def test_fit_preprocessor_in_chunks_empty():
+    with pytest.raises(ValueError, match="doesn't contain any rows"):
+        fit_preprocessor_in_chunks(make_preprocessor(), iter([]))
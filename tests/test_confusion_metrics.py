@@ -0,0 +1,123 @@
+import pytest
+import sys
+import os
+import numpy as np
+import pandas as pd
+from sklearn.metrics import (
+    accuracy_score,
+    recall_score,
+    precision_score,
+    f1_score,
+    classification_report,
+    confusion_matrix,
+)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.confusion_metrics import (
+    encode_labels,
+    confusion_counts,
+    accumulate_confusion_matrix,
+    metrics_from_confusion,
+    classification_report_from_confusion,
+    bootstrap_confusion_matrices,
+    bootstrap_metric_intervals,
+)
+
+
+@pytest.fixture
+def labels():
+    rng = np.random.default_rng(0)
+    classes = np.array(["neutral or dissatisfied", "satisfied"])
+    y_obs = pd.Series(rng.choice(classes, 1000))
+    y_pred = pd.Series(np.where(rng.random(1000) < 0.8, y_obs, rng.choice(classes, 1000)))
+    return y_obs, y_pred
+
+
+# Tests for encode_labels
+def test_encode_labels():
+    assert encode_labels(["b", "a", "b"], np.array(["a", "b"])).tolist() == [1, 0, 1]
+
+def test_encode_labels_unknown_label():
+    with pytest.raises(ValueError, match="missing from the classes"):
+        encode_labels(["a", "c"], np.array(["a", "b"]))
+
+
+# Tests for confusion_counts
+def test_confusion_counts_matches_sklearn(labels):
+    y_obs, y_pred = labels
+    cm, classes = confusion_counts(y_obs, y_pred)
+    assert np.array_equal(cm, confusion_matrix(y_obs, y_pred))
+    assert classes.tolist() == ["neutral or dissatisfied", "satisfied"]
+
+def test_confusion_counts_mismatched_length(labels):
+    y_obs, y_pred = labels
+    with pytest.raises(ValueError, match="different lengths"):
+        confusion_counts(y_obs[:-1], y_pred)
+
+def test_confusion_counts_not_1d():
+    with pytest.raises(ValueError):
+        confusion_counts("object 1", "object 2")
+
+
+# Tests for accumulate_confusion_matrix
+def test_accumulate_confusion_matrix_matches_single_pass(labels):
+    y_obs, y_pred = labels
+    classes = np.array(["neutral or dissatisfied", "satisfied"])
+    cm = None
+    for start in range(0, len(y_obs), 128):
+        cm = accumulate_confusion_matrix(cm, y_obs[start:start + 128], y_pred[start:start + 128], classes)
+    assert np.array_equal(cm, confusion_counts(y_obs, y_pred)[0])
+
+
+# Tests for metrics_from_confusion and classification_report_from_confusion
+def test_metrics_from_confusion_matches_sklearn(labels):
+    y_obs, y_pred = labels
+    metrics = metrics_from_confusion(*confusion_counts(y_obs, y_pred))
+    assert metrics["Accuracy"] == pytest.approx(accuracy_score(y_obs, y_pred))
+    assert metrics["Recall"] == pytest.approx(recall_score(y_obs, y_pred, pos_label="satisfied"))
+    assert metrics["Precision"] == pytest.approx(precision_score(y_obs, y_pred, pos_label="satisfied"))
+    assert metrics["F1-Score"] == pytest.approx(f1_score(y_obs, y_pred, pos_label="satisfied"))
+
+def test_metrics_from_confusion_invalid_pos_label():
+    cm, classes = confusion_counts(["a", "b"], ["a", "a"])
+    with pytest.raises(ValueError, match="pos_label"):
+        metrics_from_confusion(cm, classes)
+
+def test_metrics_from_confusion_no_predicted_positives():
+    cm, classes = confusion_counts(["satisfied", "other"], ["other", "other"])
+    assert metrics_from_confusion(cm, classes)["Precision"] == 0.0
+
+def test_classification_report_from_confusion_matches_sklearn(labels):
+    y_obs, y_pred = labels
+    report = pd.DataFrame(classification_report_from_confusion(*confusion_counts(y_obs, y_pred)))
+    expected = pd.DataFrame(classification_report(y_obs, y_pred, output_dict=True))
+    pd.testing.assert_frame_equal(report, expected, check_dtype=False)
+
+
+# Tests for bootstrap_confusion_matrices and bootstrap_metric_intervals
+def test_bootstrap_confusion_matrices_keep_total(labels):
+    cm, _ = confusion_counts(*labels)
+    cms = bootstrap_confusion_matrices(cm, n_resamples=500, random_state=0)
+    assert cms.shape == (500, 2, 2)
+    assert (cms.sum(axis=(1, 2)) == cm.sum()).all()
+    assert np.allclose(cms.mean(axis=0), cm, rtol=0.05)
+
+def test_bootstrap_confusion_matrices_matches_index_resampling(labels):
+    y_obs, y_pred = labels
+    rng = np.random.default_rng(0)
+    indices = rng.integers(0, len(y_obs), size=(200, len(y_obs)))
+    index_f1 = [f1_score(y_obs.iloc[i], y_pred.iloc[i], pos_label="satisfied") for i in indices]
+    cm, classes = confusion_counts(y_obs, y_pred)
+    intervals = bootstrap_metric_intervals(cm, classes, n_resamples=2000, random_state=0)
+    assert intervals["lower"]["F1-Score"] == pytest.approx(np.quantile(index_f1, 0.025), abs=0.01)
+    assert intervals["upper"]["F1-Score"] == pytest.approx(np.quantile(index_f1, 0.975), abs=0.01)
+
+def test_bootstrap_metric_intervals_contain_estimate(labels):
+    cm, classes = confusion_counts(*labels)
+    estimates = metrics_from_confusion(cm, classes)
+    intervals = bootstrap_metric_intervals(cm, classes, n_resamples=1000, random_state=0)
+    for name, estimate in estimates.items():
+        assert intervals["lower"][name] <= estimate <= intervals["upper"][name]
+
+def test_bootstrap_confusion_matrices_empty():
+    with pytest.raises(ValueError, match="doesn't contain any predictions"):
+        bootstrap_confusion_matrices(np.zeros((2, 2), dtype=int))
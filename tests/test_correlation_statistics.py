@@ -0,0 +1,53 @@
+import pytest
+import sys
+import os
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.correlation_statistics import correlation_columns, correlation_statistics, \
+                                       update_correlation_statistics, correlation_matrix
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    data = pd.DataFrame({
+        "flight_distance": rng.exponential(1_000, n) + 10_000,
+        "seat_comfort": rng.integers(0, 6, n).astype(float),
+        "constant": np.full(n, 3.0),
+        "satisfaction": rng.choice(["neutral or dissatisfied", "satisfied"], n),
+    })
+    data["arrival_delay_in_minutes"] = np.where(rng.random(n) < 0.1, np.nan, data["flight_distance"] * 0.01 + rng.normal(size=n))
+    return data
+
+def iter_chunks(data, chunk_size=1_500):
+    return [data.iloc[start:start + chunk_size] for start in range(0, len(data), chunk_size)]
+
+
+def test_correlation_matrix_matches_pandas(data):
+    values = correlation_columns(data, target_column="satisfaction")
+    assert list(values.columns)[-2:] == ["satisfaction=neutral or dissatisfied", "satisfaction=satisfied"]
+    matrix = correlation_matrix(correlation_statistics(iter_chunks(values), block_size=700))
+    pd.testing.assert_frame_equal(matrix, values.corr(), atol=1e-9)
+
+def test_correlation_matrix_columns(data):
+    statistics = correlation_statistics([correlation_columns(data, target_column="satisfaction")])
+    matrix = correlation_matrix(statistics, columns=["seat_comfort", "flight_distance"])
+    assert list(matrix.columns) == ["seat_comfort", "flight_distance"]
+
+def test_update_correlation_statistics_uses_cache(data, tmp_path):
+    chunks = iter_chunks(correlation_columns(data))
+    old = correlation_statistics(chunks[:2], cache_dir=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 2
+
+    updated = update_correlation_statistics(old, chunks[2:], cache_dir=tmp_path)
+    one_pass = correlation_statistics(chunks)
+    assert updated["hashes"] == one_pass["hashes"] and old["hashes"] == one_pass["hashes"][:2]
+    pd.testing.assert_frame_equal(correlation_matrix(updated), correlation_matrix(one_pass))
+    assert len(list(tmp_path.iterdir())) == len(chunks)
+
+def test_update_correlation_statistics_wrong_columns(data):
+    statistics = correlation_statistics([correlation_columns(data)])
+    with pytest.raises(ValueError, match="has the columns"):
+        update_correlation_statistics(statistics, [correlation_columns(data).drop(columns=["constant"])])
@@ -0,0 +1,53 @@
+import pytest
+import sys
+import os
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.create_scorer import create_scorer, create_multi_metric_scorer
+
+
+@pytest.fixture
+def fitted_model():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 3))
+    y = np.where(X[:, 0] + rng.normal(scale=0.5, size=200) > 0, "satisfied", "neutral or dissatisfied")
+    return DecisionTreeClassifier(max_depth=2, random_state=0).fit(X, y), X, y
+
+
+# Tests for create_scorer
+@pytest.mark.parametrize("eval_metric", ["accuracy", "precision", "recall", "f1"])
+def test_create_scorer_valid_metrics(fitted_model, eval_metric):
+    model, X, y = fitted_model
+    assert 0 <= create_scorer(eval_metric)(model, X, y) <= 1
+
+def test_create_scorer_invalid_metric():
+    with pytest.raises(ValueError, match="Invalid metric name"):
+        create_scorer("roc_auc")
+
+
+# Tests for create_multi_metric_scorer
+def test_create_multi_metric_scorer_matches_single_scorers(fitted_model):
+    model, X, y = fitted_model
+    scores = create_multi_metric_scorer()(model, X, y)
+    assert set(scores) == {"accuracy", "precision", "recall", "f1"}
+    for metric, score in scores.items():
+        assert score == pytest.approx(create_scorer(metric)(model, X, y))
+
+def test_create_multi_metric_scorer_subset(fitted_model):
+    model, X, y = fitted_model
+    assert list(create_multi_metric_scorer(["f1", "recall"])(model, X, y)) == ["f1", "recall"]
+
+def test_create_multi_metric_scorer_invalid_metric():
+    with pytest.raises(ValueError, match="Invalid metric name"):
+        create_multi_metric_scorer(["f1", "roc_auc"])
+
+def test_create_multi_metric_scorer_single_class_fold(fitted_model):
+    """A validation fold without the positive class, in its labels or its predictions, scores like the single scorers."""
+    model, X, y = fitted_model
+    negative = (y == "neutral or dissatisfied") & (model.predict(X) == "neutral or dissatisfied")
+    X_fold, y_fold = X[negative], y[negative]
+    scores = create_multi_metric_scorer()(model, X_fold, y_fold)
+    assert scores == {metric: create_scorer(metric)(model, X_fold, y_fold) for metric in scores}
+    assert scores["f1"] == 0.0 and scores["accuracy"] == 1.0
@@ -0,0 +1,62 @@
+import pytest
+import sys
+import os
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.data_profile import hyperloglog_registers, hyperloglog_estimate, profile_data, compare_profiles
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    return pd.DataFrame({
+        "id": np.arange(n),
+        "class": rng.choice(["Eco", "Eco Plus", "Business"], n),
+        "seat_comfort": rng.integers(0, 6, n),
+        "flight_distance": rng.exponential(1_000, n),
+        "arrival_delay_in_minutes": np.where(rng.random(n) < 0.1, np.nan, rng.integers(0, 100, n)),
+    })
+
+def iter_chunks(data, chunk_size=3_000):
+    return (data.iloc[start:start + chunk_size] for start in range(0, len(data), chunk_size))
+
+
+def test_hyperloglog_estimate():
+    values = pd.Series(np.arange(50_000)).astype(str)
+    assert abs(hyperloglog_estimate(hyperloglog_registers(values)) - 50_000) < 0.1 * 50_000
+    assert hyperloglog_estimate(hyperloglog_registers(pd.Series(["a", "b", "a"]))) == 2
+
+def test_profile_data_chunked_matches_one_pass(data):
+    chunked, one_pass = profile_data(iter_chunks(data)), profile_data([data])
+    assert chunked == one_pass
+    assert chunked["n_rows"] == len(data)
+
+def test_profile_data_statistics(data):
+    columns = profile_data(iter_chunks(data))["columns"]
+    assert columns["class"]["kind"] == "categorical"
+    assert columns["class"]["values"] == data["class"].value_counts().to_dict()
+    assert columns["seat_comfort"]["distinct_count"] == 6
+    assert columns["arrival_delay_in_minutes"]["null_rate"] == data["arrival_delay_in_minutes"].isna().mean()
+    assert columns["flight_distance"]["values"] is None
+    assert columns["flight_distance"]["max"] == data["flight_distance"].max()
+    assert abs(columns["id"]["distinct_count"] - len(data)) < 0.1 * len(data)
+    median = data["flight_distance"].median()
+    assert abs(columns["flight_distance"]["quantiles"]["0.5"] - median) <= 0.02 * median
+
+def test_profile_data_empty():
+    with pytest.raises(ValueError, match="doesn't contain any rows"):
+        profile_data(iter([]))
+
+def test_compare_profiles(data):
+    reference = profile_data([data])
+    assert compare_profiles(reference, profile_data([data.iloc[:500]]))["passed"].all()
+
+    new_data = data.iloc[:500].assign(
+        **{"class": "First", "arrival_delay_in_minutes": np.nan, "seat_comfort": 7}
+    ).drop(columns=["flight_distance"])
+    checks = compare_profiles(reference, profile_data([new_data]))
+    failures = checks.loc[~checks["passed"], ["column", "check"]].values.tolist()
+    assert failures == [["class", "categories"], ["seat_comfort", "max"],
+                        ["flight_distance", "present"], ["arrival_delay_in_minutes", "null_rate"]]
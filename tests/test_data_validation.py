@@ -3,7 +3,8 @@ from sample_data import valid_sample_data, \
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.data_validation_utils import validate_data
+from src.data_validation_utils import validate_data, validate_for_correlations, dataset_check_counts, \
+                                     dataset_check_failures, FEATURE_TARGET_THRESHOLD, FEATURE_FEATURE_THRESHOLD
 import pytest
 import pandera as pa
 import pandas as pd
@@ -84,3 +85,56 @@ def test_valid_missing_threshold_value():
         validate_data(valid_sample_data, missing_data_threshold=-0.6)
 
 
+# Check that a duplicate spanning two chunks is found, even when the chunks have other dtypes
+def test_dataset_check_failures_duplicate_across_chunks():
+    first, second = valid_sample_data.iloc[:2].copy(), valid_sample_data.iloc[2:].copy()
+    second.loc[3] = first.iloc[0]
+    second["arrival_delay_in_minutes"] = second["arrival_delay_in_minutes"].astype(np.float32)
+    counts = dataset_check_counts(second, dataset_check_counts(first))
+    failures = dataset_check_failures(counts)
+    assert counts["n_rows"] == 4
+    assert len(failures) == 1 and failures[0].startswith("There are duplicates observations in the dataset!")
+
+# Check that the missing rate is checked on the whole dataset, not on every chunk
+def test_dataset_check_failures_missing_rate():
+    data = pd.concat([valid_sample_data] * 5, ignore_index=True).assign(id=range(20))
+    data["age"] = data["age"] + np.arange(20)
+    data.loc[19, "arrival_delay_in_minutes"] = np.NaN
+    counts = dataset_check_counts(data.iloc[18:], dataset_check_counts(data.iloc[:18]))
+    assert dataset_check_failures(counts, missing_data_threshold=0.1) == []
+    assert dataset_check_failures(counts, missing_data_threshold=0.05)[0].startswith("Some columns have more than 5.0%")
+
+# Check the correlation thresholds
+def test_validate_for_correlations():
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({"a": rng.normal(size=200), "b": rng.normal(size=200),
+                         "satisfaction": rng.choice(["satisfied", "neutral or dissatisfied"], 200)})
+    validate_for_correlations(data)
+    with pytest.raises(ValueError, match="at least two features"):
+        validate_for_correlations(data.assign(c=data["a"] * 2.0 + 1.0))
+    with pytest.raises(ValueError, match="with the target variable"):
+        validate_for_correlations(data.assign(c=(data["satisfaction"] == "satisfied").astype(float)))
+
+# Pin the Pearson thresholds to the former PPS threshold, a copy of the target flipped on 4% of the rows
+# had a PPS above 0.92 and one flipped on 6% below it
+@pytest.mark.parametrize("flip_rate, passes", [(0.04, False), (0.06, True)])
+def test_validate_for_correlations_thresholds(flip_rate, passes):
+    assert FEATURE_TARGET_THRESHOLD == 0.9 and FEATURE_FEATURE_THRESHOLD == 0.9
+    rng = np.random.default_rng(0)
+    satisfied = rng.random(20_000) < 0.44
+    copy = np.where(rng.random(20_000) < flip_rate, ~satisfied, satisfied).astype(np.int8)
+    data = pd.DataFrame({"class_Eco": copy, "satisfaction": np.where(satisfied, "satisfied", "neutral or dissatisfied")})
+    if passes:
+        validate_for_correlations(data)
+    else:
+        with pytest.raises(ValueError, match="with the target variable"):
+            validate_for_correlations(data)
+
+# The one-hot columns of the categorical features are validated too
+def test_validate_for_correlations_one_hot_columns():
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({"a": rng.normal(size=200), "class_Eco": rng.integers(0, 2, 200),
+                         "satisfaction": rng.choice(["satisfied", "neutral or dissatisfied"], 200)})
+    validate_for_correlations(data)
+    with pytest.raises(ValueError, match="at least two features"):
+        validate_for_correlations(data.assign(type_of_travel_Personal_Travel=1 - data["class_Eco"]))
@@ -0,0 +1,83 @@
+import pytest
+import sys
+import os
+import numpy as np
+import pandas as pd
+from sklearn.compose import make_column_transformer
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.tree import DecisionTreeClassifier
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.data_profile import profile_data
+from src.drift_monitoring import reference_bins, bin_counts, stream_bin_counts, build_drift_reference, \
+                                 add_prediction_reference, drift_statistics, check_drift
+
+
+def make_data(n, seed, distance_scale=1_000):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(n),
+        "class": rng.choice(["Eco", "Eco Plus", "Business"], n),
+        "seat_comfort": rng.integers(0, 6, n),
+        "flight_distance": rng.exponential(distance_scale, n),
+        "satisfaction": rng.choice(["neutral or dissatisfied", "satisfied"], n),
+    })
+
+def iter_chunks(data, chunk_size=4_000):
+    return (data.iloc[start:start + chunk_size] for start in range(0, len(data), chunk_size))
+
+@pytest.fixture
+def reference():
+    train_data = make_data(20_000, 0)
+    return build_drift_reference(profile_data(iter_chunks(train_data)), iter_chunks(train_data))
+
+
+def test_reference_bins(reference):
+    bins = reference["bins"]
+    assert "id" not in bins
+    assert bins["seat_comfort"]["categories"] == ["0.0", "1.0", "2.0", "3.0", "4.0", "5.0"]
+    assert bins["flight_distance"]["kind"] == "numeric" and len(bins["flight_distance"]["edges"]) == 9
+    assert "prediction" not in reference["counts"]
+
+def test_bin_counts_unseen_and_missing(reference):
+    spec = reference["bins"]["class"]
+    counts = bin_counts(pd.Series(["Eco", "First", None, "Eco"]), spec)
+    assert counts.tolist() == [0, 2, 0, 1, 1]
+
+def test_drift_statistics_identical():
+    statistics = drift_statistics([10, 20, 30, 0], [10, 20, 30, 0], ordered=True)
+    assert statistics["psi"] == 0 and statistics["ks"] == 0
+
+def test_check_drift(reference):
+    same = stream_bin_counts(iter_chunks(make_data(10_000, 1).drop(columns=["satisfaction"])), reference["bins"])
+    assert not check_drift(reference, same)["drifted"].any()
+
+    shifted = stream_bin_counts(iter_chunks(make_data(10_000, 1, distance_scale=2_000)), reference["bins"])
+    report = check_drift(reference, shifted)
+    assert report.loc[report["drifted"], "feature"].tolist() == ["flight_distance"]
+
+def test_stream_bin_counts_predictions(reference):
+    data = make_data(2_000, 2)
+    model = make_pipeline(make_column_transformer((OneHotEncoder(), ["class"])), DecisionTreeClassifier())
+    model.fit(data.drop(columns=["satisfaction"]), data["satisfaction"])
+    counts = stream_bin_counts(iter_chunks(data, 500), reference["bins"], model=model)
+    assert sum(counts["prediction"]) == len(data)
+
+def test_stream_bin_counts_missing_column(reference):
+    with pytest.raises(ValueError, match="doesn't contain the columns"):
+        stream_bin_counts([make_data(100, 3).drop(columns=["class"])], reference["bins"])
+
+def test_add_prediction_reference(reference):
+    data = make_data(2_000, 2)
+    model = make_pipeline(make_column_transformer((OneHotEncoder(), ["class"])), DecisionTreeClassifier())
+    model.fit(data.drop(columns=["satisfaction"]), data["satisfaction"])
+    train_data = make_data(20_000, 0)
+    with_predictions = add_prediction_reference(reference, model, iter_chunks(train_data))
+    predicted = model.predict(train_data)
+    assert with_predictions["counts"]["prediction"] == [int((predicted == label).sum()) for label in model.classes_]
+    assert "prediction" not in reference["counts"]
+
+    counts = stream_bin_counts(iter_chunks(make_data(10_000, 1)), reference["bins"], model=model)
+    assert not check_drift(with_predictions, counts)["drifted"].any()
+    with pytest.raises(ValueError, match="has no counts of prediction"):
+        check_drift(reference, counts)
@@ -1,12 +1,15 @@
 import pytest
 import sys
 import os
+import numpy as np
 import pandas as pd
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.eda_plots import save_target_distribution, \
                           save_correlation_matrix, \
                           save_continuous_feat_target_plots, \
-                          save_cat_feat_target_plots
+                          save_cat_feat_target_plots, \
+                          sample_rows, \
+                          class_histograms
 from pathlib import Path
 from sample_data import valid_sample_data
 import shutil
@@ -102,6 +105,25 @@ def test_save_cat_feat_target_plots_created_and_saved_correctly():
     saved_file = tmp_path / "cat_feat_target_plots.png"
     assert saved_file.exists(), "The categorical feature vs target plots file was not created."
 
+def test_save_plots_format_and_dpi():
+    sample_data = valid_sample_data.copy()
+    save_target_distribution(sample_data, tmp_path, "satisfaction", dpi=50, file_format="webp")
+    assert (tmp_path / "target_variable_distribution.webp").exists(), "The webp plot file was not created."
+
+def test_sample_rows():
+    labels = np.array(["satisfied"] * 300 + ["neutral or dissatisfied"] * 700)
+    rows = sample_rows(labels, max_rows=100)
+    assert len(rows) == 100 and (labels[rows] == "satisfied").sum() == 30
+    assert len(sample_rows(labels, max_rows=100, strategy="uniform")) == 100
+    assert len(sample_rows(labels)) == 1000
+    with pytest.raises(ValueError, match="The sample strategy should be one of"):
+        sample_rows(labels, max_rows=100, strategy="systematic")
+
+def test_class_histograms():
+    sample_data = valid_sample_data.copy()
+    histograms = class_histograms(sample_data, "flight_distance", "satisfaction", bins=4)
+    assert histograms.groupby("satisfaction")["count"].sum().to_dict() == {"satisfied": 2, "neutral or dissatisfied": 2}
+
 def test_empty_the_tmp_path():
     # Clean up the temporary directory
     parent_path = tmp_path.parent
@@ -0,0 +1,125 @@
+import pytest
+import sys
+import os
+import numpy as np
+import pandas as pd
+from sklearn.compose import make_column_transformer
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, MinMaxScaler
+from sklearn.tree import DecisionTreeClassifier
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.feature_store import write_feature_store, load_feature_store, feature_store_frame, store_predictions
+from src.histogram_tree import HistogramBinner, HistogramTreeClassifier
+from src.model_zoo import ESTIMATORS
+from src.threshold_tuning import ThresholdClassifier, predict_from_proba
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    n = 2_000
+    return pd.DataFrame({
+        "gender": rng.choice(["Male", "Female"], n),
+        "class": rng.choice(["Eco", "Eco Plus", "Business"], n),
+        "seat_comfort": rng.integers(0, 6, n).astype(float),
+        "age": rng.integers(7, 85, n),
+        "flight_distance": rng.exponential(1_000, n),
+        "satisfaction": rng.choice(["satisfied", "neutral or dissatisfied"], n),
+    })
+
+def make_preprocessor():
+    return make_column_transformer(
+        (OneHotEncoder(drop='first', handle_unknown='ignore', dtype=np.int32), ['gender', 'class']),
+        (MinMaxScaler(), ['seat_comfort']),
+        (StandardScaler(), ['age', 'flight_distance']),
+    )
+
+def processed_chunks(preprocessor, data, chunk_size=300):
+    columns = [name.split("__", 1)[-1] for name in preprocessor.get_feature_names_out()]
+    for start in range(0, len(data), chunk_size):
+        chunk = data.iloc[start:start + chunk_size]
+        processed = pd.DataFrame(preprocessor.transform(chunk), columns=columns)
+        yield processed.assign(satisfaction=chunk["satisfaction"].to_numpy())
+
+def store_groups(preprocessor):
+    columns = [name.split("__", 1)[-1] for name in preprocessor.get_feature_names_out()]
+    return {
+        "onehot": {"columns": columns[:3], "dtype": "int8"},
+        "ordinal": {"columns": columns[3:4], "dtype": "float64"},
+        "numerical": {"columns": columns[4:], "dtype": "float64"},
+        "target": {"columns": ["satisfaction"], "dtype": "int8", "categories": ["neutral or dissatisfied", "satisfied"]},
+    }
+
+
+def test_feature_store_round_trip(data, tmp_path):
+    preprocessor = make_preprocessor().fit(data)
+    schema = write_feature_store(processed_chunks(preprocessor, data), tmp_path, store_groups(preprocessor))
+    assert schema["n_rows"] == len(data)
+
+    arrays, _ = load_feature_store(tmp_path)
+    assert isinstance(arrays["onehot"], np.memmap) and not arrays["onehot"].flags.writeable
+    assert arrays["onehot"].dtype == np.int8 and arrays["numerical"].dtype == np.float64
+    assert arrays["numerical"].flags.c_contiguous and arrays["numerical"].shape == (len(data), 2)
+    assert np.array_equal(arrays["numerical"], preprocessor.transform(data)[:, 4:].astype(float))
+
+    frame = feature_store_frame(tmp_path, ["onehot", "target"])
+    assert list(frame.columns) == ["gender_Male", "class_Eco", "class_Eco Plus", "satisfaction"]
+    assert (frame["satisfaction"] == data["satisfaction"].to_numpy()).all()
+    rows = feature_store_frame(tmp_path, ["target"], rows=[3, 1])
+    assert rows["satisfaction"].tolist() == data["satisfaction"].iloc[[3, 1]].tolist()
+
+def test_feature_store_invalid_values(data, tmp_path):
+    preprocessor = make_preprocessor().fit(data)
+    groups = store_groups(preprocessor)
+    groups["target"]["categories"] = ["satisfied"]
+    with pytest.raises(ValueError, match="contain values outside of"):
+        write_feature_store(processed_chunks(preprocessor, data), tmp_path, groups)
+
+def test_store_predictions_match_pipeline(data, tmp_path):
+    X, y = data.drop(columns=["satisfaction"]), data["satisfaction"]
+    model = make_pipeline(make_preprocessor(), DecisionTreeClassifier(random_state=123)).fit(X, y)
+    write_feature_store(processed_chunks(model[0], data), tmp_path, store_groups(model[0]), preprocessor=model[0])
+
+    batches = list(store_predictions(model, tmp_path, batch_size=700))
+    assert len(batches) == 3
+    assert np.array_equal(np.vstack([proba for proba, _ in batches]), model.predict_proba(X))
+    assert np.array_equal(np.concatenate([labels for _, labels in batches]), y.to_numpy())
+
+def test_store_predictions_other_scaling(data, tmp_path):
+    X, y = data.drop(columns=["satisfaction"]), data["satisfaction"]
+    preprocessor = make_preprocessor().fit(data.iloc[:1_000])
+    write_feature_store(processed_chunks(preprocessor, data), tmp_path, store_groups(preprocessor),
+                        preprocessor=preprocessor)
+    model = make_pipeline(make_preprocessor(), DecisionTreeClassifier(random_state=123)).fit(X, y)
+    with pytest.raises(ValueError, match="scaled with another"):
+        next(store_predictions(model, tmp_path))
+
+# Every estimator of model_training.py: the decision and histogram trees of the grid search, the
+# out-of-core histogram tree, the estimators of the model zoo, and a tuned threshold around them
+@pytest.mark.parametrize("steps", [
+    [DecisionTreeClassifier(random_state=123)],
+    [HistogramBinner(), HistogramTreeClassifier(prebinned=True)],
+    [HistogramTreeClassifier(max_depth=8)],
+    *[[estimator(random_state=123)] for estimator in ESTIMATORS.values()],
+], ids=["decision-tree", "histogram-tree", "out-of-core", *ESTIMATORS])
+@pytest.mark.parametrize("threshold", [None, 0.3])
+def test_store_predictions_match_csv(data, tmp_path, steps, threshold):
+    X, y = data.drop(columns=["satisfaction"]), data["satisfaction"]
+    model = make_pipeline(make_preprocessor(), *steps).fit(X, y)
+    model = ThresholdClassifier(model, threshold=threshold) if threshold is not None else model
+    pipeline = model.estimator if threshold is not None else model
+    write_feature_store(processed_chunks(pipeline[0], data), tmp_path, store_groups(pipeline[0]),
+                        preprocessor=pipeline[0])
+
+    proba = np.vstack([proba for proba, _ in store_predictions(model, tmp_path, batch_size=700)])
+    assert np.array_equal(predict_from_proba(model, proba), model.predict(X))
+    assert np.allclose(proba, model.predict_proba(X), rtol=0, atol=1e-12)
+
+def test_store_predictions_narrow_floats(data, tmp_path):
+    X, y = data.drop(columns=["satisfaction"]), data["satisfaction"]
+    model = make_pipeline(make_preprocessor(), HistogramBinner(), HistogramTreeClassifier(prebinned=True)).fit(X, y)
+    groups = store_groups(model[0])
+    groups["numerical"]["dtype"] = "float32"
+    write_feature_store(processed_chunks(model[0], data), tmp_path, groups, preprocessor=model[0])
+    with pytest.raises(ValueError, match="narrower float"):
+        next(store_predictions(model, tmp_path))
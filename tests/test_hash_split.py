@@ -0,0 +1,51 @@
+import pytest
+import sys
+import os
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.hash_split import hash_ids, hash_split_mask, stream_hash_split
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "id": rng.permutation(20_000),
+        "age": rng.integers(7, 85, 20_000),
+        "satisfaction": rng.choice(["satisfied", "neutral or dissatisfied"], 20_000),
+    })
+
+
+# Tests for hash_ids and hash_split_mask
+def test_hash_ids_deterministic():
+    assert np.array_equal(hash_ids([1, 2, 3], 42), hash_ids(np.array([1, 2, 3]), 42))
+    assert not np.array_equal(hash_ids([1, 2, 3], 42), hash_ids([1, 2, 3], 43))
+
+def test_hash_split_mask_proportion(data):
+    assert hash_split_mask(data["id"], 0.2, 42).mean() == pytest.approx(0.2, abs=0.01)
+
+def test_hash_split_mask_stable_when_appending(data):
+    before = hash_split_mask(data["id"][:5000], 0.2, 42)
+    after = hash_split_mask(data["id"], 0.2, 42)
+    assert np.array_equal(before, after[:5000])
+
+def test_hash_split_mask_invalid_test_size(data):
+    with pytest.raises(ValueError):
+        hash_split_mask(data["id"], 1.5, 42)
+
+
+# Tests for stream_hash_split
+def test_stream_hash_split_matches_in_memory(data, tmp_path):
+    chunks = (data.iloc[start:start + 3000] for start in range(0, len(data), 3000))
+    summary = stream_hash_split(chunks, tmp_path / "train.csv", tmp_path / "test.csv", 0.2, 42)
+    train, test = pd.read_csv(tmp_path / "train.csv"), pd.read_csv(tmp_path / "test.csv")
+    is_test = hash_split_mask(data["id"], 0.2, 42)
+    assert set(test["id"]) == set(data["id"][is_test])
+    assert len(train) + len(test) == len(data)
+    assert summary["test_proportion"].between(0.18, 0.22).all()
+    assert summary["test"].sum() == len(test)
+
+def test_stream_hash_split_empty(tmp_path):
+    with pytest.raises(ValueError, match="doesn't contain any rows"):
+        stream_hash_split(iter([]), tmp_path / "train.csv", tmp_path / "test.csv", 0.2, 42)
@@ -0,0 +1,147 @@
+import pytest
+import sys
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from sklearn.compose import make_column_transformer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, MinMaxScaler
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.pipeline import make_pipeline
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.histogram_tree import compute_bin_edges, bin_features, HistogramBinner, HistogramTreeClassifier
+from src.out_of_core_training import iter_csv_chunks, sample_chunks, fit_out_of_core_pipeline
+from sample_data import sample_train_data, sample_test_data
+
+
+@pytest.fixture
+def discrete_data():
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 6, size=(500, 4)).astype(float)
+    y = np.where(X[:, 0] + X[:, 1] > 5, "satisfied", "neutral or dissatisfied")
+    return X, y
+
+@pytest.fixture
+def preprocessor():
+    return make_column_transformer(
+        (OneHotEncoder(drop='first', handle_unknown='ignore', dtype=np.int32), ['gender', 'class']),
+        (MinMaxScaler(), ['inflight_wifi_service', 'seat_comfort']),
+        (StandardScaler(), ['age', 'flight_distance']),
+        remainder='drop'
+    )
+
+@pytest.fixture
+def train_csv(tmp_path):
+    data = pd.concat([sample_train_data, sample_test_data] * 10, ignore_index=True)
+    data.to_csv(tmp_path / "train.csv", index=False)
+    return tmp_path / "train.csv"
+
+
+# Tests for compute_bin_edges and bin_features
+def test_compute_bin_edges_discrete_columns(discrete_data):
+    X, _ = discrete_data
+    edges = compute_bin_edges(X)
+    assert np.allclose(edges[0], [0.5, 1.5, 2.5, 3.5, 4.5])
+
+def test_compute_bin_edges_continuous_columns():
+    X = np.random.default_rng(0).normal(size=(10_000, 1))
+    edges = compute_bin_edges(X, max_bins=16)
+    assert len(edges[0]) == 15
+    assert np.all(np.diff(edges[0]) > 0)
+
+def test_compute_bin_edges_invalid_max_bins(discrete_data):
+    X, _ = discrete_data
+    with pytest.raises(ValueError):
+        compute_bin_edges(X, max_bins=300)
+
+def test_bin_features_codes(discrete_data):
+    X, _ = discrete_data
+    codes = bin_features(X, compute_bin_edges(X))
+    assert codes.dtype == np.uint8
+    assert np.array_equal(codes, X.astype(np.uint8))
+
+def test_bin_features_missing_values_in_last_bin():
+    codes = bin_features(np.array([[np.nan], [0.0]]), [np.array([0.5, 1.5])])
+    assert codes[:, 0].tolist() == [2, 0]
+
+def test_bin_features_wrong_number_of_columns(discrete_data):
+    X, _ = discrete_data
+    with pytest.raises(ValueError):
+        bin_features(X, compute_bin_edges(X)[:2])
+
+
+# Tests for HistogramTreeClassifier
+def test_histogram_tree_matches_exact_tree_on_discrete_data(discrete_data):
+    X, y = discrete_data
+    hist_tree = HistogramTreeClassifier(max_depth=4).fit(X, y)
+    exact_tree = DecisionTreeClassifier(max_depth=4, random_state=0).fit(X, y)
+    assert np.array_equal(hist_tree.predict(X), exact_tree.predict(X))
+
+def test_histogram_tree_respects_max_depth(discrete_data):
+    X, y = discrete_data
+    tree = HistogramTreeClassifier(max_depth=2).fit(X, y)
+    assert tree.max_depth_ <= 2
+
+def test_histogram_tree_predict_proba_sums_to_one(discrete_data):
+    X, y = discrete_data
+    proba = HistogramTreeClassifier(max_depth=3).fit(X, y).predict_proba(X)
+    assert proba.shape == (len(X), 2)
+    assert np.allclose(proba.sum(axis=1), 1)
+
+def test_histogram_tree_min_samples_leaf(discrete_data):
+    X, y = discrete_data
+    tree = HistogramTreeClassifier(min_samples_leaf=50).fit(X, y)
+    leaves = tree.children_left_ == -1
+    assert tree.value_[leaves].sum(axis=1).min() >= 50
+
+def test_histogram_tree_mismatched_length(discrete_data):
+    X, y = discrete_data
+    with pytest.raises(ValueError):
+        HistogramTreeClassifier().fit(X, y[:-1])
+
+def test_histogram_tree_prebinned_matches_binning_inside(discrete_data):
+    X, y = discrete_data
+    codes = HistogramBinner().fit_transform(X)
+    prebinned = HistogramTreeClassifier(max_depth=4, prebinned=True).fit(codes, y)
+    binned_inside = HistogramTreeClassifier(max_depth=4).fit(X, y)
+    assert np.array_equal(prebinned.predict(codes), binned_inside.predict(X))
+
+def test_histogram_tree_prebinned_requires_codes(discrete_data):
+    X, y = discrete_data
+    with pytest.raises(ValueError, match="uint8 codes"):
+        HistogramTreeClassifier(prebinned=True).fit(X, y)
+
+def test_histogram_binner_in_cached_pipeline(discrete_data, tmp_path):
+    X, y = discrete_data
+    pipe = make_pipeline(HistogramBinner(), HistogramTreeClassifier(max_depth=3, prebinned=True),
+                         memory=str(tmp_path))
+    first = pipe.fit(X, y).predict(X)
+    second = pipe.set_params(histogramtreeclassifier__max_depth=3).fit(X, y).predict(X)
+    assert np.array_equal(first, second)
+
+
+# Tests for the out-of-core training
+def test_iter_csv_chunks_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        iter_csv_chunks(tmp_path / "missing.csv")
+
+def test_sample_chunks_keeps_sample_size(train_csv):
+    sample, classes, n_rows = sample_chunks(iter_csv_chunks(train_csv, chunk_size=7), 10, "satisfaction", 0)
+    assert len(sample) == 10
+    assert n_rows == 80
+    assert classes.tolist() == ["neutral or dissatisfied", "satisfied"]
+
+def test_fit_out_of_core_pipeline_matches_in_memory(train_csv, preprocessor, tmp_path):
+    pipeline = fit_out_of_core_pipeline(iter_csv_chunks(train_csv, chunk_size=7), preprocessor,
+                                        max_depth=3, random_state=0, cache_dir=tmp_path)
+    data = pd.read_csv(train_csv)
+    X, y = data.drop(columns=["satisfaction"]), data["satisfaction"]
+    in_memory = HistogramTreeClassifier(max_depth=3).fit(pipeline[0].transform(X), y)
+    assert np.array_equal(pipeline.predict(X), in_memory.predict(pipeline[0].transform(X)))
+    assert list(pipeline.classes_) == ["neutral or dissatisfied", "satisfied"]
+
+def test_fit_out_of_core_pipeline_is_picklable(train_csv, preprocessor, tmp_path):
+    pipeline = fit_out_of_core_pipeline(iter_csv_chunks(train_csv, chunk_size=7), preprocessor,
+                                        max_depth=2, random_state=0, cache_dir=tmp_path)
+    restored = pickle.loads(pickle.dumps(pipeline))
+    assert np.array_equal(restored.predict(sample_test_data), pipeline.predict(sample_test_data))
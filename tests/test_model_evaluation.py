@@ -1,8 +1,13 @@
+import importlib.util
 import os
+import pickle
 import pytest
 import pandas as pd
-from unittest.mock import MagicMock
 import sys
+from sklearn.compose import make_column_transformer
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.tree import DecisionTreeClassifier
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.model_evaluation import check_directory_exists, plot_save_confusion_matrix, evaluate_model
@@ -16,11 +21,9 @@ def tmp_dir(tmp_path):
     return tmp_path
 
 @pytest.fixture
-def dummy_model():
-    """Fixture for creating a mock model with `classes_` attribute."""
-    model = MagicMock()
-    model.classes_ = ['satisfied', 'neutral or dissatisfied']
-    return model
+def dummy_labels():
+    """Fixture for creating the `classes_` of a model."""
+    return ['satisfied', 'neutral or dissatisfied']
 
 @pytest.fixture
 def dummy_data():
@@ -59,37 +62,35 @@ def test_check_directory_exists_invalid_path(tmp_path):
 
 
 # === Tests for `plot_save_confusion_matrix` === #
-def test_plot_save_confusion_matrix(dummy_model, dummy_data, tmp_dir):
+def test_plot_save_confusion_matrix(dummy_labels, dummy_data, tmp_dir):
     """Test creating and saving a confusion matrix plot."""
     y_obs, y_pred = dummy_data
-    plot_save_confusion_matrix(y_obs, y_pred, dummy_model, tmp_dir)
+    plot_save_confusion_matrix(y_obs, y_pred, dummy_labels, tmp_dir)
     assert(tmp_dir/"confusion_matrix.png").exists()
 
-def test_plot_save_confusion_matrix_invalid_path(dummy_model, dummy_data, tmp_path):
+def test_plot_save_confusion_matrix_invalid_path(dummy_labels, dummy_data, tmp_path):
     y_obs, y_pred = dummy_data
     invalid_path = tmp_path / "invalid:/"
     with pytest.raises(OSError):
-        plot_save_confusion_matrix(y_obs, y_pred, dummy_model, invalid_path)
+        plot_save_confusion_matrix(y_obs, y_pred, dummy_labels, invalid_path)
 
-def test_plot_save_confusion_matrix_empty_data(dummy_model, tmp_dir):
+def test_plot_save_confusion_matrix_empty_data(dummy_labels, tmp_dir):
     """Test confusion matrix with empty data."""
     y_obs, y_pred = pd.Series(dtype="object"), pd.Series(dtype="object")
     with pytest.raises(ValueError, match="zero-size array to reduction operation maximum which has no identity"):
-        plot_save_confusion_matrix(y_obs, y_pred, dummy_model, tmp_dir)
+        plot_save_confusion_matrix(y_obs, y_pred, dummy_labels, tmp_dir)
 
-def test_plot_save_confusion_matrix_incorrect_datatype(dummy_model, tmp_dir):
+def test_plot_save_confusion_matrix_incorrect_datatype(dummy_labels, tmp_dir):
     """Test confusion matrix with incorrect dataype."""
     y_obs, y_pred = "object 1", "object 2"
     with pytest.raises(ValueError):
-        plot_save_confusion_matrix(y_obs, y_pred, dummy_model, tmp_dir)
+        plot_save_confusion_matrix(y_obs, y_pred, dummy_labels, tmp_dir)
 
 def test_plot_save_confusion_matrix_missing_classes(dummy_data, tmp_dir):
-    """Test when the model has target and `classes_` attribute mismatch"""
+    """Test when the target and the labels mismatch"""
     y_obs, y_pred = dummy_data
-    incomplete_model = MagicMock()
-    incomplete_model.classes_ = ['satisfied']
     with pytest.raises(ValueError):
-        plot_save_confusion_matrix(y_obs, y_pred, incomplete_model, tmp_dir)
+        plot_save_confusion_matrix(y_obs, y_pred, ['satisfied'], tmp_dir)
 
 
 # === Tests for `evaluate_model` === #
@@ -122,3 +123,43 @@ def test_evaluate_model_mismatched_length(dummy_data, tmp_dir):
     y_obs = y_obs[:-1]
     with pytest.raises(ValueError):
         evaluate_model(y_obs, y_pred, tmp_dir)
+
+def test_evaluate_model_bootstrap(dummy_data, tmp_dir):
+    """Test adding bootstrap confidence intervals to the test scores."""
+    y_obs, y_pred = dummy_data
+
+    evaluate_model(y_obs, y_pred, tmp_dir, n_bootstrap=200, random_state=0)
+
+    test_scores = pd.read_csv(tmp_dir / "test_scores.csv")
+    assert test_scores["Statistic"].tolist() == ["Estimate", "Lower (95% CI)", "Upper (95% CI)"]
+    assert (test_scores.loc[1, "Accuracy"] <= test_scores.loc[0, "Accuracy"] <= test_scores.loc[2, "Accuracy"])
+
+
+# === Tests for the model evaluation script === #
+def load_evaluation_script():
+    """Loads scripts/model_evaluation.py, whose name clashes with src/model_evaluation.py."""
+    path = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'model_evaluation.py')
+    spec = importlib.util.spec_from_file_location("model_evaluation_script", path)
+    script = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(script)
+    return script
+
+def test_model_evaluation_chunked_filter(tmp_dir):
+    """Test the chunks without a row matching the filters are skipped, not predicted."""
+    test_data = pd.concat([valid_sample_data] * 3, ignore_index=True)
+    test_data.to_csv(tmp_dir / "test.csv", index=False)
+    model = make_pipeline(make_column_transformer((OneHotEncoder(handle_unknown="ignore"), ["class"])),
+                          DecisionTreeClassifier(random_state=0))
+    model.fit(test_data.drop(columns=["satisfaction"]), test_data["satisfaction"])
+    pickle.dump(model, open(tmp_dir / "model.pickle", "wb"))
+
+    script = load_evaluation_script()
+    for name, chunk_args in [("chunked", ["--chunk-size", "1"]), ("whole", [])]:
+        script.main(["--test-path", str(tmp_dir / "test.csv"), "--pipeline", str(tmp_dir / "model.pickle"),
+                     "--results-to", str(tmp_dir / name), "--plots-to", str(tmp_dir / name),
+                     "--filter", "age >= 35", *chunk_args], standalone_mode=False)
+
+    chunked = pd.read_csv(tmp_dir / "chunked" / "test_scores.csv")
+    pd.testing.assert_frame_equal(chunked, pd.read_csv(tmp_dir / "whole" / "test_scores.csv"))
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_dir / "chunked" / "threshold_curve.csv"),
+                                  pd.read_csv(tmp_dir / "whole" / "threshold_curve.csv"))
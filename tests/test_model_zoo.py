@@ -0,0 +1,90 @@
+import pytest
+import sys
+import os
+import json
+import numpy as np
+import pandas as pd
+from joblib import Memory
+from sklearn.compose import make_column_transformer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.model_zoo import load_model_zoo_config, estimate_job_cost, preprocess_folds, tune_model_zoo, DEFAULT_MODEL_ZOO
+from src.create_scorer import create_scorer
+from sample_data import sample_train_data, sample_test_data
+
+
+@pytest.fixture
+def preprocessor():
+    return make_column_transformer(
+        (OneHotEncoder(drop='first', handle_unknown='ignore', dtype=np.int32), ['class']),
+        (StandardScaler(), ['age', 'flight_distance', 'seat_comfort']),
+        remainder='drop'
+    )
+
+@pytest.fixture
+def train_data():
+    data = pd.concat([sample_train_data, sample_test_data] * 3, ignore_index=True)
+    return data.drop(columns=['satisfaction']), data['satisfaction']
+
+@pytest.fixture
+def small_zoo():
+    return {
+        "decision_tree": {"max_depth": [1, 3]},
+        "logistic_regression": {"C": [1.0]},
+    }
+
+
+# Tests for load_model_zoo_config
+def test_load_model_zoo_config_default():
+    assert load_model_zoo_config() == DEFAULT_MODEL_ZOO
+
+def test_load_model_zoo_config_from_file(tmp_path, small_zoo):
+    config_path = tmp_path / "zoo.json"
+    config_path.write_text(json.dumps(small_zoo))
+    assert load_model_zoo_config(config_path) == small_zoo
+
+def test_load_model_zoo_config_invalid_estimator(tmp_path):
+    config_path = tmp_path / "zoo.json"
+    config_path.write_text(json.dumps({"svm": {"C": [1.0]}}))
+    with pytest.raises(ValueError, match="Invalid estimator name"):
+        load_model_zoo_config(config_path)
+
+def test_load_model_zoo_config_invalid_grid(tmp_path):
+    config_path = tmp_path / "zoo.json"
+    config_path.write_text(json.dumps({"decision_tree": {"max_depth": 3}}))
+    with pytest.raises(ValueError, match="lists of values"):
+        load_model_zoo_config(config_path)
+
+
+# Tests for estimate_job_cost
+def test_estimate_job_cost_orders_jobs():
+    assert estimate_job_cost("decision_tree", {"max_depth": 24}) > estimate_job_cost("decision_tree", {"max_depth": 6})
+    assert estimate_job_cost("random_forest", {"n_estimators": 100}) > estimate_job_cost("decision_tree", {})
+    assert estimate_job_cost("logistic_regression", {}) < estimate_job_cost("hist_gradient_boosting", {})
+
+
+# Tests for preprocess_folds
+def test_preprocess_folds_cached(preprocessor, train_data, tmp_path):
+    X, y = train_data
+    folds = [(np.arange(0, 12), np.arange(12, 24))]
+    memory = Memory(tmp_path, verbose=0)
+    first = preprocess_folds(preprocessor, X, y.to_numpy(), folds, memory)
+    second = preprocess_folds(preprocessor, X, y.to_numpy(), folds, memory)
+    assert first[0][0].shape == (12, 5)
+    assert np.array_equal(first[0][1], second[0][1])
+
+
+# Tests for tune_model_zoo
+def test_tune_model_zoo_results(preprocessor, train_data, small_zoo):
+    X, y = train_data
+    final_model, cv_results = tune_model_zoo(preprocessor, X, y, small_zoo, create_scorer("f1"), cv=3, random_state=0)
+    assert len(cv_results) == 3
+    assert cv_results["mean_val_score"].is_monotonic_decreasing
+    assert {"model", "params", "se_val_score", "se_train_score"}.issubset(cv_results.columns)
+    assert final_model.predict(X).shape == (len(X),)
+
+def test_tune_model_zoo_parallel_matches_sequential(preprocessor, train_data, small_zoo):
+    X, y = train_data
+    _, sequential = tune_model_zoo(preprocessor, X, y, small_zoo, create_scorer("f1"), cv=3, random_state=0)
+    _, parallel = tune_model_zoo(preprocessor, X, y, small_zoo, create_scorer("f1"), cv=3, n_jobs=2, random_state=0)
+    pd.testing.assert_frame_equal(sequential.drop(columns="mean_fit_time"), parallel.drop(columns="mean_fit_time"))
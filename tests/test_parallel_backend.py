@@ -0,0 +1,59 @@
+import pytest
+import sys
+import os
+import pandas as pd
+from joblib import Parallel, delayed
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.parallel_backend import resolve_n_jobs, share_frame, parallel_search_backend
+from sample_data import valid_sample_data
+
+
+# Tests for resolve_n_jobs
+def test_resolve_n_jobs_explicit(monkeypatch):
+    monkeypatch.setattr("src.parallel_backend.cpu_count", lambda: 8)
+    assert resolve_n_jobs(2, inner_threads=4) == 2
+    assert resolve_n_jobs(16, inner_threads=4) == 2
+    assert resolve_n_jobs(16, inner_threads=1000) == 1
+
+def test_resolve_n_jobs_all_cores_is_positive():
+    assert resolve_n_jobs(-1, inner_threads=1000) == 1
+
+def test_resolve_n_jobs_invalid_values():
+    with pytest.raises(ValueError):
+        resolve_n_jobs(0)
+    with pytest.raises(ValueError):
+        resolve_n_jobs(4, inner_threads=0)
+
+
+# Tests for share_frame
+def test_share_frame_converts_object_columns():
+    shared = share_frame(valid_sample_data)
+    assert (shared.dtypes != "object").all()
+    assert shared["class"].dtype == "category"
+    assert shared["age"].dtype == valid_sample_data["age"].dtype
+
+def test_share_frame_does_not_mutate_input():
+    sample_data = valid_sample_data.copy()
+    share_frame(sample_data)
+    assert sample_data["class"].dtype == "object"
+
+def test_share_frame_invalid_input():
+    with pytest.raises(TypeError):
+        share_frame("not_a_dataframe")
+
+
+# Tests for parallel_search_backend
+def test_parallel_search_backend_invalid_backend():
+    with pytest.raises(ValueError, match="Invalid backend name"):
+        with parallel_search_backend("gpu"):
+            pass
+
+@pytest.mark.parametrize("backend", ["process", "thread", "sequential"])
+def test_parallel_search_backend_runs_jobs(backend):
+    with parallel_search_backend(backend, n_jobs=2) as n_jobs:
+        results = Parallel(n_jobs=n_jobs)(delayed(abs)(-i) for i in range(4))
+    assert results == [0, 1, 2, 3]
+
+def test_parallel_search_backend_sequential_uses_one_worker():
+    with parallel_search_backend("sequential", n_jobs=8) as n_jobs:
+        assert n_jobs == 1
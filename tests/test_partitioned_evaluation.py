@@ -0,0 +1,91 @@
+import pytest
+import sys
+import os
+import json
+import pickle
+import numpy as np
+import pandas as pd
+from sklearn.compose import make_column_transformer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.pipeline import make_pipeline
+from sklearn.tree import DecisionTreeClassifier
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.partitioned_evaluation import (
+    list_partitions,
+    slice_confusion_matrices,
+    evaluate_partitions,
+    MANIFEST_NAME,
+)
+from src.confusion_metrics import confusion_counts
+from sample_data import sample_train_data, sample_test_data
+
+
+@pytest.fixture
+def data():
+    return pd.concat([sample_train_data, sample_test_data] * 3, ignore_index=True)
+
+@pytest.fixture
+def model_file(data, tmp_path):
+    model = make_pipeline(
+        make_column_transformer(
+            (OneHotEncoder(handle_unknown='ignore'), ['class']),
+            (StandardScaler(), ['age', 'flight_distance']),
+        ),
+        DecisionTreeClassifier(max_depth=2, random_state=0)
+    ).fit(data.drop(columns=['satisfaction']), data['satisfaction'])
+    model_path = tmp_path / "model.pickle"
+    model_path.write_bytes(pickle.dumps(model))
+    return model, model_path
+
+@pytest.fixture
+def partitions_dir(data, tmp_path):
+    partitions_dir = tmp_path / "partitions"
+    partitions_dir.mkdir()
+    for day, part in enumerate(np.array_split(data, 3)):
+        part.to_csv(partitions_dir / f"2024-01-0{day + 1}.csv", index=False)
+    return partitions_dir
+
+
+# Tests for list_partitions
+def test_list_partitions_sorted(partitions_dir):
+    assert [p.name for p in list_partitions(partitions_dir)] == ["2024-01-01.csv", "2024-01-02.csv", "2024-01-03.csv"]
+
+def test_list_partitions_empty_directory(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list_partitions(tmp_path)
+
+
+# Tests for slice_confusion_matrices
+def test_slice_confusion_matrices_sum_to_overall(data):
+    y = data['satisfaction'].to_numpy()
+    y_pred = np.roll(y, 1)
+    classes = np.unique(y)
+    cms = slice_confusion_matrices(y, y_pred, data[['class']], classes)
+    assert set(cms) == {(c,) for c in data['class'].unique()}
+    assert np.array_equal(sum(cms.values()), confusion_counts(y, y_pred, classes)[0])
+
+
+# Tests for evaluate_partitions
+def test_evaluate_partitions_matches_single_pass(model_file, partitions_dir, data, tmp_path):
+    model, model_path = model_file
+    cm, classes = evaluate_partitions(model, model_path, partitions_dir, tmp_path, slice_by=['class'])
+    expected, _ = confusion_counts(data['satisfaction'], model.predict(data.drop(columns=['satisfaction'])), classes)
+    assert np.array_equal(cm, expected)
+    assert len(pd.read_csv(tmp_path / "partition_scores.csv")) == 3
+    assert set(pd.read_csv(tmp_path / "slice_scores.csv")['class']) == set(data['class'])
+
+def test_evaluate_partitions_skips_scored_partitions(model_file, partitions_dir, data, tmp_path, capsys):
+    model, model_path = model_file
+    first, _ = evaluate_partitions(model, model_path, partitions_dir, tmp_path)
+    data.iloc[:5].to_csv(partitions_dir / "2024-01-04.csv", index=False)
+    second, _ = evaluate_partitions(model, model_path, partitions_dir, tmp_path)
+    assert "Scoring \033[1m1\033[0m of 4 partitions" in capsys.readouterr().out
+    assert second.sum() == first.sum() + 5
+    assert len(json.loads((tmp_path / MANIFEST_NAME).read_text())["partitions"]) == 4
+
+def test_evaluate_partitions_rescores_new_slices(model_file, partitions_dir, tmp_path, capsys):
+    model, model_path = model_file
+    evaluate_partitions(model, model_path, partitions_dir, tmp_path)
+    capsys.readouterr()
+    evaluate_partitions(model, model_path, partitions_dir, tmp_path, slice_by=['class'])
+    assert "Scoring \033[1m3\033[0m of 3 partitions" in capsys.readouterr().out
@@ -0,0 +1,82 @@
+import pytest
+import sys
+import os
+import numpy as np
+import pandas as pd
+from sklearn.compose import make_column_transformer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, MinMaxScaler
+from sklearn.pipeline import make_pipeline
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.metrics import f1_score
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.permutation_importance import feature_groups, permutation_importance, plot_permutation_importance
+from src.threshold_tuning import ThresholdClassifier
+from sample_data import sample_train_data, sample_test_data
+
+
+@pytest.fixture
+def data():
+    data = pd.concat([sample_train_data, sample_test_data] * 10, ignore_index=True)
+    return data.drop(columns=['satisfaction']), data['satisfaction']
+
+@pytest.fixture
+def model(data):
+    X, y = data
+    preprocessor = make_column_transformer(
+        (OneHotEncoder(drop='first', handle_unknown='ignore', dtype=np.int32), ['gender', 'class']),
+        (MinMaxScaler(), ['inflight_wifi_service', 'seat_comfort']),
+        (StandardScaler(), ['age', 'flight_distance']),
+        ('drop', ['customer_type']),
+        remainder='drop'
+    )
+    return make_pipeline(preprocessor, DecisionTreeClassifier(max_depth=3, random_state=0)).fit(X, y)
+
+
+# Tests for feature_groups
+def test_feature_groups_default(model):
+    groups = feature_groups(model[0])
+    assert list(groups) == ['gender', 'class', 'inflight_wifi_service', 'seat_comfort', 'age', 'flight_distance']
+
+def test_feature_groups_joint(model):
+    groups = feature_groups(model[0], {"demographics": ["gender", "age"]})
+    assert groups["demographics"] == ["gender", "age"]
+    assert "gender" not in groups and "age" not in groups
+
+def test_feature_groups_unused_column(model):
+    with pytest.raises(ValueError, match="unused by the preprocessor"):
+        feature_groups(model[0], {"customer": ["customer_type"]})
+
+
+# Tests for permutation_importance
+def test_permutation_importance_matches_full_pipeline(model, data):
+    X, y = data
+    importances = permutation_importance(model, X, y, n_repeats=1, random_state=0).set_index("feature")
+    baseline = f1_score(y, model.predict(X), pos_label="satisfied")
+    seeds = np.random.SeedSequence(0).spawn(6)
+    for (feature, seed) in zip(feature_groups(model[0]), seeds):
+        X_permuted = X.copy()
+        X_permuted[feature] = X[feature].to_numpy()[np.random.default_rng(seed).permutation(len(X))]
+        expected = baseline - f1_score(y, model.predict(X_permuted), pos_label="satisfied")
+        assert importances.loc[feature, "importance_mean"] == pytest.approx(expected)
+
+def test_permutation_importance_parallel_matches_sequential(model, data):
+    X, y = data
+    sequential = permutation_importance(model, X, y, n_repeats=2, random_state=0)
+    parallel = permutation_importance(model, X, y, n_repeats=2, n_jobs=2, random_state=0)
+    pd.testing.assert_frame_equal(sequential, parallel)
+
+def test_permutation_importance_threshold_classifier(model, data):
+    X, y = data
+    importances = permutation_importance(ThresholdClassifier(model, threshold=0.7), X, y, metric="accuracy",
+                                         random_state=0)
+    assert len(importances) == 6
+
+def test_permutation_importance_invalid_metric(model, data):
+    X, y = data
+    with pytest.raises(ValueError, match="Invalid metric name"):
+        permutation_importance(model, X, y, metric="roc_auc")
+
+def test_plot_permutation_importance(model, data, tmp_path):
+    X, y = data
+    plot_permutation_importance(permutation_importance(model, X, y, random_state=0), "f1", tmp_path)
+    assert (tmp_path / "permutation_importance.png").exists()
@@ -5,7 +5,7 @@ import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.data_preprocessing import clean_column_names, correct_precision_after_scaling
+from src.data_preprocessing import clean_column_names, correct_precision_after_scaling, read_data, parse_filter
 
 @pytest.fixture
 def valid_sample_data():
@@ -51,6 +51,58 @@ def test_clean_column_names_invalid_none():
         clean_column_names(None)
 
 
+def test_clean_column_names_leaves_input_untouched(valid_sample_data):
+    """Test clean_column_names doesn't rename the columns of its input."""
+    clean_column_names(valid_sample_data)
+    assert list(valid_sample_data.columns)[:2] == ["Gender", "Customer Type"]
+
+
+# Tests for read_data
+def test_read_data_projection(valid_sample_data, tmp_path):
+    """Test read_data normalizes the header and only reads the needed columns."""
+    valid_sample_data.to_csv(tmp_path / "data.csv", index=False)
+    data = read_data(tmp_path / "data.csv", columns=["age", "time_convenient", "gender"], exclude=["gender"])
+    assert list(data.columns) == ["age", "time_convenient"]
+    assert data["time_convenient"].tolist() == [2, 4]
+
+
+def test_read_data_chunks(valid_sample_data, tmp_path):
+    """Test read_data streams chunks with normalized column names."""
+    valid_sample_data.to_csv(tmp_path / "data.csv", index=False)
+    chunks = list(read_data(tmp_path / "data.csv", exclude=["satisfaction"], chunksize=1))
+    assert len(chunks) == 2
+    assert list(chunks[1].columns) == ["gender", "customer_type", "age", "flight_distance",
+                                       "inflight_wifi_service", "time_convenient"]
+
+
+def test_read_data_invalid_columns(valid_sample_data, tmp_path):
+    """Test read_data with missing and duplicated columns."""
+    valid_sample_data.to_csv(tmp_path / "data.csv", index=False)
+    with pytest.raises(ValueError, match="are not in"):
+        read_data(tmp_path / "data.csv", columns=["id"])
+    valid_sample_data.assign(age=1).rename(columns={"age": "AGE"}).to_csv(tmp_path / "duplicated.csv", index=False)
+    with pytest.raises(ValueError, match="same normalized name"):
+        read_data(tmp_path / "duplicated.csv")
+
+
+def test_parse_filter():
+    """Test parse_filter with comparison and membership filters."""
+    assert parse_filter("age >= 30") == ("age", ">=", 30.0)
+    assert parse_filter("customer_type not in Loyal Customer, disloyal Customer") == \
+        ("customer_type", "not in", ["Loyal Customer", "disloyal Customer"])
+    with pytest.raises(ValueError, match="should be written as"):
+        parse_filter("age ~ 30")
+
+
+def test_read_data_filters(valid_sample_data, tmp_path):
+    """Test read_data keeps the matching rows without returning the filter columns."""
+    valid_sample_data.to_csv(tmp_path / "data.csv", index=False)
+    data = read_data(tmp_path / "data.csv", columns=["age"], filters=[("gender", "==", "Female")])
+    assert data["age"].tolist() == [32]
+    chunks = list(read_data(tmp_path / "data.csv", columns=["age"], filters=[parse_filter("age > 26")], chunksize=1))
+    assert [chunk["age"].tolist() for chunk in chunks] == [[32]]
+
+
 # Tests for correct_precision_after_scaling
 def test_correct_precision_after_scaling_valid(valid_sample_data):
     """Test correct_precision_after_scaling with valid input."""
@@ -0,0 +1,43 @@
+import pytest
+import sys
+import os
+import matplotlib.pyplot as plt
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.render_pool import render_pool, submit_figure
+from src.save_cv_results_plot import save_cv_results_plot
+
+
+@pytest.fixture
+def cv_results():
+    return {
+        "param_decisiontreeclassifier__max_depth": [1, 2, 3],
+        "mean_val_score": [0.7, 0.8, 0.85],
+        "mean_train_score": [0.8, 0.85, 0.9],
+        "se_val_score": [0.01, 0.02, 0.015],
+        "se_train_score": [0.02, 0.015, 0.01]
+    }
+
+def draw_open_figure():
+    plt.figure()
+
+
+def test_submit_figure_without_pool_closes_figures():
+    figures = plt.get_fignums()
+    submit_figure(draw_open_figure)
+    assert plt.get_fignums() == figures
+
+def test_render_pool_waits_for_figures(cv_results, tmp_path):
+    with render_pool(n_workers=2):
+        jobs = [submit_figure(save_cv_results_plot, cv_results, "f1", tmp_path / str(i)) for i in range(3)]
+    assert all(job.done() for job in jobs)
+    assert all((tmp_path / str(i) / "cv_results_plot.png").exists() for i in range(3))
+
+def test_render_pool_raises_failed_figure(tmp_path):
+    with pytest.raises(KeyError):
+        with render_pool():
+            submit_figure(save_cv_results_plot, {}, "f1", tmp_path)
+
+def test_render_pool_invalid_workers():
+    with pytest.raises(ValueError, match="n_workers should be a positive integer"):
+        with render_pool(n_workers=0):
+            pass
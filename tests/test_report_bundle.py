@@ -0,0 +1,60 @@
+import pytest
+import sys
+import os
+import json
+import pandas as pd
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.report_bundle import file_hash, table_records, best_params, dataset_shape, build_report_bundle, \
+                              save_report_bundle
+
+
+@pytest.fixture
+def results(tmp_path):
+    tables, figures = tmp_path / "tables", tmp_path / "figures"
+    tables.mkdir()
+    figures.mkdir()
+    pd.DataFrame({"Accuracy": [0.95], "F1-Score": [0.94]}).to_csv(tables / "test_scores.csv", index=False)
+    pd.DataFrame({"param_decisiontreeclassifier__max_depth": [6, 9, 12],
+                  "mean_val_score": [0.90, 0.93, 0.92]}).to_csv(tables / "cv_results.csv", index=False)
+    (figures / "cv_results_plot.png").write_bytes(b"png")
+    return tables, figures
+
+
+def test_table_records_round_trip():
+    table = pd.DataFrame({"slice": ["a", "b"], "f1": [0.5, None]})
+    records = table_records(table)
+    assert records["data"][1] == ["b", None]
+    pd.testing.assert_frame_equal(pd.DataFrame(**records), table)
+
+def test_best_params_model_zoo():
+    cv_results = pd.DataFrame({"model": ["tree", "knn"], "params": ['{"max_depth": 3}', '{"n_neighbors": 5}'],
+                               "mean_val_score": [0.8, 0.9]})
+    assert best_params(cv_results) == {"param_model": "knn", "param_n_neighbors": 5.0}
+    with pytest.raises(KeyError, match="no validation scores"):
+        best_params(cv_results.drop(columns=["mean_val_score"]))
+
+def test_dataset_shape(tmp_path):
+    pd.DataFrame({"Unnamed: 0": range(25), "Age": range(25), "Class": ["Eco"] * 25}).to_csv(tmp_path / "data.csv", index=False)
+    assert dataset_shape(tmp_path / "data.csv", chunksize=10) == {"n_rows": 25, "n_columns": 3}
+
+def test_build_report_bundle(results):
+    tables, figures = results
+    bundle = build_report_bundle(tables, figures, tables=["test_scores", "cv_results"], figures=["cv_results_plot"])
+    assert bundle["metrics"] == {"test_scores": {"Accuracy": 0.95, "F1-Score": 0.94},
+                                 "best_params": {"param_decisiontreeclassifier__max_depth": 9}}
+    assert bundle["figures"]["cv_results_plot"]["sha256"] == file_hash(figures / "cv_results_plot.png")
+    assert bundle["dataset"] is None
+
+    with pytest.raises(FileNotFoundError, match="slice_analysis.csv"):
+        build_report_bundle(tables, figures, tables=["slice_analysis"], figures=[])
+
+def test_save_report_bundle_unchanged(results, tmp_path):
+    tables, figures = results
+    bundle = build_report_bundle(tables, figures, tables=["test_scores"], figures=["cv_results_plot"])
+    path = tmp_path / "report_bundle.json"
+    assert save_report_bundle(bundle, path)
+    assert not save_report_bundle(bundle, path)
+    assert json.loads(path.read_text()) == bundle
+
+    (figures / "cv_results_plot.png").write_bytes(b"new png")
+    assert save_report_bundle(build_report_bundle(tables, figures, tables=[], figures=["cv_results_plot"]), path)
@@ -4,9 +4,10 @@ from pathlib import Path
 import shutil
 import os
 import sys
+import numpy as np
 import pandas as pd
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from src.save_cv_results_plot   import save_cv_results_plot  
+from src.save_cv_results_plot   import save_cv_results_plot, cv_results_frame, marginal_curve, MAX_PARAMETER_VALUES
 from sample_data import sample_train_data, sample_test_data
 
 
@@ -82,4 +83,41 @@ def test_eval_metric_case(valid_cv_results):
     file_to_check = Path('./test_plots') / 'cv_results_plot.png'
     assert file_to_check.exists(), f"Plot was not saved at {file_to_check}"
     file_to_check.unlink()
-    os.rmdir('./test_plots')
\ No newline at end of file
+    os.rmdir('./test_plots')
+
+# Test Case 7: Check the marginal curves of a multi-parameter search
+def test_multi_parameter_cv_results(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 3_000
+    cv_results = pd.DataFrame({
+        "param_tree__max_depth": rng.integers(1, 10, n),
+        "param_tree__criterion": rng.choice(["gini", "entropy"], n),
+        "param_tree__ccp_alpha": rng.uniform(0, 0.05, n),
+        "mean_test_f1": rng.uniform(0.5, 0.9, n),
+        "std_test_f1": rng.uniform(0, 0.05, n),
+        "mean_train_f1": rng.uniform(0.8, 1.0, n),
+        "std_train_f1": rng.uniform(0, 0.05, n),
+    })
+    x, labels, best = marginal_curve(cv_results, "param_tree__max_depth", cv_results["mean_test_f1"])
+    assert x.tolist() == list(range(1, 10)) and labels is None
+    assert cv_results.loc[best, "mean_test_f1"].tolist() == \
+        cv_results.groupby("param_tree__max_depth")["mean_test_f1"].max().tolist()
+    x, labels, best = marginal_curve(cv_results, "param_tree__criterion", cv_results["mean_test_f1"])
+    assert labels == ["entropy", "gini"]
+    x, labels, best = marginal_curve(cv_results, "param_tree__ccp_alpha", cv_results["mean_test_f1"])
+    assert len(x) == MAX_PARAMETER_VALUES
+
+    save_cv_results_plot(cv_results, eval_metric='f1', plot_save_path=tmp_path, n_splits=5)
+    assert (tmp_path / 'cv_results_plot.png').exists()
+
+# Test Case 8: Check the model zoo results are expanded into parameter columns
+def test_model_zoo_cv_results():
+    cv_results = cv_results_frame({
+        "model": ["decision_tree", "random_forest"],
+        "params": ['{"max_depth": 3}', '{"max_depth": 5, "n_estimators": 100}'],
+        "mean_val_score": [0.8, 0.9],
+        "mean_train_score": [0.9, 0.95],
+    })
+    assert cv_results["param_model"].tolist() == ["decision_tree", "random_forest"]
+    assert cv_results["param_max_depth"].tolist() == [3, 5]
+    assert cv_results["param_n_estimators"].isna().tolist() == [True, False]
@@ -0,0 +1,43 @@
+import pytest
+import sys
+import os
+import importlib.util
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.seeding import STAGES, ROOT_SEED, stage_seed_sequence, stage_seed, stage_rng, child_seeds
+
+
+def test_stage_seed_deterministic_and_independent():
+    seeds = [stage_seed(123, stage) for stage in STAGES]
+    assert seeds == [stage_seed(123, stage) for stage in STAGES]
+    assert len(set(seeds)) == len(STAGES)
+    assert stage_seed(124, "split") != stage_seed(123, "split")
+    assert all(0 <= seed < 2**32 for seed in seeds)
+
+def test_stage_rng_matches_seed_sequence():
+    np.testing.assert_array_equal(stage_rng(7, "eda").random(5),
+                                  np.random.default_rng(stage_seed_sequence(7, "eda")).random(5))
+
+def test_stage_seed_unknown_stage():
+    with pytest.raises(ValueError, match="Unknown stage"):
+        stage_seed(123, "trainning")
+
+def test_child_seeds_by_position():
+    seeds = child_seeds(stage_seed(123, "training"), 4)
+    assert seeds == child_seeds(stage_seed(123, "training"), 4)
+    assert seeds[:2] == child_seeds(stage_seed(123, "training"), 2)
+    assert len(set(seeds)) == 4
+
+@pytest.mark.parametrize("script", ["data_preparation", "eda", "model_training", "model_evaluation",
+                                    "feature_importance"])
+def test_scripts_share_the_root_seed(script):
+    # The scripts import their sibling scripts, like when they run from the scripts folder
+    scripts_dir = os.path.join(os.path.dirname(__file__), '..', 'scripts')
+    if scripts_dir not in sys.path:
+        sys.path.append(scripts_dir)
+    path = os.path.join(scripts_dir, f"{script}.py")
+    spec = importlib.util.spec_from_file_location(f"{script}_script", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    seed_option = next(param for param in module.main.params if param.name == "seed")
+    assert seed_option.default == ROOT_SEED
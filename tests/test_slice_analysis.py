@@ -0,0 +1,81 @@
+import pytest
+import sys
+import os
+import numpy as np
+import pandas as pd
+from sklearn.metrics import f1_score, accuracy_score
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.slice_analysis import bucketize, slice_outcome_counts, merge_slice_counts, rank_slices, save_slice_analysis
+from sample_data import sample_train_data, sample_test_data
+
+
+@pytest.fixture
+def predictions():
+    data = pd.concat([sample_train_data, sample_test_data] * 5, ignore_index=True)
+    rng = np.random.default_rng(0)
+    y_obs = data.pop("satisfaction").to_numpy()
+    y_pred = np.where(rng.random(len(y_obs)) < 0.7, y_obs, rng.choice(["satisfied", "neutral or dissatisfied"], len(y_obs)))
+    return y_obs, y_pred, data
+
+
+# Tests for bucketize
+def test_bucketize_labels():
+    buckets = bucketize(pd.Series([0, 24, 25, 70]), [0, 25, 40, np.inf])
+    assert buckets.tolist() == ["[0, 25)", "[0, 25)", "[25, 40)", "[40, inf)"]
+
+
+# Tests for slice_outcome_counts
+def test_slice_outcome_counts_matches_masks(predictions):
+    y_obs, y_pred, data = predictions
+    counts = slice_outcome_counts(y_obs, y_pred, data).set_index("slice")
+    mask = (data["class"] == "Eco").to_numpy() & (data["type_of_travel"] == "Business travel").to_numpy()
+    row = counts.loc["class=Eco & type_of_travel=Business travel"]
+    assert row["n_rows"] == mask.sum()
+    assert row["tp"] == ((y_obs[mask] == "satisfied") & (y_pred[mask] == "satisfied")).sum()
+    assert counts.loc["all", "n_rows"] == len(y_obs)
+
+def test_slice_outcome_counts_orders_add_up(predictions):
+    y_obs, y_pred, data = predictions
+    counts = slice_outcome_counts(y_obs, y_pred, data, max_order=1)
+    assert set(counts["order"]) == {0, 1}
+    assert counts.loc[counts["slice"].str.startswith("age="), "n_rows"].sum() == len(y_obs)
+
+def test_slice_outcome_counts_mismatched_length(predictions):
+    y_obs, y_pred, data = predictions
+    with pytest.raises(ValueError):
+        slice_outcome_counts(y_obs[:-1], y_pred, data)
+
+
+# Tests for merge_slice_counts
+def test_merge_slice_counts_matches_whole(predictions):
+    y_obs, y_pred, data = predictions
+    counts = None
+    for start in range(0, len(y_obs), 7):
+        rows = slice(start, start + 7)
+        counts = merge_slice_counts(counts, slice_outcome_counts(y_obs[rows], y_pred[rows], data.iloc[rows]))
+    whole = slice_outcome_counts(y_obs, y_pred, data)
+    assert counts.loc[0, "slice"] == "all"
+    pd.testing.assert_frame_equal(counts.set_index("slice").sort_index(), whole.set_index("slice").sort_index(),
+                                  check_dtype=False)
+
+# Tests for rank_slices and save_slice_analysis
+def test_rank_slices_gap(predictions):
+    y_obs, y_pred, data = predictions
+    ranked = rank_slices(slice_outcome_counts(y_obs, y_pred, data), "f1", min_rows=1).set_index("slice")
+    overall = f1_score(y_obs, y_pred, pos_label="satisfied")
+    mask = (data["class"] == "Business").to_numpy()
+    assert ranked.loc["all", "gap"] == pytest.approx(0)
+    assert ranked.loc["class=Business", "gap"] == pytest.approx(
+        f1_score(y_obs[mask], y_pred[mask], pos_label="satisfied") - overall)
+    assert ranked["gap"].is_monotonic_increasing
+
+def test_rank_slices_invalid_metric(predictions):
+    with pytest.raises(ValueError, match="Invalid metric name"):
+        rank_slices(slice_outcome_counts(*predictions), "roc_auc")
+
+def test_save_slice_analysis(predictions, tmp_path):
+    y_obs, y_pred, data = predictions
+    ranked = save_slice_analysis(y_obs, y_pred, data, tmp_path, metric="accuracy", min_rows=10)
+    assert (tmp_path / "slice_analysis.csv").exists()
+    assert (ranked["n_rows"] >= 10).all()
+    assert ranked.set_index("slice").loc["all", "accuracy"] == pytest.approx(accuracy_score(y_obs, y_pred))
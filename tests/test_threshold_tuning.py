@@ -0,0 +1,108 @@
+import pytest
+import sys
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from sklearn.metrics import precision_score, recall_score, f1_score
+from sklearn.tree import DecisionTreeClassifier
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.threshold_tuning import (
+    positive_scores,
+    threshold_counts,
+    threshold_curve_from_counts,
+    threshold_curve,
+    choose_threshold,
+    out_of_fold_scores,
+    predict_from_proba,
+    ThresholdClassifier,
+)
+
+
+@pytest.fixture
+def scored_labels():
+    rng = np.random.default_rng(0)
+    y_obs = rng.choice(["neutral or dissatisfied", "satisfied"], 500)
+    scores = np.round(np.clip((y_obs == "satisfied") * 0.3 + rng.random(500) * 0.7, 0, 1), 2)
+    return y_obs, scores
+
+@pytest.fixture
+def train_data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(300, 3)), columns=["a", "b", "c"])
+    y = np.where(X["a"] + rng.normal(scale=0.7, size=300) > 0, "satisfied", "neutral or dissatisfied")
+    return X, y
+
+
+# Tests for threshold_curve and threshold_counts
+def test_threshold_curve_matches_sklearn(scored_labels):
+    y_obs, scores = scored_labels
+    curve = threshold_curve(y_obs, scores)
+    assert curve["threshold"].is_monotonic_decreasing
+    for _, row in curve.sample(10, random_state=0).iterrows():
+        y_pred = np.where(scores >= row["threshold"], "satisfied", "neutral or dissatisfied")
+        assert row["precision"] == pytest.approx(precision_score(y_obs, y_pred, pos_label="satisfied"))
+        assert row["recall"] == pytest.approx(recall_score(y_obs, y_pred, pos_label="satisfied"))
+        assert row["f1"] == pytest.approx(f1_score(y_obs, y_pred, pos_label="satisfied"))
+
+def test_threshold_curve_mismatched_length(scored_labels):
+    y_obs, scores = scored_labels
+    with pytest.raises(ValueError):
+        threshold_curve(y_obs[:-1], scores)
+
+def test_threshold_counts_chunks_match_whole(scored_labels):
+    y_obs, scores = scored_labels
+    counts = None
+    for start in range(0, len(y_obs), 128):
+        counts = threshold_counts(y_obs[start:start + 128], scores[start:start + 128], counts=counts)
+    assert counts.to_numpy().sum() == len(y_obs)
+    pd.testing.assert_frame_equal(threshold_curve_from_counts(counts), threshold_curve(y_obs, scores))
+
+def test_threshold_counts_decimals_bound_rows(scored_labels):
+    y_obs, scores = scored_labels
+    counts = threshold_counts(y_obs, scores + 1e-9 * np.arange(len(scores)), decimals=1)
+    assert len(counts) <= 11
+
+
+# Tests for choose_threshold
+def test_choose_threshold_maximizes_metric(scored_labels):
+    curve = threshold_curve(*scored_labels)
+    threshold = choose_threshold(curve, "f1")
+    assert curve.loc[curve["threshold"] == threshold, "f1"].item() == curve["f1"].max()
+
+def test_choose_threshold_min_precision(scored_labels):
+    curve = threshold_curve(*scored_labels)
+    threshold = choose_threshold(curve, "recall", min_precision=0.8)
+    assert curve.loc[curve["threshold"] == threshold, "precision"].item() >= 0.8
+
+def test_choose_threshold_unreachable_constraint(scored_labels):
+    curve = threshold_curve(*scored_labels)
+    with pytest.raises(ValueError, match="No threshold"):
+        choose_threshold(curve, min_precision=1.1)
+
+def test_choose_threshold_invalid_metric(scored_labels):
+    with pytest.raises(ValueError, match="Invalid metric name"):
+        choose_threshold(threshold_curve(*scored_labels), "accuracy")
+
+
+# Tests for out_of_fold_scores and ThresholdClassifier
+def test_out_of_fold_scores_shape(train_data):
+    X, y = train_data
+    scores = out_of_fold_scores(DecisionTreeClassifier(max_depth=3, random_state=0), X, y, cv=5)
+    assert scores.shape == (len(X),)
+    assert ((scores >= 0) & (scores <= 1)).all()
+
+def test_threshold_classifier_applies_threshold(train_data):
+    X, y = train_data
+    model = DecisionTreeClassifier(max_depth=3, random_state=0).fit(X, y)
+    strict = ThresholdClassifier(model, threshold=0.9)
+    scores = positive_scores(model.predict_proba(X), model.classes_)
+    assert ((strict.predict(X) == "satisfied") == (scores >= 0.9)).all()
+    assert list(strict.classes_) == list(model.classes_)
+
+def test_predict_from_proba_matches_predict(train_data):
+    X, y = train_data
+    model = DecisionTreeClassifier(max_depth=3, random_state=0).fit(X, y)
+    tuned = pickle.loads(pickle.dumps(ThresholdClassifier(model, threshold=0.3)))
+    assert np.array_equal(predict_from_proba(model, model.predict_proba(X)), model.predict(X))
+    assert np.array_equal(predict_from_proba(tuned, tuned.predict_proba(X)), tuned.predict(X))
@@ -0,0 +1,65 @@
+import pytest
+import sys
+import os
+import numpy as np
+import pandas as pd
+from sklearn.compose import make_column_transformer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.pipeline import make_pipeline
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.linear_model import LogisticRegression
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.tree_explainer import path_contributions, explain_predictions
+from src.histogram_tree import HistogramBinner, HistogramTreeClassifier
+from src.threshold_tuning import ThresholdClassifier
+from sample_data import sample_train_data, sample_test_data
+
+
+@pytest.fixture
+def data():
+    data = pd.concat([sample_train_data, sample_test_data] * 10, ignore_index=True)
+    data["age"] += np.arange(len(data)) % 7
+    return data.drop(columns=['satisfaction']), data['satisfaction']
+
+def make_model(estimator, *steps):
+    preprocessor = make_column_transformer(
+        (OneHotEncoder(drop='first', handle_unknown='ignore', dtype=np.int32), ['class']),
+        (StandardScaler(), ['age', 'flight_distance', 'seat_comfort']),
+        remainder='drop'
+    )
+    return make_pipeline(preprocessor, *steps, estimator)
+
+
+# Tests for path_contributions
+def test_path_contributions_root_is_zero(data):
+    X, y = data
+    model = make_model(DecisionTreeClassifier(max_depth=3, random_state=0)).fit(X, y)
+    bias, contributions = path_contributions(model[-1], 1, 5)
+    assert bias == pytest.approx((y == "satisfied").mean())
+    assert np.allclose(contributions[0], 0)
+
+
+# Tests for explain_predictions
+@pytest.mark.parametrize("estimator, steps", [
+    (DecisionTreeClassifier(max_depth=4, random_state=0), ()),
+    (HistogramTreeClassifier(max_depth=4, prebinned=True), (HistogramBinner(),)),
+])
+def test_explain_predictions_sum_to_probability(data, estimator, steps):
+    X, y = data
+    model = make_model(estimator, *steps).fit(X, y)
+    explanations = explain_predictions(model, X, batch_size=17)
+    assert list(explanations.columns) == ["bias", *model[0].get_feature_names_out(), "prediction"]
+    assert np.allclose(explanations["prediction"], model.predict_proba(X)[:, 1])
+    assert np.allclose(explanations.drop(columns="prediction").sum(axis=1), explanations["prediction"])
+
+def test_explain_predictions_threshold_classifier(data):
+    X, y = data
+    model = make_model(DecisionTreeClassifier(max_depth=2, random_state=0)).fit(X, y)
+    explanations = explain_predictions(ThresholdClassifier(model, threshold=0.3), X)
+    assert np.allclose(explanations["prediction"], model.predict_proba(X)[:, 1])
+
+def test_explain_predictions_not_a_tree(data):
+    X, y = data
+    model = make_model(LogisticRegression()).fit(X, y)
+    with pytest.raises(ValueError, match="can be explained"):
+        explain_predictions(model, X)